@@ -1,7 +1,8 @@
 #from riddlegenerator.triples_creator import extract_triples
-from riddlegenerator.triples_extraction import extract_triples
+from riddlegenerator.candidate_pruning import describe_counts
+from riddlegenerator.extraction_daemon import Prefetcher, get_extractor
 from riddlegenerator.properties_identifier import classify_triples
-from riddlegenerator.lookup_dictionary import ConceptPropertyDictionary
+from riddlegenerator.lookup_dictionary import SQLiteConceptPropertyDictionary
 from riddlegenerator.generator import generate_riddle
 
 def run_pipeline():
@@ -11,21 +12,47 @@ def run_pipeline():
         concept_name = input(f"Enter concept {i+1} name: ")
         concepts.append(concept_name)
 
-    lookup = ConceptPropertyDictionary()
+    # persisted across sessions, so a concept is only ever extracted once
+    lookup = SQLiteConceptPropertyDictionary("lookup/concepts.db")
 
-    for concept in concepts:
+    # served by `riddlequest.py serve` when it is running (models already
+    # warm), otherwise extracted in-process
+    pending = [c for c in concepts if c not in lookup]
+    prefetcher = Prefetcher(get_extractor(counts=True)) if pending else None
+
+    for idx, concept in enumerate(concepts):
         print(f"\nProcessing concept: {concept}")
+        if prefetcher:
+            # queue the next unseen concept behind this one, so it is
+            # extracted while this concept's riddles are being read
+            if concept in pending:
+                prefetcher.prefetch(concept)
+            upcoming = next((c for c in concepts[idx + 1:] if c in pending), None)
+            if upcoming:
+                prefetcher.prefetch(upcoming)
         try:
-            triples = extract_triples(concept)
-            classified_triples = classify_triples(triples)
-            lookup.add_triples(concept, classified_triples)
-            
-            print(f"Extracted {len(triples)} triples for '{concept}'")
+            if concept in lookup:
+                classified_triples = lookup.get_properties(concept)
+                print(f"Loaded {len(classified_triples)} stored triples for '{concept}'")
+            else:
+                triples, counts = prefetcher.get(concept)
+                classified_triples = classify_triples(triples)
+                lookup.add_triples(concept, classified_triples)
+                print(f"Extracted {len(triples)} triples for '{concept}'")
+                if counts:
+                    print(f"  pruning: {describe_counts(counts)}")
+
             print("Easy Riddle:", generate_riddle(classified_triples, "easy"))
             print("V2 Riddle:", generate_riddle(classified_triples, "v2"))
             print("V3 Riddle:", generate_riddle(classified_triples, "v3"))
         except Exception as e:
             print(f"Failed to process '{concept}': {e}")
 
+        if idx < len(concepts) - 1:
+            input("\nPress Enter for the next concept...")
+
+    if prefetcher:
+        prefetcher.close()
+
 if __name__ == "__main__":
     run_pipeline()
@@ -0,0 +1,4 @@
+import os
+
+# repository root: data/ and lookup/ paths are anchored here, not to the cwd
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,200 @@
+# Cheap scoring of relation candidates (RAKE phrases + POS tokens) so only a
+# bounded number of them ever reach BERT. Pure Python: no model is loaded here.
+import argparse
+import json
+import math
+import os
+import re
+from collections import Counter
+
+from riddlegenerator import ROOT
+
+PRUNE_TOP_N = 20
+MAX_WORDS = 5
+BACKGROUND_PATH = os.path.join(ROOT, "data", "json", "background_df.json")
+SUMMARY_CACHE_PATH = os.path.join(ROOT, "data", "json", "summaries.json")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+few for from further had has have having he her here hers him his how i if in into is
+it its itself just many may me might more most much must my no nor not now of off often
+on once only or other our out over own same she should so some such than that the
+their them then there these they this those through to too under until up very was we
+were what when where which while who whom why will with would you your known called
+one two three several various usually sometimes generally including like well
+""".split())
+
+_WORD = re.compile(r"[a-z][a-z'-]*|\d+")
+
+
+def _naive_lemma(token):
+    for suffix in ("ies", "es", "s", "ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    return token
+
+
+# ---------------------------------------------------------
+# Background document frequencies for TF-IDF
+# ---------------------------------------------------------
+class BackgroundIDF:
+    """Document frequencies over a background corpus (e.g. cached summaries)."""
+
+    def __init__(self, df=None, n_docs=0):
+        self.df = Counter(df or {})
+        self.n_docs = n_docs
+
+    @classmethod
+    def from_texts(cls, texts):
+        df, n = Counter(), 0
+        for text in texts:
+            df.update(set(_WORD.findall(text.lower())))
+            n += 1
+        return cls(df, n)
+
+    @classmethod
+    def from_summaries(cls, path):
+        """From a {concept: summary} cache such as triples_eval's summaries.json."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_texts(json.load(f).values())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        return cls(raw["df"], raw["n_docs"])
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"n_docs": self.n_docs, "df": dict(self.df)}, f)
+
+    def idf(self, token):
+        # smoothed; unseen words get the highest weight
+        return math.log((1 + self.n_docs) / (1 + self.df.get(token, 0))) + 1.0
+
+
+_background = None
+
+
+def default_background():
+    """
+    BackgroundIDF from data/json/background_df.json, else counted in memory
+    from the cached summaries, else an empty corpus (flat IDF). Nothing is
+    written here; build_background saves the file.
+    """
+    global _background
+    if _background is None:
+        if os.path.exists(BACKGROUND_PATH):
+            _background = BackgroundIDF.load(BACKGROUND_PATH)
+        elif os.path.exists(SUMMARY_CACHE_PATH):
+            _background = BackgroundIDF.from_summaries(SUMMARY_CACHE_PATH)
+        else:
+            _background = BackgroundIDF()
+    return _background
+
+
+def build_background(summaries_path=SUMMARY_CACHE_PATH, out_path=BACKGROUND_PATH):
+    """Count document frequencies over the cached summaries and save them."""
+    global _background
+    _background = BackgroundIDF.from_summaries(summaries_path)
+    _background.save(out_path)
+    print(f"[candidate_pruning] saved document frequencies of {_background.n_docs} summaries to {out_path}")
+    return _background
+
+
+# ---------------------------------------------------------
+# Pruning
+# ---------------------------------------------------------
+COUNT_KEYS = ("candidates", "filtered", "duplicates", "below_cut", "kept")
+
+
+def describe_counts(counts):
+    """One-line summary of prune_candidates counts (or of their sums)."""
+    return (f"kept {counts['kept']} of {counts['candidates']} candidates (filtered {counts['filtered']}, "
+            f"lemma duplicates {counts['duplicates']}, below cut {counts['below_cut']})")
+
+
+def prune_candidates(concept, summary, rake_scored, pos_tokens, top_n=PRUNE_TOP_N,
+                     min_score=None, background=None, lemmas=None, max_words=MAX_WORDS):
+    """
+    Score every candidate keyword and keep the best top_n (and, if given,
+    only those scoring >= min_score).
+
+      rake_scored: [(rake_score, phrase), ...]
+      pos_tokens:  NOUN/VERB/ADJ/ADV surface tokens
+      lemmas:      {token: lemma} (e.g. from the spaCy doc); a suffix
+                   strip is used for tokens it does not cover
+
+    Candidates that are too short or too long, or that are only
+    stopwords, digits or concept words, are dropped. Lemma variants
+    ("hunts" / "hunting") collapse to the best-scoring surface form. The
+    score is the mean of max-normalised RAKE and TF-IDF against
+    `background`. Returns (kept phrases in their surface form, counts).
+    """
+    background = background or BackgroundIDF()
+    lemmas = lemmas or {}
+
+    def lemma(w):
+        return lemmas.get(w, _naive_lemma(w))
+
+    concept_words = {lemma(w) for w in _WORD.findall(concept.lower())}
+
+    # lowercase phrase -> surface form; only scoring and dedup use the
+    # lowercase key, the kept phrase keeps its case ("Africa")
+    rake, candidates = {}, {}
+    for score, phrase in rake_scored:
+        key = phrase.lower().strip()
+        rake[key] = max(rake.get(key, 0.0), float(score))
+        candidates.setdefault(key, phrase.strip())
+    for token in pos_tokens:
+        key = token.lower().strip()
+        # RAKE lowercases its phrases: prefer the token's original case
+        if candidates.get(key, key) == key:
+            candidates[key] = token.strip()
+
+    summary_counts = Counter(_WORD.findall(summary.lower()))
+    total = sum(summary_counts.values()) or 1
+
+    scored = []
+    for phrase in candidates:
+        words = _WORD.findall(phrase)
+        content = [w for w in words
+                   if w not in STOPWORDS and lemma(w) not in concept_words and not w.isdigit()]
+        if len(phrase) < 3 or not content or len(words) > max_words:
+            continue
+        tfidf = sum(summary_counts[w] / total * background.idf(w) for w in content) / len(content)
+        key = tuple(sorted({lemma(w) for w in content}))
+        scored.append((phrase, rake[phrase] if phrase in rake else 0.0, tfidf, key))
+
+    max_rake = max((r for _, r, _, _ in scored), default=0.0) or 1.0
+    max_tfidf = max((t for _, _, t, _ in scored), default=0.0) or 1.0
+
+    best = {}
+    for phrase, r, t, key in scored:
+        score = 0.5 * r / max_rake + 0.5 * t / max_tfidf
+        if key not in best or (-score, len(phrase), phrase) < (-best[key][0], len(best[key][1]), best[key][1]):
+            best[key] = (score, phrase)
+
+    ranked = sorted(best.values(), key=lambda x: (-x[0], x[1]))
+    if min_score is not None:
+        ranked = [x for x in ranked if x[0] >= min_score]
+    kept = [candidates[phrase] for _, phrase in ranked[:top_n]]
+
+    counts = {
+        "candidates": len(candidates),
+        "filtered": len(candidates) - len(scored),
+        "duplicates": len(scored) - len(best),
+        "below_cut": len(best) - len(kept),
+        "kept": len(kept),
+    }
+    return kept, counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the TF-IDF background used to prune candidates")
+    parser.add_argument("--summaries", default=SUMMARY_CACHE_PATH)
+    parser.add_argument("--out", default=BACKGROUND_PATH)
+    args = parser.parse_args()
+    build_background(args.summaries, args.out)
@@ -0,0 +1,208 @@
+# Warm extraction daemon: one long-lived process holds spaCy, BERT and RAKE
+# and serves extract_triples(concept) to short-lived CLI sessions over a
+# Unix socket, so only the first session ever pays the model load.
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener
+
+SOCKET_ENV = "RIDDLEQUEST_DAEMON_SOCKET"
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~"), ".cache", "riddlequest", "extract.sock")
+
+
+def socket_path():
+    return os.environ.get(SOCKET_ENV, DEFAULT_SOCKET)
+
+
+# ---------------------------------------------------------
+# Server
+# ---------------------------------------------------------
+class ExtractionDaemon:
+    """
+    Summaries are fetched on a thread pool (network/disk bound, safe to
+    overlap); inference runs one request at a time under a lock, since the
+    models and the relation memo are shared. Concurrent requests for the
+    same concept share one in-flight extraction, and recent results are
+    kept in a small LRU.
+    """
+
+    def __init__(self, path=None, fetch_workers=4, cache_size=256, inference=None):
+        # the heavy import is the point of the daemon: done once, here
+        from riddlegenerator import triples_extraction
+        from riddlegenerator.wiki_source import summary_source
+
+        if inference:
+            # configure_inference options (quantize, jit, thread counts)
+            triples_extraction.configure_inference(**inference)
+        self.extraction = triples_extraction
+        self.summary_source = summary_source
+        self.path = path or socket_path()
+        self.fetcher = ThreadPoolExecutor(max_workers=fetch_workers)
+        self.infer_lock = threading.Lock()
+        self.state_lock = threading.Lock()
+        self.inflight = {}
+        self.results = OrderedDict()
+        self.cache_size = cache_size
+
+    def _extract(self, concept):
+        try:
+            summary = self.summary_source().summary(concept, sentences=5)
+        except Exception as e:
+            raise RuntimeError(f"Could not fetch Wikipedia summary for {concept}: {e}")
+        with self.infer_lock:
+            return self.extraction.extract_triples_with_counts(concept, summary)
+
+    def extract(self, concept):
+        """(triples, pruning counts) for a concept."""
+        with self.state_lock:
+            if concept in self.results:
+                self.results.move_to_end(concept)
+                return self.results[concept]
+            future = self.inflight.get(concept)
+            if future is None:
+                future = self.fetcher.submit(self._extract, concept)
+                self.inflight[concept] = future
+        try:
+            result = future.result()
+        except Exception:
+            with self.state_lock:
+                self.inflight.pop(concept, None)
+            raise
+
+        with self.state_lock:
+            self.inflight.pop(concept, None)
+            self.results[concept] = result
+            if len(self.results) > self.cache_size:
+                self.results.popitem(last=False)
+        return result
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    op, payload = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if op == "ping":
+                        reply = ("ok", "pong")
+                    elif op == "extract":
+                        reply = ("ok", self.extract(payload)[0])
+                    elif op == "extract_concept":
+                        reply = ("ok", self.extract(payload))
+                    else:
+                        reply = ("error", f"unknown op '{op}'")
+                except Exception as e:
+                    reply = ("error", str(e))
+                conn.send(reply)
+
+    def serve_forever(self):
+        os.makedirs(os.path.dirname(self.path) or ".", mode=0o700, exist_ok=True)
+        if os.path.exists(self.path):
+            if daemon_running(self.path):
+                raise RuntimeError(f"An extraction daemon is already serving {self.path}")
+            os.unlink(self.path)  # stale socket from a crashed daemon
+
+        # the socket is private to this user: requests are pickles
+        old_umask = os.umask(0o177)
+        try:
+            listener = Listener(self.path, family="AF_UNIX")
+        finally:
+            os.umask(old_umask)
+
+        print(f"[extraction_daemon] models loaded, serving on {self.path}")
+        try:
+            while True:
+                conn = listener.accept()
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            listener.close()
+
+
+# ---------------------------------------------------------
+# Client
+# ---------------------------------------------------------
+class ExtractionClient:
+    """extract_triples(concept) served by a running ExtractionDaemon."""
+
+    def __init__(self, path=None):
+        self.path = path or socket_path()
+        self.conn = Client(self.path, family="AF_UNIX")
+        self.lock = threading.Lock()
+
+    def _call(self, op, payload=None):
+        with self.lock:
+            self.conn.send((op, payload))
+            status, result = self.conn.recv()
+        if status != "ok":
+            raise RuntimeError(result)
+        return result
+
+    def extract_triples(self, concept):
+        return [tuple(t) for t in self._call("extract", concept)]
+
+    def extract_concept(self, concept):
+        triples, counts = self._call("extract_concept", concept)
+        return [tuple(t) for t in triples], counts
+
+    def close(self):
+        self.conn.close()
+
+
+def daemon_running(path=None):
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return False
+    try:
+        client = ExtractionClient(path)
+    except OSError:
+        return False
+    try:
+        return client._call("ping") == "pong"
+    except (OSError, EOFError, RuntimeError):
+        return False
+    finally:
+        client.close()
+
+
+def get_extractor(path=None, counts=False):
+    """
+    extract_triples callable: the daemon's when one is running, otherwise
+    the in-process extractor (which loads the models on first use). With
+    counts=True it is extract_concept, returning (triples, pruning counts).
+    """
+    path = path or socket_path()
+    if daemon_running(path):
+        client = ExtractionClient(path)
+        return client.extract_concept if counts else client.extract_triples
+
+    from riddlegenerator.triples_extraction import extract_concept, extract_triples
+    return extract_concept if counts else extract_triples
+
+
+class Prefetcher:
+    """
+    Runs extractions one at a time in the background so the next concept
+    is being extracted while the current one is shown.
+    """
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.futures = {}
+
+    def prefetch(self, concept) -> Future:
+        if concept not in self.futures:
+            self.futures[concept] = self.pool.submit(self.extractor, concept)
+        return self.futures[concept]
+
+    def get(self, concept):
+        return self.prefetch(concept).result()
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    ExtractionDaemon().serve_forever()
@@ -1,3 +1,8 @@
+import os
+import sqlite3
+from collections import OrderedDict
+
+
 class ConceptPropertyDictionary:
     def __init__(self):
         self.mapping = {}
@@ -7,3 +12,159 @@ class ConceptPropertyDictionary:
 
     def get_properties(self, concept):
         return self.mapping.get(concept, [])
+
+    def __contains__(self, concept):
+        return concept in self.mapping
+
+
+class SQLiteConceptPropertyDictionary:
+    """
+    Persistent ConceptPropertyDictionary backed by SQLite.
+
+    Every string (concept, subject, relation, object, label) is interned
+    once in a strings table; a triple row is just six integers. Concepts are
+    loaded on demand, and only the most recently used concepts and string
+    ids are kept in memory, so the dictionary can grow across sessions
+    without being held in RAM.
+    """
+
+    LABELS = ["topic_marker", "common"]
+    # triples.label: interned label text, NULL for a None label, PLAIN for
+    # an unclassified (s, p, o) triple (string ids start at 1)
+    PLAIN = -1
+
+    def __init__(self, path="lookup/concepts.db", cache_size=128, id_cache_size=4096):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.cache_size = cache_size
+        self.id_cache_size = id_cache_size
+        self._cache = OrderedDict()
+        self._ids = OrderedDict()
+
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS strings (
+                id   INTEGER PRIMARY KEY,
+                text TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS concepts (
+                id INTEGER PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS triples (
+                concept INTEGER NOT NULL,
+                seq     INTEGER NOT NULL,
+                subj    INTEGER NOT NULL,
+                rel     INTEGER NOT NULL,
+                obj     INTEGER NOT NULL,
+                label   INTEGER,
+                PRIMARY KEY (concept, seq)
+            ) WITHOUT ROWID;
+        """)
+
+    # ------------------------------------------
+    # String interning
+    # ------------------------------------------
+    def _remember(self, text, sid):
+        self._ids[text] = sid
+        if len(self._ids) > self.id_cache_size:
+            self._ids.popitem(last=False)
+        return sid
+
+    def _intern(self, text):
+        text = str(text)
+        sid = self._lookup_id(text)
+        if sid is None:
+            sid = self.conn.execute("INSERT INTO strings (text) VALUES (?)", (text,)).lastrowid
+            self._remember(text, sid)
+        return sid
+
+    def _lookup_id(self, text):
+        sid = self._ids.get(text)
+        if sid is not None:
+            self._ids.move_to_end(text)
+            return sid
+        row = self.conn.execute("SELECT id FROM strings WHERE text = ?", (text,)).fetchone()
+        return self._remember(text, row[0]) if row else None
+
+    # ------------------------------------------
+    # Same API as ConceptPropertyDictionary
+    # ------------------------------------------
+    def add_triples(self, concept, triples):
+        """
+        Store (replacing) a concept's triples. Accepts plain (s, p, o) triples
+        or classified ((s, p, o), label) pairs, as produced by classify_triples.
+        A concept stored with no triples still counts as present.
+        """
+        try:
+            with self.conn:
+                cid = self._intern(concept)
+                rows = []
+                for seq, item in enumerate(triples):
+                    if len(item) == 2 and isinstance(item[0], (tuple, list)):
+                        (subj, rel, obj), label = item
+                        code = self._intern(label) if label is not None else None
+                    else:
+                        (subj, rel, obj), code = item, self.PLAIN
+                    rows.append((cid, seq, self._intern(subj), self._intern(rel), self._intern(obj), code))
+
+                self.conn.execute("INSERT OR IGNORE INTO concepts (id) VALUES (?)", (cid,))
+                self.conn.execute("DELETE FROM triples WHERE concept = ?", (cid,))
+                self.conn.executemany("INSERT INTO triples VALUES (?, ?, ?, ?, ?, ?)", rows)
+        except Exception:
+            # ids interned in the rolled-back transaction were never
+            # committed; SQLite will hand those rowids to other strings
+            self._ids.clear()
+            raise
+        self._cache.pop(concept, None)
+
+    def get_properties(self, concept):
+        if concept in self._cache:
+            self._cache.move_to_end(concept)
+            return self._cache[concept]
+
+        cid = self._lookup_id(concept)
+        if cid is None:
+            return []
+
+        rows = self.conn.execute("""
+            SELECT s.text, r.text, o.text, t.label, l.text
+            FROM triples t
+            JOIN strings s ON s.id = t.subj
+            JOIN strings r ON r.id = t.rel
+            JOIN strings o ON o.id = t.obj
+            LEFT JOIN strings l ON l.id = t.label
+            WHERE t.concept = ?
+            ORDER BY t.seq
+        """, (cid,)).fetchall()
+
+        props = []
+        for subj, rel, obj, code, label in rows:
+            triple = (subj, rel, obj)
+            props.append(triple if code == self.PLAIN else (triple, label))
+
+        self._cache[concept] = props
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return props
+
+    def __contains__(self, concept):
+        cid = self._lookup_id(concept)
+        if cid is None:
+            return False
+        return self.conn.execute(
+            "SELECT 1 FROM concepts WHERE id = ?", (cid,)
+        ).fetchone() is not None
+
+    def concepts(self):
+        return [row[0] for row in self.conn.execute(
+            "SELECT s.text FROM concepts c JOIN strings s ON s.id = c.id"
+        )]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,7 +1,8 @@
+TOPIC_MARKERS = ["is", "was", "are", "has", "have", "created", "developed"]
+
 def classify_triple(triple):
-    topic_markers = ["is", "was", "are", "has", "have", "created", "developed"]
     subj, pred, obj = triple
-    if pred.lower() in topic_markers:
+    if pred.lower() in TOPIC_MARKERS:
         return "topic_marker"
     return "common"
 
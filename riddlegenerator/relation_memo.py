@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from riddlegenerator import ROOT
+
+RELATION_MEMO_PATH = os.path.join(ROOT, "lookup", "relation_memo.db")
+
+
+class RelationMemo:
+    """
+    Persistent LRU memo of (model, concept, keyword) -> relation in SQLite,
+    with a small in-process front cache.
+
+    put() and the last-used stamps of get() are buffered and written in one
+    transaction by flush() (extract_triples_from_summary flushes once per
+    extraction), not committed one row at a time. One memo is shared by
+    the bench's and the daemon's worker threads, so every method holds
+    the memo's lock.
+    """
+
+    def __init__(self, path=RELATION_MEMO_PATH, max_entries=200000, front_size=4096):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self.front_size = front_size
+        self._front = OrderedDict()
+        self._pending = {}
+        self._touched = {}
+        self._puts = 0
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS relations (
+                model     TEXT NOT NULL,
+                concept   TEXT NOT NULL,
+                keyword   TEXT NOT NULL,
+                relation  TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, concept, keyword)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS relations_lru ON relations (last_used);
+        """)
+
+    def _remember(self, key, relation):
+        self._front[key] = relation
+        self._front.move_to_end(key)
+        if len(self._front) > self.front_size:
+            self._front.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key][0]
+            if key in self._front:
+                self._front.move_to_end(key)
+                return self._front[key]
+            row = self.conn.execute(
+                "SELECT relation FROM relations WHERE model = ? AND concept = ? AND keyword = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key, relation):
+        with self._lock:
+            self._pending[key] = (relation, time.time())
+            self._remember(key, relation)
+
+    def flush(self):
+        """Write buffered answers and last-used stamps in one transaction."""
+        with self._lock:
+            if not self._pending and not self._touched:
+                return
+            pending, self._pending = self._pending, {}
+            touched, self._touched = self._touched, {}
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO relations VALUES (?, ?, ?, ?, ?)",
+                                      [(*key, rel, ts) for key, (rel, ts) in pending.items()])
+                self.conn.executemany(
+                    "UPDATE relations SET last_used = ? WHERE model = ? AND concept = ? AND keyword = ?",
+                    [(ts, *key) for key, ts in touched.items()],
+                )
+            before, self._puts = self._puts, self._puts + len(pending)
+            if before // 1000 != self._puts // 1000:
+                self.evict()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self.conn.close()
+
+    def evict(self):
+        """Drop least recently used entries beyond max_entries."""
+        with self._lock:
+            with self.conn:
+                excess = self.conn.execute("SELECT COUNT(*) FROM relations").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    self.conn.execute("""
+                        DELETE FROM relations WHERE (model, concept, keyword) IN (
+                            SELECT model, concept, keyword FROM relations ORDER BY last_used LIMIT ?)
+                    """, (excess,))
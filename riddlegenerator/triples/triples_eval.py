@@ -1,44 +1,264 @@
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import sys
 import time
-from riddle_generator.triples_creator import extract_triples
-import spacy
-from sklearn.metrics import precision_score, recall_score, f1_score
-
-# ground truth sample triples (you can expand this manually for a few test summaries)
-# These are for evaluation purposes — adjust as needed
-GROUND_TRUTH = {
-    "Python (programming language)": [
-        ("Python (programming language)", "is", "programming language"),
-        ("Python (programming language)", "supports", "object-oriented programming"),
-        ("Python (programming language)", "was created", "Guido van Rossum"),
-    ]
-}
-
-nlp = spacy.load("en_core_web_sm")
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from riddlegenerator.candidate_pruning import COUNT_KEYS, describe_counts
+
+GROUND_TRUTH_PATH = "data/zoology_triples.json"
+SUMMARY_CACHE_PATH = "data/json/summaries.json"
+DEFAULT_EXTRACTOR = "riddlegenerator.triples_extraction:extract_triples_with_counts"
+LATENCY_SAMPLE = 10
+
 
 def normalize_token(text):
     return text.lower().strip()
 
-def evaluate(concept):
+
+# -----------------------------
+# 1. Inputs: ground truth + cached summaries
+# -----------------------------
+def load_ground_truth(path=GROUND_TRUTH_PATH):
     """
-    Simple evaluation: compare extracted triples with ground truth
-    based on overlap of (subject, object) pairs.
+    Load {concept: [[subject, relation, object], ...]} (the zoology_triples.json
+    layout) into {concept: [(subject, relation, object), ...]}.
     """
-    print(f"\nEvaluating concept: {concept}")
-    start = time.time()
-    extracted = extract_triples(concept)
-    elapsed = time.time() - start
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return {concept: [tuple(t) for t in triples] for concept, triples in raw.items()}
+
+
+def load_summaries(concepts, cache_path=SUMMARY_CACHE_PATH, sentences=5):
+    """
+    Return {concept: summary}, fetching only the concepts missing from the
+    cache file and writing them back, so repeated runs never hit the network.
+    """
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+
+    missing = [c for c in concepts if c not in cache]
+    if missing:
+        from riddlegenerator.wiki_source import summary_source
+
+        for concept in missing:
+            try:
+                cache[concept] = summary_source().summary(concept, sentences=sentences)
+            except Exception as e:
+                print(f"[triples_eval] could not fetch summary for {concept}: {e}")
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2, ensure_ascii=False)
+
+    return {c: cache[c] for c in concepts if c in cache}
 
-    gt_triples = GROUND_TRUTH.get(concept, [])
+
+def load_extractor(spec):
+    """
+    Resolve "package.module:function" to a callable(concept, summary)
+    returning triples, or (triples, pruning counts) like
+    extract_triples_with_counts.
+    """
+    module_name, _, func_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+# -----------------------------
+# 2. Scoring
+# -----------------------------
+def score_triples(extracted, gt_triples):
+    """
+    Compare extracted triples with ground truth based on overlap of
+    (subject, object) pairs. Returns (true_pos, false_pos, false_neg).
+    """
     gt_pairs = {(normalize_token(s), normalize_token(o)) for (s, _, o) in gt_triples}
     extracted_pairs = {(normalize_token(s), normalize_token(o)) for (s, _, o) in extracted}
 
     true_pos = len(gt_pairs & extracted_pairs)
     false_pos = len(extracted_pairs - gt_pairs)
     false_neg = len(gt_pairs - extracted_pairs)
+    return true_pos, false_pos, false_neg
 
+
+def prf(true_pos, false_pos, false_neg):
     precision = true_pos / (true_pos + false_pos) if (true_pos + false_pos) else 0
     recall = true_pos / (true_pos + false_neg) if (true_pos + false_neg) else 0
     f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0
+    return precision, recall, f1
+
+
+def _timed_extract(extractor, concept, summary):
+    start = time.perf_counter()
+    counts = None
+    try:
+        extracted = extractor(concept, summary)
+        if isinstance(extracted, tuple):
+            extracted, counts = extracted
+        error = None
+    except Exception as e:
+        extracted, error = [], str(e)
+    return concept, extracted, time.perf_counter() - start, error, counts
+
+
+def sum_counts(per_concept):
+    """Pruning counts summed over the concepts that reported them, else None."""
+    reported = [r["pruning"] for r in per_concept.values() if r.get("pruning")]
+    if not reported:
+        return None
+    return {k: sum(c[k] for c in reported) for k in COUNT_KEYS}
+
+
+def percentiles(latencies):
+    latencies = np.asarray(latencies, dtype=float)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99),
+            "mean": float(latencies.mean()), "n": int(len(latencies))}
+
+
+def _memo_context(extractor):
+    """
+    (context, name): the extractor module's fresh_relation_memo() when it
+    has one, so the serial pass is not answered from the relation memo the
+    pool (or an earlier run) just filled.
+    """
+    fresh = getattr(sys.modules.get(getattr(extractor, "__module__", None)), "fresh_relation_memo", None)
+    if fresh is None:
+        return contextlib.nullcontext(), "extractor default"
+    return fresh(), "fresh (in-memory)"
+
+
+def serial_latency(extractor, concepts, summaries, sample=LATENCY_SAMPLE):
+    """
+    Latency percentiles from extracting up to `sample` concepts one at a
+    time, so no pool contention (GIL, shared cores) inflates them. "memo"
+    records which relation memo the pass ran with.
+    """
+    if sample <= 0 or not concepts:
+        return None
+    step = max(1, len(concepts) // sample)
+    chosen = concepts[::step][:sample]
+    context, memo = _memo_context(extractor)
+    with context:
+        latency = percentiles([_timed_extract(extractor, c, summaries[c])[2] for c in chosen])
+    latency["memo"] = memo
+    return latency
+
+
+# -----------------------------
+# 3. Parallel runner
+# -----------------------------
+def evaluate_extractor(extractor, ground_truth, summaries, workers=4, use_processes=False,
+                       latency_sample=LATENCY_SAMPLE):
+    """
+    Run one extractor over every concept that has both ground truth and a
+    summary, in parallel, and return micro/macro P/R/F1 plus latency
+    percentiles.
+
+    "latency" comes from a serial pass over `latency_sample` concepts,
+    with a fresh relation memo when the extractor has one;
+    "latency_under_load" is what each concept took inside the pool, which
+    includes contention between workers and memo hits, and is not a
+    per-call latency.
+    """
+    concepts = [c for c in ground_truth if c in summaries]
+    pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    per_concept = {}
+    wall_start = time.perf_counter()
+    with pool_cls(max_workers=workers) as pool:
+        futures = [pool.submit(_timed_extract, extractor, c, summaries[c]) for c in concepts]
+        for fut in futures:
+            concept, extracted, elapsed, error, counts = fut.result()
+            tp, fp, fn = score_triples(extracted, ground_truth[concept])
+            per_concept[concept] = {
+                "extracted": len(extracted),
+                "tp": tp, "fp": fp, "fn": fn,
+                "latency": elapsed,
+                "error": error,
+                "pruning": counts,
+            }
+    wall = time.perf_counter() - wall_start
+
+    if not per_concept:
+        raise ValueError("No concepts with both ground truth and a summary.")
+
+    micro = prf(*(sum(r[k] for r in per_concept.values()) for k in ("tp", "fp", "fn")))
+    macro = np.mean([prf(r["tp"], r["fp"], r["fn"]) for r in per_concept.values()], axis=0)
+    under_load = percentiles([r["latency"] for r in per_concept.values()])
+
+    return {
+        "concepts": len(per_concept),
+        "errors": sum(1 for r in per_concept.values() if r["error"]),
+        "micro": dict(zip(("precision", "recall", "f1"), map(float, micro))),
+        "macro": dict(zip(("precision", "recall", "f1"), map(float, macro))),
+        "latency": serial_latency(extractor, concepts, summaries, latency_sample),
+        "latency_under_load": under_load,
+        "pruning": sum_counts(per_concept),
+        "wall_time": wall,
+        "per_concept": per_concept,
+    }
+
+
+def run_evaluation(extractors, ground_truth_path=GROUND_TRUTH_PATH,
+                   summary_cache=SUMMARY_CACHE_PATH, concepts=None,
+                   workers=4, use_processes=False, latency_sample=LATENCY_SAMPLE):
+    """
+    Evaluate several extractors ({name: callable}) on the same concepts and
+    cached summaries, so quality and latency trade-offs land in one report.
+    """
+    ground_truth = load_ground_truth(ground_truth_path)
+    if concepts:
+        ground_truth = {c: ground_truth[c] for c in concepts if c in ground_truth}
+    summaries = load_summaries(list(ground_truth), summary_cache)
+
+    return {
+        name: evaluate_extractor(fn, ground_truth, summaries, workers, use_processes, latency_sample)
+        for name, fn in extractors.items()
+    }
+
+
+def print_report(report):
+    """p50/p95/p99 are serial latencies; load95 is p95 measured inside the pool."""
+    header = f"{'extractor':<40} {'n':>4} {'microP':>7} {'microR':>7} {'microF1':>7} " \
+             f"{'macroF1':>7} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8} {'load95(s)':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, r in report.items():
+        lat = r["latency"] or {}
+        serial = " ".join(f"{lat[p]:>8.3f}" if p in lat else f"{'-':>8}" for p in ("p50", "p95", "p99"))
+        print(f"{name:<40} {r['concepts']:>4} "
+              f"{r['micro']['precision']:>7.2f} {r['micro']['recall']:>7.2f} "
+              f"{r['micro']['f1']:>7.2f} {r['macro']['f1']:>7.2f} "
+              f"{serial} {r['latency_under_load']['p95']:>9.3f}")
+    for name, r in report.items():
+        if r.get("pruning"):
+            print(f"{name} pruning: {describe_counts(r['pruning'])}")
+    memos = sorted({r["latency"]["memo"] for r in report.values() if r["latency"]})
+    if memos:
+        print(f"serial latency relation memo: {', '.join(memos)}")
+
+
+def evaluate(concept, ground_truth_path=GROUND_TRUTH_PATH):
+    """
+    Simple evaluation of the default extractor on a single concept.
+    """
+    from riddlegenerator.triples_extraction import extract_triples
+
+    print(f"\nEvaluating concept: {concept}")
+    start = time.time()
+    extracted = extract_triples(concept)
+    elapsed = time.time() - start
+
+    gt_triples = load_ground_truth(ground_truth_path).get(concept, [])
+    precision, recall, f1 = prf(*score_triples(extracted, gt_triples))
 
     print(f"Extracted {len(extracted)} triples in {elapsed:.2f}s")
     print(f"Precision: {precision:.2f}, Recall: {recall:.2f}, F1: {f1:.2f}")
@@ -48,5 +268,34 @@ def evaluate(concept):
     for t in extracted[:8]:
         print(f"  {t}")
 
+
 if __name__ == "__main__":
-    evaluate("Python (programming language)")
+    parser = argparse.ArgumentParser(description="Evaluate triple extractors against ground truth.")
+    parser.add_argument("--ground-truth", default=GROUND_TRUTH_PATH)
+    parser.add_argument("--summaries", default=SUMMARY_CACHE_PATH)
+    parser.add_argument("--extractor", action="append",
+                        help="module:function taking (concept, summary); repeatable")
+    parser.add_argument("--concepts", nargs="*")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true",
+                        help="use a process pool instead of threads")
+    parser.add_argument("--latency-sample", type=int, default=LATENCY_SAMPLE,
+                        help="concepts re-run serially for the latency percentiles (0 = skip)")
+    parser.add_argument("--out", help="optional JSON report path")
+    args = parser.parse_args()
+
+    specs = args.extractor or [DEFAULT_EXTRACTOR]
+    report = run_evaluation(
+        {spec: load_extractor(spec) for spec in specs},
+        ground_truth_path=args.ground_truth,
+        summary_cache=args.summaries,
+        concepts=args.concepts,
+        workers=args.workers,
+        use_processes=args.processes,
+        latency_sample=args.latency_sample,
+    )
+    print_report(report)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
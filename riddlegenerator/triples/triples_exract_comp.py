@@ -1,10 +1,11 @@
-import wikipedia
 import nltk
 import spacy
 from neural_extractors import Extractor
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from riddlegenerator.wiki_source import summary_source
+
 # Download NLTK resources if not already present
 nltk.download('punkt')
 nltk.download('averaged_perceptron_tagger')
@@ -80,7 +81,7 @@ def compute_content_score(triples_a, triples_b):
 # -----------------------------
 def compare_extractors(concept):
     print(f"\n🔍 Comparing Triple Extractors for: {concept}")
-    summary = wikipedia.summary(concept, sentences=5)
+    summary = summary_source().summary(concept, sentences=5)
 
     triples_nltk = nltk_triples(summary)
     triples_spacy = spacy_triples(summary)
@@ -1,13 +1,14 @@
-import wikipedia
 import spacy
 
+from riddlegenerator.wiki_source import summary_source
+
 nlp = spacy.load("en_core_web_sm")
 
 def extract_triples(concept):
     """
     Extract subject-predicate-object triples from Wikipedia summary.
     """
-    summary = wikipedia.summary(concept)
+    summary = summary_source().summary(concept)
     doc = nlp(summary)
     triples = []
 
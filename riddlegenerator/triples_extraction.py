@@ -1,13 +1,91 @@
-import wikipedia
+import hashlib
+import json
+import time
+from contextlib import contextmanager
+
 import torch
 from transformers import BertTokenizer, BertForMaskedLM
 import spacy
 from rake_nltk import Rake
 
+from riddlegenerator.candidate_pruning import PRUNE_TOP_N, default_background, prune_candidates
+from riddlegenerator.properties_identifier import TOPIC_MARKERS
+from riddlegenerator.relation_memo import RelationMemo
+from riddlegenerator.wiki_source import summary_source
+
 # Load NLP tools
 nlp = spacy.load("en_core_web_sm")
 tokenizer = BertTokenizer.from_pretrained("bert-base-uncased")
 model = BertForMaskedLM.from_pretrained("bert-base-uncased")
+model.eval()
+
+# Model actually used by predict_relation; configure_inference() swaps it
+# for a quantized / traced copy while `model` stays the fp32 reference.
+inference_model = model
+# what inference_model is ("fp32", "int8", "fp32+jit", "int8+jit"); part of
+# the relation memo key, since quantized/traced answers can differ
+inference_config = "fp32"
+
+# TorchScript traces are shape-specialised, so traced models get inputs
+# padded to this length.
+JIT_SEQ_LEN = 32
+
+def configure_inference(quantize=False, intra_op_threads=None, inter_op_threads=None, jit=False):
+    """
+    CPU inference setup for the relation MLM:
+      - quantize: dynamic int8 quantization of the BERT Linear layers
+      - intra_op_threads / inter_op_threads: explicit torch thread pools
+        (inter-op can only be set before torch runs any parallel work)
+      - jit: trace the model with TorchScript (inputs padded to JIT_SEQ_LEN)
+    Returns the configured model, which predict_relation and
+    RelationScorer then use.
+    """
+    global inference_model, inference_config
+
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as e:
+            print(f"[triples_extraction] inter-op threads already fixed: {e}")
+
+    inference_model, inference_config = build_inference_model(quantize, jit)
+    print(f"[triples_extraction] relation model: {inference_config}, {torch.get_num_threads()} threads")
+    return inference_model
+
+def build_inference_model(quantize=False, jit=False):
+    """(model, config tag) for the settings; the active model is left alone."""
+    mlm = model
+    if quantize:
+        mlm = torch.ao.quantization.quantize_dynamic(mlm, {torch.nn.Linear}, dtype=torch.qint8)
+    if jit:
+        example = _tokenize("[CLS] concept [MASK] keyword . [SEP]", jit=True)
+        with torch.no_grad():
+            mlm = torch.jit.trace(mlm, (example["input_ids"], example["attention_mask"]), strict=False)
+    return mlm, ("int8" if quantize else "fp32") + ("+jit" if jit else "")
+
+
+def inference_tag(mlm):
+    """inference_config for a model handed to predict_relation / RelationScorer."""
+    if mlm is inference_model:
+        return inference_config
+    if mlm is model:
+        return "fp32"
+    # some other copy: never share memo entries with it across processes
+    return f"custom-{id(mlm):x}"
+
+def _tokenize(text, jit=False):
+    if jit:
+        return tokenizer(text, return_tensors="pt", padding="max_length",
+                         max_length=JIT_SEQ_LEN, truncation=True)
+    return tokenizer(text, return_tensors="pt")
+
+def _mlm_logits(mlm, inputs):
+    if isinstance(mlm, torch.jit.ScriptModule):
+        out = mlm(inputs["input_ids"], inputs["attention_mask"])
+        return out["logits"] if isinstance(out, dict) else out[0]
+    return mlm(**inputs).logits
 
 def get_keywords(summary, num_keywords=15):
     """Extract keywords from text using RAKE."""
@@ -16,23 +94,30 @@ def get_keywords(summary, num_keywords=15):
     ranked = rake.get_ranked_phrases()[:num_keywords]
     return ranked
 
-def get_pos_tokens(summary):
+def get_scored_keywords(summary):
+    """All RAKE phrases as (score, phrase), best first."""
+    rake = Rake()
+    rake.extract_keywords_from_text(summary)
+    return rake.get_ranked_phrases_with_scores()
+
+def get_pos_tokens(summary, doc=None):
     """Get nouns, verbs, adjectives, adverbs from the summary."""
-    doc = nlp(summary)
+    doc = doc or nlp(summary)
     pos_tokens = [token.text for token in doc if token.pos_ in ["NOUN", "VERB", "ADJ", "ADV"]]
     return list(set(pos_tokens))
 
-def predict_relation(concept, keyword, top_k=1):
+def predict_relation(concept, keyword, top_k=1, mlm=None):
     """
     Use BERT MLM to find the most likely relation between concept and keyword.
     We use a masked template: "[CLS] <concept> [MASK] <keyword> . [SEP]"
     """
+    mlm = mlm or inference_model
     template = f"[CLS] {concept} [MASK] {keyword} . [SEP]"
-    inputs = tokenizer(template, return_tensors="pt")
+    inputs = _tokenize(template, jit=isinstance(mlm, torch.jit.ScriptModule))
     mask_token_index = torch.where(inputs["input_ids"] == tokenizer.mask_token_id)[1]
 
-    with torch.no_grad():
-        logits = model(**inputs).logits
+    with torch.inference_mode():
+        logits = _mlm_logits(mlm, inputs)
 
     mask_token_logits = logits[0, mask_token_index, :]
     top_tokens = torch.topk(mask_token_logits, top_k, dim=1).indices[0].tolist()
@@ -40,6 +125,74 @@ def predict_relation(concept, keyword, top_k=1):
 
     return relations[0] if relations else "related_to"
 
+# Relations worth predicting: the verbs classify_triple keys on plus a
+# domain list. Anything else in the 30k vocabulary is never a relation.
+DOMAIN_RELATIONS = [
+    "can", "uses", "eats", "lives", "hunts", "belongs", "includes", "contains",
+    "produces", "supports", "provides", "makes", "lays", "breathes", "feeds",
+    "resembles", "means", "became", "were", "had",
+]
+
+class RelationScorer:
+    """
+    predict_relation restricted to a relation whitelist: only the logits of
+    the whitelisted tokens are gathered at the mask, and every
+    (model, concept, keyword) answer is memoised on disk so re-ingesting a
+    concept costs no inference. The memo's model key covers the model
+    name, the whitelist and the inference configuration (inference_tag).
+    """
+
+    def __init__(self, relations=None, memo=None, model_name="bert-base-uncased"):
+        relations = relations or TOPIC_MARKERS + DOMAIN_RELATIONS
+        vocab = tokenizer.get_vocab()
+        # keep whitelist entries that are a single wordpiece
+        self.relations = [r for r in dict.fromkeys(r.lower() for r in relations) if r in vocab]
+        self.token_ids = torch.tensor([vocab[r] for r in self.relations])
+        self.memo = memo if memo is not None else RelationMemo()
+        signature = hashlib.sha1(" ".join(self.relations).encode()).hexdigest()[:8]
+        self.model_key = f"{model_name}:{signature}"
+
+    def score(self, concept, keyword, mlm=None):
+        mlm = mlm or inference_model
+        key = (f"{self.model_key}:{inference_tag(mlm)}", concept, keyword)
+        cached = self.memo.get(key)
+        if cached is not None:
+            return cached
+
+        template = f"[CLS] {concept} [MASK] {keyword} . [SEP]"
+        inputs = _tokenize(template, jit=isinstance(mlm, torch.jit.ScriptModule))
+        mask_token_index = torch.where(inputs["input_ids"] == tokenizer.mask_token_id)[1]
+
+        with torch.inference_mode():
+            logits = _mlm_logits(mlm, inputs)
+
+        scores = logits[0, mask_token_index[0], self.token_ids]
+        relation = self.relations[int(torch.argmax(scores))]
+        self.memo.put(key, relation)
+        return relation
+
+_default_scorer = None
+
+def get_relation_scorer():
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = RelationScorer()
+    return _default_scorer
+
+@contextmanager
+def fresh_relation_memo():
+    """
+    Score with an empty in-memory memo, then put the on-disk one back:
+    timing runs see real inference, not answers memoised by earlier runs.
+    """
+    scorer = get_relation_scorer()
+    saved, scorer.memo = scorer.memo, RelationMemo(":memory:")
+    try:
+        yield scorer.memo
+    finally:
+        scorer.memo.close()
+        scorer.memo = saved
+
 def extract_triples(concept):
     """
     Extract (subject, relation, object) triples from Wikipedia summaries using:
@@ -47,21 +200,106 @@ def extract_triples(concept):
       - POS tagging for key tokens
       - BERT MLM for relations
     """
+    return extract_concept(concept)[0]
+
+def extract_concept(concept):
+    """extract_triples plus the pruning counts: (triples, counts)."""
     try:
-        summary = wikipedia.summary(concept, sentences=5)
+        summary = summary_source().summary(concept, sentences=5)
     except Exception as e:
         raise RuntimeError(f"Could not fetch Wikipedia summary for {concept}: {e}")
 
-    keywords = get_keywords(summary)
-    pos_tokens = get_pos_tokens(summary)
-    combined_candidates = list(set(keywords + pos_tokens))
+    return extract_triples_with_counts(concept, summary)
+
+def extract_triples_from_summary(concept, summary, top_n=PRUNE_TOP_N, min_score=None):
+    """
+    Same as extract_triples, but on an already fetched summary so callers
+    (e.g. the evaluation harness) can work from cached text.
+    Candidates are cut to the top_n by cheap scores (RAKE, TF-IDF,
+    stopword/length filters, lemma dedup) before any BERT call, so the
+    inference per concept is bounded whatever the summary length;
+    top_n=None sends every candidate as before.
+    """
+    return extract_triples_with_counts(concept, summary, top_n, min_score)[0]
 
+def extract_triples_with_counts(concept, summary, top_n=PRUNE_TOP_N, min_score=None):
+    """
+    extract_triples_from_summary plus the pruning counts (kept, filtered,
+    lemma duplicates, below cut; see prune_candidates), or None for
+    top_n=None.
+    """
+    doc = nlp(summary)
+    pos_tokens = get_pos_tokens(summary, doc)
+
+    counts = None
+    if top_n is None:
+        combined_candidates = list(set(get_keywords(summary) + pos_tokens))
+    else:
+        lemmas = {t.text.lower(): t.lemma_.lower() for t in doc}
+        combined_candidates, counts = prune_candidates(
+            concept, summary, get_scored_keywords(summary), pos_tokens,
+            top_n=top_n, min_score=min_score, background=default_background(), lemmas=lemmas,
+        )
+
+    scorer = get_relation_scorer()
     triples = []
-    for kw in combined_candidates:
-        relation = predict_relation(concept, kw)
-        triples.append((concept, relation, kw))
+    try:
+        for kw in combined_candidates:
+            relation = scorer.score(concept, kw)
+            triples.append((concept, relation, kw))
+    finally:
+        # one memo transaction per extraction
+        scorer.memo.flush()
+
+    return triples, counts
+
+def extract_triples_unpruned(concept, summary):
+    """Every RAKE/POS candidate, no pruning: baseline for triples_eval."""
+    return extract_triples_from_summary(concept, summary, top_n=None)
+
+def held_out_pairs(path="data/zoology_triples.json", concepts=None):
+    """(concept, keyword) pairs taken from a ground-truth triples file."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return [(c, obj) for c, triples in raw.items()
+            if not concepts or c in concepts
+            for _, _, obj in triples]
+
+def relation_agreement(pairs, quantize=False, jit=False, intra_op_threads=None):
+    """
+    Compare the relations extraction would pick (RelationScorer over the
+    whitelist) with the fp32 model and with a quantize/jit setup, on the
+    same (concept, keyword) pairs; reports agreement and pairs/second for
+    both. Each side scores with its own empty in-memory memo, so nothing
+    is answered from earlier runs. The active model and the intra-op
+    thread count are restored afterwards.
+    """
+    fast, config = build_inference_model(quantize, jit)
+    threads = torch.get_num_threads()
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+
+    timings, answers = {}, {}
+    try:
+        for name, mlm in (("fp32", model), (config, fast)):
+            scorer = RelationScorer(memo=RelationMemo(":memory:"))
+            start = time.perf_counter()
+            answers[name] = [scorer.score(c, k, mlm=mlm) for c, k in pairs]
+            timings[name] = time.perf_counter() - start
+            scorer.memo.close()
+        used_threads = torch.get_num_threads()
+    finally:
+        torch.set_num_threads(threads)
 
-    return triples
+    agree = sum(a == b for a, b in zip(answers["fp32"], answers[config]))
+    return {
+        "pairs": len(pairs),
+        "config": config,
+        "top1_agreement": agree / len(pairs) if pairs else 0.0,
+        "fp32_pairs_per_sec": len(pairs) / timings["fp32"] if timings["fp32"] else 0.0,
+        "configured_pairs_per_sec": len(pairs) / timings[config] if timings[config] else 0.0,
+        "threads": used_threads,
+    }
 
 if __name__ == "__main__":
     concept = "Python (programming language)"
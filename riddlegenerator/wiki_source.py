@@ -0,0 +1,222 @@
+# Offline Wikipedia summaries: serve summary(title, sentences=n) from a local
+# JSONL extract or a bz2 multistream dump through a one-time title -> offset
+# index, for workers without network access.
+import bz2
+import json
+import os
+import re
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+
+
+class PageNotFound(LookupError):
+    pass
+
+
+def title_key(title: str) -> str:
+    return " ".join(title.replace("_", " ").split()).casefold()
+
+
+# ---------------------------------------------------------
+# Minimal wikitext -> plain text for the lead section
+# ---------------------------------------------------------
+def _strip_nested(text, open_tok, close_tok):
+    out, depth, i = [], 0, 0
+    while i < len(text):
+        if text.startswith(open_tok, i):
+            depth += 1
+            i += len(open_tok)
+        elif depth and text.startswith(close_tok, i):
+            depth -= 1
+            i += len(close_tok)
+        else:
+            if not depth:
+                out.append(text[i])
+            i += 1
+    return "".join(out)
+
+
+def wikitext_to_plain(text: str) -> str:
+    text = text.split("\n==", 1)[0]
+    text = _strip_nested(text, "{{", "}}")
+    text = _strip_nested(text, "{|", "|}")
+    text = re.sub(r"<ref[^>]*/>", "", text)
+    text = re.sub(r"<ref.*?</ref>", "", text, flags=re.S)
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.S)
+    text = re.sub(r"\[\[(?:File|Image|Category):[^\]]*\]\]", "", text)
+    text = re.sub(r"\[\[(?:[^\]|]*\|)?([^\]]*)\]\]", r"\1", text)
+    text = re.sub(r"\[https?://\S+ ([^\]]*)\]", r"\1", text)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = text.replace("'''", "").replace("''", "")
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def first_sentences(text: str, sentences: int = 0) -> str:
+    if not sentences:
+        return text
+    parts = re.split(r"(?<=[.!?])\s+(?=[A-Z0-9\"(])", " ".join(text.split()))
+    return " ".join(parts[:sentences])
+
+
+class OfflineWikipedia:
+    """
+    The title -> offset index is rebuilt whenever it does not match the
+    dump: it records the size and mtime of the dump (and multistream
+    index) it was built from, and is written to a temporary file that only
+    replaces index_path once complete, so an interrupted build never
+    leaves a partial index behind.
+    """
+
+    def __init__(self, dump_path, multistream_index=None, index_path=None, cache_size=4096):
+        self.dump_path = dump_path
+        self.multistream = dump_path.endswith(".bz2")
+        if self.multistream and not multistream_index:
+            raise ValueError("A bz2 multistream dump needs its -multistream-index.txt.bz2 file")
+        self.multistream_index = multistream_index
+        self.index_path = index_path or f"{dump_path}.idx.sqlite"
+
+        self.conn = None
+        if not self.index_current():
+            self.build_index()
+        self.conn = sqlite3.connect(self.index_path, check_same_thread=False)
+
+        self._dump = open(dump_path, "rb")
+        self._lock = threading.Lock()
+        self.summary = lru_cache(maxsize=cache_size)(self._summary)
+
+    # ------------------------------------------
+    # One-time index build
+    # ------------------------------------------
+    def dump_signature(self) -> str:
+        """size:mtime_ns of the dump (and multistream index) the index is built from."""
+        paths = [self.dump_path] + ([self.multistream_index] if self.multistream else [])
+        return ";".join(f"{st.st_size}:{st.st_mtime_ns}" for st in map(os.stat, paths))
+
+    def index_current(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            conn = sqlite3.connect(self.index_path)
+            try:
+                row = conn.execute("SELECT value FROM meta WHERE name = 'dump'").fetchone()
+            finally:
+                conn.close()
+        except sqlite3.DatabaseError:
+            # empty, truncated or pre-meta index
+            return False
+        return row is not None and row[0] == self.dump_signature()
+
+    def build_index(self):
+        # taken before reading, so a dump replaced mid-build is re-indexed next time
+        signature = self.dump_signature()
+        tmp_path = f"{self.index_path}.tmp-{os.getpid()}"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        def rows():
+            if self.multistream:
+                # lines look like "offset:page_id:title"
+                with bz2.open(self.multistream_index, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        offset, _, title = line.rstrip("\n").split(":", 2)
+                        yield title_key(title), int(offset)
+            else:
+                with open(self.dump_path, "rb") as f:
+                    offset = 0
+                    for line in f:
+                        if line.strip():
+                            yield title_key(json.loads(line)["title"]), offset
+                        offset += len(line)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            with conn:
+                conn.execute("CREATE TABLE pages (title TEXT PRIMARY KEY, offset INTEGER) WITHOUT ROWID")
+                conn.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+                conn.executemany("INSERT OR IGNORE INTO pages VALUES (?, ?)", rows())
+                conn.execute("INSERT INTO meta VALUES ('dump', ?)", (signature,))
+        except BaseException:
+            conn.close()
+            os.remove(tmp_path)
+            raise
+        conn.close()
+
+        os.replace(tmp_path, self.index_path)
+        if self.conn is not None:
+            # rebuilt while open: reconnect to the new file
+            self.conn.close()
+            self.conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        print(f"[wiki_source] indexed {self.dump_path} -> {self.index_path}")
+
+    # ------------------------------------------
+    # Random access
+    # ------------------------------------------
+    def _offset(self, title):
+        with self._lock:
+            row = self.conn.execute("SELECT offset FROM pages WHERE title = ?", (title_key(title),)).fetchone()
+        if row is None:
+            raise PageNotFound(f"'{title}' not in offline dump {self.dump_path}")
+        return row[0]
+
+    def _read_stream(self, offset):
+        self._dump.seek(offset)
+        decomp = bz2.BZ2Decompressor()
+        chunks = []
+        while not decomp.eof:
+            block = self._dump.read(256 * 1024)
+            if not block:
+                break
+            chunks.append(decomp.decompress(block))
+        return b"".join(chunks).decode("utf-8")
+
+    def page_text(self, title, _follow_redirect=True):
+        """Plain text of the page's lead section."""
+        offset = self._offset(title)
+
+        if not self.multistream:
+            with self._lock:
+                self._dump.seek(offset)
+                line = self._dump.readline()
+            return json.loads(line)["text"].split("\n\n", 1)[0]
+
+        with self._lock:
+            chunk = self._read_stream(offset)
+        root = ET.fromstring(f"<pages>{chunk}</pages>")
+        key = title_key(title)
+        for page in root.iter("page"):
+            if title_key(page.findtext("title", "")) != key:
+                continue
+            redirect = page.find("redirect")
+            if redirect is not None and _follow_redirect:
+                return self.page_text(redirect.get("title"), _follow_redirect=False)
+            return wikitext_to_plain(page.findtext("revision/text", ""))
+        raise PageNotFound(f"'{title}' indexed but missing from its stream")
+
+    def _summary(self, title, sentences=0):
+        return first_sentences(self.page_text(title), sentences)
+
+    def close(self):
+        self._dump.close()
+        self.conn.close()
+
+
+_source = None
+
+
+def summary_source():
+    """
+    Object with a wikipedia-compatible .summary(title, sentences=n):
+    OfflineWikipedia when RIDDLEQUEST_WIKI_DUMP points at a dump
+    (RIDDLEQUEST_WIKI_INDEX for the multistream index), else `wikipedia`.
+    """
+    global _source
+    if _source is None:
+        dump = os.environ.get("RIDDLEQUEST_WIKI_DUMP")
+        if dump:
+            _source = OfflineWikipedia(dump, os.environ.get("RIDDLEQUEST_WIKI_INDEX"))
+        else:
+            import wikipedia
+            _source = wikipedia
+    return _source
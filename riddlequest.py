@@ -0,0 +1,331 @@
+"""
+riddlequest: single entry point for the RiddleQuest toolchain.
+
+    python riddlequest.py <command> [options]
+
+Heavy libraries (torch, transformers, sentence-transformers, sklearn,
+matplotlib) are imported inside the command that needs them, so
+`lookup`, `generate` and `validate` start without loading any model.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# src/ modules import each other by bare name
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+
+# ---------------------------------------------------------
+# Commands
+# ---------------------------------------------------------
+def inference_options(args) -> dict:
+    """configure_inference keyword arguments from --quantize/--jit/--threads/--interop-threads."""
+    options = {
+        "quantize": args.quantize_relations,
+        "jit": args.jit,
+        "intra_op_threads": args.threads,
+        "inter_op_threads": args.interop_threads,
+    }
+    return {k: v for k, v in options.items() if v}
+
+
+def configure_extraction(args, command):
+    """Apply the inference options to in-process extraction (models load here)."""
+    options = inference_options(args)
+    if not options:
+        return
+    from riddlegenerator.extraction_daemon import daemon_running
+
+    if command == "ingest" and daemon_running():
+        print("[ingest] the extraction daemon is running: its inference settings apply "
+              "(pass them to `serve`)")
+        return
+    from riddlegenerator.triples_extraction import configure_inference
+
+    configure_inference(**options)
+
+
+def cmd_ingest(args):
+    if args.structured:
+        import json
+        from triple_loader import ingest_structured
+
+        lookup, riddles = ingest_structured(args.structured, args.templates, args.lookup, args.classified)
+        if args.riddles:
+            with open(args.riddles, "w", encoding="utf-8") as f:
+                json.dump({"riddles": riddles}, f, indent=2, ensure_ascii=False)
+        print(f"[ingest] {len(lookup['concept_to_props'])} concepts, {len(riddles)} riddles")
+        return
+
+    configure_extraction(args, "ingest")
+    from main import run_pipeline
+    run_pipeline()
+
+
+def cmd_classify(args):
+    import json
+    from classifier import NeighborClassifier
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    classifier = NeighborClassifier(data, n_neighbors=args.k)
+
+    index = None
+    if args.quantized:
+        from quantize import load_for_classifier
+
+        index = load_for_classifier(classifier, args.quantized, rerank=args.rerank)
+    if args.agreement:
+        from quantize import label_agreement
+
+        report = label_agreement(classifier, args.mode, args.threshold, rerank=args.rerank, index=index)
+        print(json.dumps(report, indent=2))
+        return
+    if index is not None:
+        classifier.knn = index
+
+    if args.calibrate:
+        from calibrate import DEFAULT_KS, DEFAULT_THRESHOLDS, calibrate, parse_grid, print_calibration
+
+        thresholds = parse_grid(args.thresholds) if args.thresholds else DEFAULT_THRESHOLDS
+        report = calibrate(classifier, thresholds, args.ks or DEFAULT_KS, samples=args.samples)
+        print_calibration(report)
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        return
+
+    output = classifier.classify_all(args.threshold)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"[classify] saved {args.out}")
+
+
+def cmd_embed(args):
+    from embedder import TripleEmbedder
+
+    embedder = TripleEmbedder(args.triples, args.out, model_name=args.model)
+    embedder.create_embeddings(keep=False)
+    if args.quantize:
+        embedder.save_quantized(f"{os.path.splitext(args.out)[0]}.{args.quantize}.npz", args.quantize)
+
+
+def cmd_lookup(args):
+    from lookup_builder import build_lookup
+
+    build_lookup(args.triples, args.out, consolidate=args.consolidate, threshold=args.threshold,
+                 shards=args.shards)
+
+
+def cmd_generate(args):
+    from generator import RiddleGenerator
+
+    similarity = None
+    if args.similarity_matrix:
+        from similarity import ConceptSimilarity
+        similarity = ConceptSimilarity.from_saved(args.similarity_matrix)
+    elif args.similarity_lookup:
+        from similarity import ConceptSimilarity
+        similarity = ConceptSimilarity.from_lookup(args.similarity_lookup)
+
+    gen = RiddleGenerator(args.triples, args.templates, similarity=similarity, lookup=args.lookup)
+    riddles = gen.generate_all()
+    gen.save(args.out, riddles)
+    print(f"[generate] {len(riddles)} riddles -> {args.out}")
+
+
+def cmd_validate(args):
+    from validator import validate_riddles, validate_riddles_parallel
+
+    if args.shards or args.shard_addr:
+        from sharding import ShardedValidator, validate_riddles_sharded
+
+        if args.shards:
+            validator = ShardedValidator.from_manifest(args.shards)
+        else:
+            validator = ShardedValidator(addresses=args.shard_addr)
+        with validator:
+            validate_riddles_sharded(args.riddles, validator, args.out, audit=args.audit)
+    elif args.workers == 1:
+        validate_riddles(args.riddles, args.lookup, args.out, audit=args.audit)
+    else:
+        validate_riddles_parallel(args.riddles, args.lookup, args.out, workers=args.workers,
+                                  audit=args.audit)
+
+    if args.semantic:
+        from semantic_solver import SemanticSolver, rerank_file
+
+        count = rerank_file(SemanticSolver(args.semantic), args.out)
+        print(f"[validate] semantic re-ranking applied to {count} riddles")
+
+
+def cmd_serve(args):
+    from riddlegenerator.extraction_daemon import ExtractionDaemon
+
+    ExtractionDaemon(args.socket, fetch_workers=args.fetch_workers,
+                     inference=inference_options(args)).serve_forever()
+
+
+def cmd_shard(args):
+    from sharding import serve_shard
+
+    serve_shard(args.lookup, args.listen)
+
+
+def cmd_bench(args):
+    from riddlegenerator.triples.triples_eval import (
+        DEFAULT_EXTRACTOR, load_extractor, print_report, run_evaluation,
+    )
+
+    configure_extraction(args, "bench")
+    if args.agreement:
+        import json
+        from riddlegenerator.triples_extraction import held_out_pairs, relation_agreement
+
+        options = inference_options(args)
+        agreement = relation_agreement(
+            held_out_pairs(args.ground_truth, args.concepts), quantize=options.get("quantize", False),
+            jit=options.get("jit", False), intra_op_threads=options.get("intra_op_threads"),
+        )
+        print(json.dumps(agreement, indent=2))
+        return
+
+    specs = args.extractor or [DEFAULT_EXTRACTOR]
+    report = run_evaluation(
+        {spec: load_extractor(spec) for spec in specs},
+        ground_truth_path=args.ground_truth,
+        summary_cache=args.summaries,
+        concepts=args.concepts,
+        workers=args.workers,
+        latency_sample=args.latency_sample,
+    )
+    print_report(report)
+
+
+# ---------------------------------------------------------
+# Parser
+# ---------------------------------------------------------
+def add_inference_args(p):
+    g = p.add_argument_group("relation model inference (CPU)")
+    g.add_argument("--quantize", dest="quantize_relations", action="store_true",
+                   help="dynamic int8 quantization of the relation MLM")
+    g.add_argument("--jit", action="store_true", help="trace the relation MLM with TorchScript")
+    g.add_argument("--threads", type=int, help="torch intra-op threads")
+    g.add_argument("--interop-threads", type=int, help="torch inter-op threads")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="riddlequest", description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="extract triples for concepts (interactive) or load a structured file")
+    p.add_argument("--structured", help="[subject, relation, object] JSON file; skips extraction")
+    p.add_argument("--templates", default="templates/templates.json")
+    p.add_argument("--lookup", default="lookup/lookup.json")
+    p.add_argument("--classified", help="also save the classified triples here")
+    p.add_argument("--riddles", help="also save generated riddles here")
+    add_inference_args(p)
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("classify", help="label triples topic_marker/common by KNN neighbours")
+    p.add_argument("--data", default="data/json/sample_data.json")
+    p.add_argument("--out", default="data/json/triples_class.json")
+    p.add_argument("--threshold", type=float, default=0.65)
+    p.add_argument("-k", type=int, default=3)
+    p.add_argument("--calibrate", action="store_true",
+                   help="sweep thresholds and k from one KNN query and recommend a setting")
+    p.add_argument("--thresholds", help="sweep grid, start:stop:step or comma list (default 0.30:0.95:0.05)")
+    p.add_argument("--ks", type=int, nargs="+", help="k values to sweep (default 2 3 5 8)")
+    p.add_argument("--samples", type=int, default=64,
+                   help="simulated generator draws per concept for the uniqueness estimate")
+    p.add_argument("--report", help="also save the calibration table as JSON")
+    p.add_argument("--quantized", help="search this `embed --quantize` .npz instead of exact KNN")
+    p.add_argument("--rerank", action="store_true",
+                   help="re-score the quantized candidates with the float32 embeddings")
+    p.add_argument("--agreement", action="store_true",
+                   help="only report label/neighbour agreement of the quantized index with exact KNN")
+    p.add_argument("--mode", choices=["float16", "int8"], default="int8",
+                   help="quantization for --agreement without --quantized")
+    p.set_defaults(func=cmd_classify)
+
+    p = sub.add_parser("embed", help="embed classified triples")
+    p.add_argument("--triples", default="data/json/triples_class.json")
+    p.add_argument("--out", default="data/json/embeddings.json")
+    p.add_argument("--model", default="all-MiniLM-L6-v2")
+    p.add_argument("--quantize", choices=["float16", "int8"])
+    p.set_defaults(func=cmd_embed)
+
+    p = sub.add_parser("lookup", help="build lookup.json from classified triples")
+    p.add_argument("--triples", default="data/json/triples_class.json")
+    p.add_argument("--out", default="lookup/lookup.json")
+    p.add_argument("--consolidate", action="store_true", help="merge near-duplicate properties")
+    p.add_argument("--threshold", type=float, default=0.7, help="shingle Jaccard needed to merge")
+    p.add_argument("--shards", type=int, help="also write N concept-hash shards and a manifest")
+    p.set_defaults(func=cmd_lookup)
+
+    p = sub.add_parser("generate", help="generate riddles from classified triples")
+    p.add_argument("--triples", default="data/json/triples_class.json")
+    p.add_argument("--templates", default="templates/templates.json")
+    p.add_argument("--out", default="data/json/riddles_with_answers.json")
+    p.add_argument("--similarity-lookup", help="lookup.json used to pick the hardest neighbour")
+    p.add_argument("--similarity-matrix", help="precomputed similarity .npz (ConceptSimilarity.save) "
+                                               "used instead of --similarity-lookup")
+    p.add_argument("--lookup", help="lookup.json whose property_ids the clue records should carry")
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("validate", help="solve generated riddles against the lookup")
+    p.add_argument("--riddles", default="data/json/riddles_with_answers.json")
+    p.add_argument("--lookup", default="lookup/lookup.json")
+    p.add_argument("--out", default="data/json/riddles_validated.jsonl")
+    p.add_argument("--workers", type=int, default=None,
+                   help="process count (default: all cores); 1 = serial, single JSON output")
+    p.add_argument("--semantic", metavar="EMBEDDINGS",
+                   help="embeddings.json for a second-stage semantic re-ranking of the answers")
+    p.add_argument("--shards", metavar="MANIFEST",
+                   help="lookup.shards.json: solve over local shard workers instead of --lookup")
+    p.add_argument("--shard-addr", action="append", metavar="HOST:PORT",
+                   help="remote shard served by `riddlequest.py shard`; repeatable")
+    p.add_argument("--audit", action="store_true",
+                   help="re-derive clues by scanning the riddle text and compare with the clue records")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("serve", help="keep extraction models warm for `ingest` sessions")
+    p.add_argument("--socket", help="Unix socket path (default: $RIDDLEQUEST_DAEMON_SOCKET "
+                                    "or ~/.cache/riddlequest/extract.sock)")
+    p.add_argument("--fetch-workers", type=int, default=4)
+    add_inference_args(p)
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("shard", help="serve one lookup shard to sharded validators")
+    p.add_argument("--lookup", required=True, help="a lookup.shard-XX-of-NN.json file")
+    p.add_argument("--listen", default="localhost:7100", metavar="HOST:PORT")
+    p.set_defaults(func=cmd_shard)
+
+    p = sub.add_parser("bench", help="evaluate triple extractors (quality + latency)")
+    p.add_argument("--ground-truth", default="data/zoology_triples.json")
+    p.add_argument("--summaries", default="data/json/summaries.json")
+    p.add_argument("--extractor", action="append", help="module:function; repeatable")
+    p.add_argument("--concepts", nargs="*")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--latency-sample", type=int, default=10,
+                   help="concepts re-run serially for the latency percentiles (0 = skip)")
+    p.add_argument("--agreement", action="store_true",
+                   help="only compare the inference setup's relations and speed with fp32")
+    add_inference_args(p)
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.func is cmd_validate and args.workers is not None and (args.shards or args.shard_addr):
+        parser.error("validate: --workers does not apply with --shards/--shard-addr "
+                     "(the shards are the parallel workers)")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from lookup_builder import extract_property_from_sentence
+
+DEFAULT_THRESHOLDS = tuple(np.round(np.arange(0.30, 0.951, 0.05), 2))
+DEFAULT_KS = (2, 3, 5, 8)
+
+# what classify_with_neighbors / `classify` use today; preferred on ties
+CURRENT_THRESHOLD = 0.65
+CURRENT_K = 3
+
+# RiddleGenerator keeps a riddle with >= 3 usable lines and samples
+# min(5, n) of them
+MIN_LINES, MAX_LINES = 3, 5
+# simulated generator draws per concept and setting
+SAMPLES = 64
+
+
+# ---------------------------------------------------------
+# One KNN query for the whole grid
+# ---------------------------------------------------------
+def neighbor_arrays(classifier, k_max: int):
+    """
+    Query the classifier's index once with k_max neighbours for every
+    triple. Returns (distances (n, k_max), neighbour concept ids (n, k_max),
+    row concept ids (n,), concept names). Any smaller k is a prefix.
+    """
+    concepts = list(classifier.concept_embeddings)
+    concept_id = {c: i for i, c in enumerate(concepts)}
+    k_max = min(k_max, len(classifier.all_embeddings))
+
+    distances, indices = classifier.knn.kneighbors(classifier.all_embeddings, n_neighbors=k_max)
+    index_to_cid = np.array([concept_id[classifier.index_to_concept[i]]
+                             for i in range(len(classifier.all_embeddings))])
+
+    return (np.asarray(distances, dtype=np.float32), index_to_cid[np.asarray(indices)],
+            index_to_cid, concepts)
+
+
+def labels_for_grid(distances, neighbor_cids, row_cids, k: int, thresholds: np.ndarray):
+    """
+    topic_marker mask (n, len(thresholds)) for one k, with the same rule as
+    classify_with_neighbors: other-concept neighbours among the first k,
+    averaged distance > threshold, or no other-concept neighbour at all.
+    """
+    other = neighbor_cids[:, :k] != row_cids[:, None]
+    count = other.sum(axis=1)
+    total = np.where(other, distances[:, :k], 0.0).sum(axis=1)
+    avg = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+    return (count == 0)[:, None] | (avg[:, None] > thresholds[None, :])
+
+
+# ---------------------------------------------------------
+# Downstream: would the lookup solver single out the concept?
+# ---------------------------------------------------------
+def _owner_matrices(classifier, concepts, neighbor_cids, row_cids):
+    """
+    Per concept: its row indices, the concepts that share any of its
+    property phrases (itself first), (rows x those concepts) phrase
+    ownership, and each row's neighbours as columns. Phrases are
+    normalised as build_lookup does.
+    """
+    concept_id = {c: i for i, c in enumerate(concepts)}
+    phrases = {}
+    owners = defaultdict(set)
+    for c in concepts:
+        phrases[c] = [extract_property_from_sentence(s, c).lower().strip()
+                      for s in classifier.concept_sentences[c]]
+        for p in phrases[c]:
+            owners[p].add(concept_id[c])
+
+    per_concept = {}
+    for c in concepts:
+        cid = concept_id[c]
+        rows = np.flatnonzero(row_cids == cid)
+        cand = [cid] + sorted(set().union(*(owners[p] for p in phrases[c])) - {cid})
+        col = {x: j for j, x in enumerate(cand)}
+        own = np.zeros((len(rows), len(cand)), dtype=np.int32)
+        for r, p in enumerate(phrases[c]):
+            for x in owners[p]:
+                own[r, col[x]] = 1
+        # neighbour concept -> column; one sharing no phrase with c gets a
+        # code past the last column, so it is still a distinct choice
+        nbr_col = np.vectorize(lambda x: col.get(x, len(cand) + x), otypes=[np.int64])(neighbor_cids[rows])
+        per_concept[c] = (rows, own, nbr_col)
+    return per_concept
+
+
+def _sample_lines(usable, keys):
+    """(S, n) mask of the lines each of S draws keeps: min(5, n_usable) usable rows, uniformly."""
+    masked = np.where(usable[None, :], keys, np.inf)
+    rank = np.argsort(np.argsort(masked, axis=1), axis=1)
+    return rank < min(MAX_LINES, int(usable.sum()))
+
+
+def _pick_neighbors(nbr_col, k, u):
+    """
+    (S, n) neighbour column each draw negates per row: one of the row's
+    distinct other-concept neighbours among the first k, uniformly, as
+    random.choice(neighboring_concepts) does. 0 (the concept itself) when
+    the row has none.
+    """
+    s = np.sort(nbr_col[:, :k], axis=1)
+    keep = s != 0
+    keep[:, 1:] &= s[:, 1:] != s[:, :-1]
+    n_distinct = keep.sum(axis=1)
+    which = np.floor(u * n_distinct).astype(np.int64)
+    rank = np.cumsum(keep, axis=1) - 1
+    match = keep[None] & (rank[None] == which[..., None])
+    return np.where(n_distinct > 0, (match * s[None]).sum(axis=2), 0)
+
+
+def _uniqueness(topic, rows, own, nbr_col, k, keys, u):
+    """
+    For one concept and one k, per threshold: simulate the generator's
+    draws (keys, u: (S, n_rows) uniforms) and return the share the lookup
+    solver answers with only this concept.
+      v1: min(5, n) of the topic markers; unique if no other concept owns
+          every chosen marker
+      v2: min(5, n) of the common lines, each negating one random
+          neighbour; unique if every other concept lacks a chosen property
+          or is negated
+    Returns (v1 generated, v1 unique share, v2 generated, v2 unique share),
+    each (T,).
+    """
+    n_thr, n_cand = topic.shape[1], own.shape[1]
+    picks = _pick_neighbors(nbr_col, k, u)
+    gen = {v: np.zeros(n_thr, dtype=bool) for v in ("v1", "v2")}
+    share = {v: np.zeros(n_thr) for v in ("v1", "v2")}
+
+    for i in range(n_thr):
+        t = topic[rows, i]
+        for version, usable in (("v1", t), ("v2", ~t)):
+            if usable.sum() < MIN_LINES:
+                continue
+            chosen = _sample_lines(usable, keys)
+            fits = (chosen.astype(np.int32) @ own) == chosen.sum(axis=1, keepdims=True)
+            if version == "v2":
+                negated = np.zeros((len(keys), n_cand + 1), dtype=bool)
+                np.put_along_axis(negated, np.where(chosen & (picks < n_cand), picks, n_cand), True, axis=1)
+                fits &= ~negated[:, :n_cand]
+            gen[version][i] = True
+            # column 0 is the concept itself, which always fits
+            share[version][i] = np.mean(~fits[:, 1:].any(axis=1))
+
+    return gen["v1"], share["v1"], gen["v2"], share["v2"]
+
+
+# ---------------------------------------------------------
+# Sweep
+# ---------------------------------------------------------
+def calibrate(classifier, thresholds: Sequence[float] = DEFAULT_THRESHOLDS,
+              ks: Sequence[int] = DEFAULT_KS, samples: int = SAMPLES, seed: int = 0) -> Dict:
+    """
+    Evaluate every (k, threshold) from one KNN query. Each row reports the
+    topic_marker/common split, the v1/v2 riddles RiddleGenerator would
+    build, and how many of them the lookup solver is expected to answer
+    uniquely, estimated from `samples` simulated draws of the generator's
+    random lines and neighbours per concept. The same draws are reused for
+    every setting, so rows differ only by the setting. v2 assumes random
+    neighbours (no --similarity-lookup). The recommended setting maximises
+    expected unique riddles, then the uniqueness rate, then stays closest
+    to the current k=3 / 0.65.
+    """
+    thresholds = np.asarray(sorted(thresholds), dtype=np.float32)
+    ks = sorted(set(ks))
+
+    distances, neighbor_cids, row_cids, concepts = neighbor_arrays(classifier, max(ks))
+    per_concept = _owner_matrices(classifier, concepts, neighbor_cids, row_cids)
+    rng = np.random.default_rng(seed)
+    draws = {c: (rng.random((samples, len(r))), rng.random((samples, len(r))))
+             for c, (r, _, _) in per_concept.items()}
+
+    rows = []
+    for k in ks:
+        topic = labels_for_grid(distances, neighbor_cids, row_cids, k, thresholds)
+        generated = np.zeros(len(thresholds), dtype=np.int64)
+        unique = np.zeros(len(thresholds))
+        for c, (rows_c, own, nbr_col) in per_concept.items():
+            v1_gen, v1_unique, v2_gen, v2_unique = _uniqueness(topic, rows_c, own, nbr_col, k, *draws[c])
+            generated += v1_gen.astype(np.int64) + v2_gen
+            unique += v1_unique + v2_unique
+
+        n_topic = topic.sum(axis=0)
+        for i, thr in enumerate(thresholds):
+            rows.append({
+                "k": k,
+                "threshold": round(float(thr), 4),
+                "topic_marker": int(n_topic[i]),
+                "common": int(len(topic) - n_topic[i]),
+                "topic_fraction": float(n_topic[i] / len(topic)),
+                "riddles": int(generated[i]),
+                "unique_riddles": round(float(unique[i]), 2),
+                "uniqueness": float(unique[i] / generated[i]) if generated[i] else 0.0,
+            })
+
+    best = max(rows, key=lambda r: (r["unique_riddles"], r["uniqueness"],
+                                    -abs(r["threshold"] - CURRENT_THRESHOLD),
+                                    -abs(r["k"] - CURRENT_K)))
+    return {"rows": rows, "recommended": best, "samples": samples}
+
+
+def print_calibration(report: Dict):
+    header = f"{'k':>3} {'thresh':>7} {'topic':>6} {'common':>6} {'topic%':>7} " \
+             f"{'riddles':>7} {'unique':>6} {'uniq%':>6}"
+    print(header)
+    print("-" * len(header))
+    for r in report["rows"]:
+        print(f"{r['k']:>3} {r['threshold']:>7.2f} {r['topic_marker']:>6} {r['common']:>6} "
+              f"{100 * r['topic_fraction']:>6.1f}% {r['riddles']:>7} {r['unique_riddles']:>6.1f} "
+              f"{100 * r['uniqueness']:>5.1f}%")
+    print(f"unique: expected uniquely solved riddles over {report['samples']} simulated "
+          f"generator draws per concept")
+    best = report["recommended"]
+    print(f"\nrecommended: -k {best['k']} --threshold {best['threshold']:.2f} "
+          f"({best['unique_riddles']:.1f}/{best['riddles']} riddles unique)")
+
+
+def parse_grid(spec: str) -> List[float]:
+    """'0.3:0.95:0.05' -> [0.3, 0.35, ..., 0.95]; '0.5,0.6' -> [0.5, 0.6]."""
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        return [round(float(x), 4) for x in np.arange(start, stop + step / 2, step)]
+    return [float(x) for x in spec.split(",")]
@@ -0,0 +1,88 @@
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+class NeighborClassifier:
+    """
+    KNN neighbouring-concept classifier (the logic of src/class.py).
+
+    data: [{"concept": ..., "triples": [sentence, ...]}, ...] as in
+    sample_data.json. Any object with a sklearn-style
+    kneighbors(X) -> (distances, indices) can be passed as `knn`
+    (e.g. a QuantizedEmbeddings index); by default an exact cosine
+    NearestNeighbors is fitted.
+    """
+
+    def __init__(self, data, model=None, n_neighbors=3, knn=None, embeddings=None):
+        self.n_neighbors = n_neighbors
+
+        # ---------------------------------------------------------
+        # Embed all triples per concept
+        # ---------------------------------------------------------
+        if embeddings is None and model is None:
+            from embedding_cache import CachedEncoder
+            model = CachedEncoder(MODEL_NAME)
+
+        self.concept_embeddings = {}
+        self.concept_sentences = {}
+        self.concept_indices = {}
+
+        global_index = 0
+        for item in data:
+            concept = item["concept"]
+            sentences = item["triples"]
+            embeds = embeddings[concept] if embeddings is not None else model.encode(sentences)
+
+            self.concept_embeddings[concept] = np.asarray(embeds, dtype=np.float32)
+            self.concept_sentences[concept] = sentences
+
+            self.concept_indices[concept] = list(range(global_index, global_index + len(sentences)))
+            global_index += len(sentences)
+
+        # Build global matrix + index→concept mapping
+        self.all_embeddings = np.vstack([self.concept_embeddings[c] for c in self.concept_embeddings])
+
+        self.index_to_concept = {}
+        for concept, idx_list in self.concept_indices.items():
+            for idx in idx_list:
+                self.index_to_concept[idx] = concept
+
+        if knn is None:
+            knn = NearestNeighbors(n_neighbors=n_neighbors, metric="cosine")
+            knn.fit(self.all_embeddings)
+        self.knn = knn
+
+    def classify_with_neighbors(self, concept, threshold=0.65):
+        results = []
+        own_embeds = self.concept_embeddings[concept]
+
+        all_distances, all_indices = self.knn.kneighbors(own_embeds, n_neighbors=self.n_neighbors)
+
+        for i, (distances, indices) in enumerate(zip(all_distances, all_indices)):
+            # Filter neighbours from other concepts
+            filtered = [(d, idx) for d, idx in zip(distances, indices)
+                        if self.index_to_concept[idx] != concept]
+
+            if filtered:
+                avg_dist = float(np.mean([d for d, _ in filtered]))
+                neighbor_concepts = list({self.index_to_concept[idx] for _, idx in filtered})
+                label = "topic_marker" if avg_dist > threshold else "common"
+            else:
+                avg_dist = float(distances.mean())
+                neighbor_concepts = []
+                label = "topic_marker"
+
+            results.append({
+                "triple": self.concept_sentences[concept][i],
+                "avg_distance": avg_dist,
+                "label": label,
+                "neighboring_concepts": neighbor_concepts
+            })
+
+        return results
+
+    def classify_all(self, threshold=0.65):
+        return {concept: self.classify_with_neighbors(concept, threshold)
+                for concept in self.concept_embeddings}
@@ -0,0 +1,109 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+
+STOPWORDS = {"a", "an", "the", "also", "of", "and", "in", "for", "by", "to", "with",
+             "on", "its", "their", "it", "is", "are", "has", "have", "can", "often",
+             "sometimes", "commonly", "may"}
+
+_PRIME = (1 << 31) - 1
+
+
+def _stem(token: str) -> str:
+    for suffix in ("ing", "ies", "es", "ed", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[: -len(suffix)]
+            break
+    # "communicate" / "communicates" -> "communicat"
+    return token[:-1] if token.endswith("e") and len(token) > 3 else token
+
+
+def shingles(phrase: str) -> Set[str]:
+    """Stemmed content tokens plus adjacent-token bigrams."""
+    tokens = [_stem(t) for t in re.findall(r"[a-z0-9]+", phrase.lower()) if t not in STOPWORDS]
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class MinHashLSH:
+    """
+    MinHash signatures over shingle sets, banded into LSH buckets so only
+    phrases sharing a bucket are ever compared. With `bands` x `rows`
+    = num_perm, pairs above roughly (1 / bands) ** (1 / rows) Jaccard
+    collide with high probability.
+    """
+
+    def __init__(self, num_perm=64, bands=16, seed=13):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+        self.bands = bands
+        self.rows = num_perm // bands
+
+    def signature(self, items: Set[str]) -> np.ndarray:
+        hashes = np.array([zlib.crc32(s.encode("utf-8")) % _PRIME for s in items], dtype=np.uint64)
+        # (a * h + b) mod p; a, h < 2**31 so the product fits in uint64
+        return ((self.a[:, None] * hashes + self.b[:, None]) % _PRIME).min(axis=1)
+
+    def candidate_pairs(self, signatures: List[np.ndarray]) -> Set[tuple]:
+        pairs = set()
+        for band in range(self.bands):
+            buckets = defaultdict(list)
+            lo, hi = band * self.rows, (band + 1) * self.rows
+            for i, sig in enumerate(signatures):
+                buckets[sig[lo:hi].tobytes()].append(i)
+            for members in buckets.values():
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        pairs.add((members[x], members[y]))
+        return pairs
+
+
+def consolidate_properties(phrases: Iterable[str], weights: Dict[str, int] = None,
+                           threshold: float = 0.7, lsh: MinHashLSH = None) -> Dict[str, str]:
+    """
+    Cluster near-duplicate phrases and return {phrase: canonical_phrase}
+    for every phrase (canonical ones map to themselves). Candidates come
+    from MinHash LSH; a pair is merged only if its exact shingle Jaccard
+    is >= threshold. The canonical phrase of a cluster is the one with the
+    highest weight (e.g. number of concepts), then the shortest.
+    """
+    phrases = sorted(set(phrases))
+    weights = weights or {}
+    sets = [shingles(p) for p in phrases]
+    usable = [i for i, s in enumerate(sets) if s]
+
+    lsh = lsh or MinHashLSH()
+    sigs = [lsh.signature(sets[i]) for i in usable]
+
+    parent = list(range(len(phrases)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for x, y in lsh.candidate_pairs(sigs):
+        i, j = usable[x], usable[y]
+        if jaccard(sets[i], sets[j]) >= threshold:
+            parent[find(i)] = find(j)
+
+    clusters = defaultdict(list)
+    for i in range(len(phrases)):
+        clusters[find(i)].append(phrases[i])
+
+    mapping = {}
+    for members in clusters.values():
+        canonical = min(members, key=lambda p: (-weights.get(p, 0), len(p), p))
+        for p in members:
+            mapping[p] = canonical
+    return mapping
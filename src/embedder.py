@@ -1,5 +1,7 @@
 import json
-from sentence_transformers import SentenceTransformer
+
+from embedding_cache import CachedEncoder
+from triple_loader import ConceptStream, iter_json_members
 
 class TripleEmbedder:
     def __init__(self, triples_file, out_file="embeddings.json",
@@ -7,30 +9,64 @@ class TripleEmbedder:
 
         self.triples_file = triples_file
         self.out_file = out_file
-        self.model = SentenceTransformer(model_name)
+        # shared on-disk cache: sentences already encoded anywhere are reused
+        self.model = CachedEncoder(model_name)
 
-        with open(triples_file) as f:
-            self.triples = json.load(f)
+        # streamed one concept at a time; see create_embeddings
+        self.triples = ConceptStream(triples_file)
 
         self.embeddings = {}
 
-    def create_embeddings(self):
+    def create_embeddings(self, keep=True):
+        """
+        Encode each concept's triples and write them to out_file as they
+        are produced, so neither the input nor the output has to fit in
+        memory. With keep=False self.embeddings stays empty.
+        """
         print("Generating embeddings...")
 
-        for concept, items in self.triples.items():
-            for idx, entry in enumerate(items):
-                triple_text = entry["triple"]
-
-                emb = self.model.encode(triple_text).tolist()
-
-                key = f"{concept}::{idx}"
-                self.embeddings[key] = emb
-
         with open(self.out_file, "w") as f:
-            json.dump(self.embeddings, f, indent=2)
+            f.write("{")
+            first = True
+            for concept, items in self.triples.items():
+                embeds = self.model.encode([entry["triple"] for entry in items])
+
+                for idx, emb in enumerate(embeds):
+                    key = f"{concept}::{idx}"
+                    vec = emb.tolist()
+                    f.write(f'{"" if first else ","}\n  {json.dumps(key)}: {json.dumps(vec)}')
+                    first = False
+                    if keep:
+                        self.embeddings[key] = vec
+            f.write("\n}\n")
 
         print(f"Embeddings saved to {self.out_file}")
         return self.embeddings
 
-embedder = TripleEmbedder("triples_class.json", "embeddings.json")
-embedder.create_embeddings()
\ No newline at end of file
+    def save_quantized(self, path, mode="int8"):
+        """
+        Store the embeddings as a float16/int8 QuantizedEmbeddings .npz plus
+        the row keys, instead of float64 JSON lists.
+        """
+        import numpy as np
+        from quantize import QuantizedEmbeddings
+
+        if self.embeddings:
+            keys = list(self.embeddings)
+            vectors = [self.embeddings[k] for k in keys]
+        else:
+            # create_embeddings(keep=False): read the vectors back one by one
+            keys, vectors = [], []
+            for key, vec in iter_json_members(self.out_file):
+                keys.append(key)
+                vectors.append(np.asarray(vec, dtype=np.float32))
+        store = QuantizedEmbeddings(vectors, mode=mode)
+        store.save(path)
+        np.save(f"{path}.keys.npy", np.array(keys))
+        print(f"Quantized ({mode}) embeddings saved to {path}")
+        return store
+
+
+if __name__ == "__main__":
+    embedder = TripleEmbedder("triples_class.json", "embeddings.json")
+    embedder.create_embeddings()
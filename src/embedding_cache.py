@@ -0,0 +1,165 @@
+import hashlib
+import os
+import sqlite3
+import time
+import unicodedata
+
+import numpy as np
+
+CACHE_ENV = "RIDDLEQUEST_EMBED_CACHE"
+DEFAULT_CACHE_PATH = os.path.join("~", ".cache", "riddlequest", "embeddings.sqlite")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def cache_path():
+    # resolved per cache, not at import, so the variable can be set later
+    return os.path.expanduser(os.environ.get(CACHE_ENV, DEFAULT_CACHE_PATH))
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", str(text)).split())
+
+
+def cache_key(model_name: str, text: str) -> bytes:
+    return hashlib.sha1(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    On-disk sentence-embedding cache shared by every script.
+
+    Keyed by (model name, hash of the normalised text); vectors are stored
+    as raw float32 bytes. When the stored vectors exceed `max_bytes` the
+    least recently used entries are evicted.
+
+    The stored byte total is kept in a meta row by triggers, in the same
+    transaction as each insert or delete, so checking it never scans the
+    table and stays right with several processes writing.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        path = path or cache_path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript("""
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key       BLOB PRIMARY KEY,
+                vec       BLOB NOT NULL,
+                last_used REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings (last_used);
+            CREATE TABLE IF NOT EXISTS meta (
+                name  TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            -- one scan, only for a cache created before the meta table existed
+            INSERT OR IGNORE INTO meta
+                SELECT 'bytes', COALESCE(SUM(LENGTH(vec)), 0) FROM embeddings;
+            -- INSERT OR REPLACE does not fire delete triggers: subtract the old row here
+            CREATE TRIGGER IF NOT EXISTS embeddings_bytes_insert
+            BEFORE INSERT ON embeddings BEGIN
+                UPDATE meta SET value = value + LENGTH(NEW.vec)
+                    - COALESCE((SELECT LENGTH(vec) FROM embeddings WHERE key = NEW.key), 0)
+                WHERE name = 'bytes';
+            END;
+            CREATE TRIGGER IF NOT EXISTS embeddings_bytes_delete
+            AFTER DELETE ON embeddings BEGIN
+                UPDATE meta SET value = value - LENGTH(OLD.vec) WHERE name = 'bytes';
+            END;
+            COMMIT;
+        """)
+
+    def get_many(self, keys):
+        """{key: vector} for the keys present in the cache."""
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for key, vec in self.conn.execute(
+                f"SELECT key, vec FROM embeddings WHERE key IN ({marks})", chunk
+            ):
+                found[bytes(key)] = np.frombuffer(vec, dtype=np.float32)
+
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                      [(now, k) for k in found])
+        return found
+
+    def put_many(self, items):
+        """items: iterable of (key, vector)."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                [(k, np.asarray(v, dtype=np.float32).tobytes(), now) for k, v in items],
+            )
+        self.evict()
+
+    def size_bytes(self):
+        return self.conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+
+    def evict(self):
+        """Drop least recently used vectors until the cache is under max_bytes."""
+        excess = self.size_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+        freed = 0
+        stale = []
+        for key, size in self.conn.execute(
+            "SELECT key, LENGTH(vec) FROM embeddings ORDER BY last_used"
+        ):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        with self.conn:
+            self.conn.executemany("DELETE FROM embeddings WHERE key = ?", stale)
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedEncoder:
+    """
+    Drop-in for SentenceTransformer.encode backed by EmbeddingCache: only
+    sentences never seen before (by any script) reach the model, and the
+    model itself is loaded on the first miss.
+    """
+
+    def __init__(self, model_name="all-MiniLM-L6-v2", cache=None):
+        self.model_name = model_name
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def encode(self, sentences, batch_size=64):
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+
+        keys = [cache_key(self.model_name, s) for s in sentences]
+        found = self.cache.get_many(list(set(keys)))
+
+        missing = {}
+        for k, s in zip(keys, sentences):
+            if k not in found and k not in missing:
+                missing[k] = s
+
+        if missing:
+            vecs = self.model.encode(list(missing.values()), batch_size=batch_size)
+            new = dict(zip(missing, np.asarray(vecs, dtype=np.float32)))
+            self.cache.put_many(new.items())
+            found.update(new)
+
+        out = np.vstack([found[k] for k in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+        return out[0] if single else out
@@ -2,16 +2,42 @@ import json
 import random
 from typing import List, Dict
 
+from lookup_builder import entry_phrase, row_phrase
+from triple_loader import is_structured, iter_concepts, iter_json_members, property_phrase
+from triple_table import TripleTable
+
 
 class RiddleGenerator:
-    def __init__(self, triples_path: str, templates_path: str):
-        self.triples = self._load(triples_path)
+    def __init__(self, triples_path: str, templates_path: str, similarity=None, lookup=None):
+        self.triples = self._load_triples(triples_path)
         self.templates = self._load(templates_path)
+        # optional ConceptSimilarity: contrast with the most similar neighbour
+        self.similarity = similarity
+        # optional lookup (dict or lookup.json): clue records then carry
+        # its property ids, with consolidated aliases resolved
+        self.property_ids, self.aliases = self._load_ids(lookup)
 
     def _load(self, path):
+        if isinstance(path, (dict, TripleTable)):
+            return path
         with open(path, "r") as f:
             return json.load(f)
 
+    def _load_ids(self, lookup):
+        if lookup is None:
+            return {}, {}
+        if isinstance(lookup, dict):
+            return lookup.get("property_ids", {}), lookup.get("aliases", {})
+        return (dict(iter_json_members(lookup, "property_ids")),
+                dict(iter_json_members(lookup, "aliases")))
+
+    def _load_triples(self, path):
+        # v2/v3 need random access to neighbours, so a file is streamed
+        # concept by concept into the compact column store, never json.load-ed
+        if isinstance(path, (dict, TripleTable)):
+            return path
+        return TripleTable.from_classified(iter_concepts(path))
+
     # -------------------------------------------------------
     # Extract property text from "Dog has acute hearing"
     # -------------------------------------------------------
@@ -25,39 +51,93 @@ class RiddleGenerator:
             tokens = tokens[1:]
         return " ".join(tokens).rstrip(".")
 
-    # -------------------------------------------------------
-    # Collect properties by label
+    def entry_property(self, concept: str, entry: Dict) -> str:
+        # structured triples already carry relation/object: no re-parsing
+        if is_structured(entry):
+            return property_phrase(entry["relation"], entry["object"])
+        return self.extract_property(concept, entry["triple"])
+
+    def row_property(self, concept: str, rel: str, obj: str, structured: bool) -> str:
+        # TripleTable rows: sentence rows carry the whole sentence in obj
+        if structured:
+            return property_phrase(rel, obj)
+        return self.extract_property(concept, obj)
+
+    def _entries(self, concept):
+        """
+        Yield (property, label, neighboring_concepts, key) for a concept;
+        key is the property as the lookup stores it (see build_lookup).
+        """
+        if isinstance(self.triples, TripleTable):
+            for rel, obj, label, neighbors, structured in self.triples.iter_rows(concept):
+                yield (self.row_property(concept, rel, obj, structured), label, neighbors,
+                       row_phrase(concept, rel, obj, structured))
+        else:
+            for t in self.triples[concept]:
+                yield (self.entry_property(concept, t), t["label"], t.get("neighboring_concepts", []),
+                       entry_phrase(concept, t))
+
+    # -------------------------------------------------------
+    # Collect properties by label, as (property, key)
     # -------------------------------------------------------
     def get_topic_properties(self, concept):
         props = []
-        for t in self.triples[concept]:
-            if t["label"] == "topic_marker":
-                p = self.extract_property(concept, t["triple"])
-                if p:
-                    props.append(p)
+        for p, label, _, key in self._entries(concept):
+            if label == "topic_marker" and p:
+                props.append((p, key))
         return props
 
     def get_common_properties(self, concept):
         props = []
-        for t in self.triples[concept]:
-            if t["label"] == "common":
-                p = self.extract_property(concept, t["triple"])
-                if p:
-                    props.append((p, t["neighboring_concepts"]))
+        for p, label, neighbors, key in self._entries(concept):
+            if label == "common" and p:
+                props.append((p, key, neighbors))
         return props
 
     # -------------------------------------------------------
     # Helper: get properties of a neighboring concept
     # -------------------------------------------------------
-    def get_neighbor_properties(self, neighbor: str) -> List[str]:
+    def get_neighbor_properties(self, neighbor: str) -> List[tuple]:
         if neighbor not in self.triples:
             return []
-        props = []
-        for t in self.triples[neighbor]:
-            p = self.extract_property(neighbor, t["triple"])
-            if p:
-                props.append(p)
-        return props
+        return [(p, key) for p, _, _, key in self._entries(neighbor) if p]
+
+    # -------------------------------------------------------
+    # Structured clue record for one riddle line
+    # -------------------------------------------------------
+    def _property_ref(self, key: str, prefix: str = "") -> Dict:
+        key = self.aliases.get(key, key)
+        ref = {f"{prefix}property": key}
+        if key in self.property_ids:
+            ref[f"{prefix}property_id"] = self.property_ids[key]
+        return ref
+
+    def clue_record(self, template_id: str, key: str, neg_concept: str = None,
+                    neg_key: str = None) -> Dict:
+        """
+        {"template": "v3:1", "property": ..., "property_id": ...,
+         "neg_concept": ... | "neg_property": ..., "neg_property_id": ...}
+        Property ids are present when the generator was given a lookup.
+        neg_concept (v2) is the negated neighbour's name: concepts have no
+        ids, and the solver removes a negated concept by name.
+        """
+        clue = {"template": template_id, **self._property_ref(key)}
+        if neg_concept is not None:
+            clue["neg_concept"] = neg_concept
+        if neg_key is not None:
+            clue.update(self._property_ref(neg_key, "neg_"))
+        return clue
+
+    def _pick_template(self, version: str):
+        idx = random.randrange(len(self.templates[version]))
+        return f"{version}:{idx}", self.templates[version][idx]
+
+    def pick_neighbor(self, concept: str, neighbors: List[str]) -> str:
+        if self.similarity is not None:
+            hardest = self.similarity.hardest(concept, neighbors)
+            if hardest is not None:
+                return hardest
+        return random.choice(neighbors)
 
     # -------------------------------------------------------
     # Version 1: Topic marker riddles
@@ -69,12 +149,13 @@ class RiddleGenerator:
 
         chosen = random.sample(props, min(5, max(3, len(props))))
 
-        template = random.choice(self.templates["v1"])
+        template_id, template = self._pick_template("v1")
 
-        lines = [template.replace("{prop}", p) for p in chosen]
+        lines = [template.replace("{prop}", p) for p, _ in chosen]
         lines.append("What am I?")
 
-        return {"concept": concept, "version": "v1", "riddle": "\n".join(lines)}
+        return {"concept": concept, "version": "v1", "riddle": "\n".join(lines),
+                "clues": [self.clue_record(template_id, key) for _, key in chosen]}
 
     # -------------------------------------------------------
     # Version 2: common property vs negated concept
@@ -85,21 +166,22 @@ class RiddleGenerator:
             return None
 
         lines = []
-        for (prop, neighbors) in commons:
+        for (prop, key, neighbors) in commons:
             if not neighbors:
                 continue
-            neg_con = random.choice(neighbors)
-            template = random.choice(self.templates["v2"])
+            neg_con = self.pick_neighbor(concept, neighbors)
+            template_id, template = self._pick_template("v2")
             line = template.replace("{prop}", prop).replace("{neg_con}", neg_con)
-            lines.append(line)
+            lines.append((line, self.clue_record(template_id, key, neg_concept=neg_con)))
 
         if len(lines) < 3:
             return None
 
         chosen = random.sample(lines, min(5, max(3, len(lines))))
-        chosen.append("What am I?")
+        text = [line for line, _ in chosen] + ["What am I?"]
 
-        return {"concept": concept, "version": "v2", "riddle": "\n".join(chosen)}
+        return {"concept": concept, "version": "v2", "riddle": "\n".join(text),
+                "clues": [clue for _, clue in chosen]}
 
     # -------------------------------------------------------
     # Version 3: common property vs negated property
@@ -110,28 +192,29 @@ class RiddleGenerator:
             return None
 
         lines = []
-        for (prop, neighbors) in commons:
+        for (prop, key, neighbors) in commons:
             if not neighbors:
                 continue
-            neg_con = random.choice(neighbors)
+            neg_con = self.pick_neighbor(concept, neighbors)
             neg_props = self.get_neighbor_properties(neg_con)
 
             if not neg_props:
                 continue
 
-            neg_prop = random.choice(neg_props)
+            neg_prop, neg_key = random.choice(neg_props)
 
-            template = random.choice(self.templates["v3"])
+            template_id, template = self._pick_template("v3")
             line = template.replace("{prop}", prop).replace("{neg_prop}", neg_prop)
-            lines.append(line)
+            lines.append((line, self.clue_record(template_id, key, neg_key=neg_key)))
 
         if len(lines) < 3:
             return None
 
         chosen = random.sample(lines, min(5, max(3, len(lines))))
-        chosen.append("What am I?")
+        text = [line for line, _ in chosen] + ["What am I?"]
 
-        return {"concept": concept, "version": "v3", "riddle": "\n".join(chosen)}
+        return {"concept": concept, "version": "v3", "riddle": "\n".join(text),
+                "clues": [clue for _, clue in chosen]}
 
     # -------------------------------------------------------
     # Generate all riddles for all concepts
@@ -159,8 +242,9 @@ class RiddleGenerator:
             json.dump(out, f, indent=2)
 
 
-rg = RiddleGenerator("triples_class.json", "templates.json")
-riddles = rg.generate_all()
-rg.save("riddles_with_answers.json", riddles)
+if __name__ == "__main__":
+    rg = RiddleGenerator("triples_class.json", "templates.json")
+    riddles = rg.generate_all()
+    rg.save("riddles_with_answers.json", riddles)
 
-print("Generated:", len(riddles), "riddles")
\ No newline at end of file
+    print("Generated:", len(riddles), "riddles")
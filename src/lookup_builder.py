@@ -2,9 +2,13 @@
 import json
 import os
 import re
+import zlib
 from collections import defaultdict
 from typing import Tuple
 
+from triple_loader import ConceptStream, is_structured, property_phrase
+from triple_table import TripleTable
+
 TRIPLES_PATH = "triples_class.json"
 LOOKUP_OUT = "lookup.json"
 
@@ -32,60 +36,206 @@ def extract_property_from_sentence(sentence: str, concept: str) -> str:
     return s
 
 
-def build_lookup(triples_path: str = TRIPLES_PATH, save_path: str = LOOKUP_OUT) -> dict:
+def entry_phrase(concept: str, entry) -> str:
+    """Lookup phrase of one triples_class.json entry ("" if none)."""
+    if is_structured(entry):
+        prop = property_phrase(entry["relation"], entry["object"])
+    else:
+        # e expected to contain e["triple"] (sentence) and e["label"]
+        sent = entry.get("triple") if isinstance(entry, dict) else entry
+        prop = extract_property_from_sentence(sent, concept)
+    # normalize to lower-case compact phrase
+    return prop.lower().strip()
+
+
+def row_phrase(concept: str, rel: str, obj: str, structured: bool) -> str:
+    """Lookup phrase of one TripleTable row ("" if none)."""
+    if structured:
+        prop = property_phrase(rel, obj)
+    else:
+        # sentence rows keep the whole sentence in obj
+        prop = extract_property_from_sentence(obj, concept)
+    return prop.lower().strip()
+
+
+def iter_lookup_properties(raw):
+    """
+    Yield (concept, normalized_phrase, label, neighboring_concepts) from a
+    triples_class.json-style dict, a ConceptStream or a TripleTable.
+    """
+    if isinstance(raw, TripleTable):
+        for concept in raw:
+            for rel, obj, label, neigh, structured in raw.iter_rows(concept):
+                prop = row_phrase(concept, rel, obj, structured)
+                if prop:
+                    yield concept, prop, label, neigh
+        return
+
+    for concept, entries in raw.items():
+        for e in entries:
+            label = e.get("label") if isinstance(e, dict) else None
+            neigh = e.get("neighboring_concepts", []) if isinstance(e, dict) else []
+
+            prop = entry_phrase(concept, e)
+            if prop:
+                yield concept, prop, label, neigh
+
+
+def build_lookup(triples_path: str = TRIPLES_PATH, save_path: str = LOOKUP_OUT,
+                 consolidate: bool = False, threshold: float = 0.7,
+                 shards: int = None) -> dict:
     """
     Read triples_class.json and create:
       - concept_to_props: concept -> list of property strings
       - prop_to_concepts: property -> list of concepts that have it
       - triples_meta: concept -> list of { phrase, label, neighboring_concepts }
-    Saves JSON to lookup/lookup.json and returns the dict.
+      - property_ids: property -> integer id (sorted order), used by the
+        generator's structured clue records
+    A file path (triples_class.json or its JSONL form) is streamed one
+    concept at a time; triples_path may also be an already loaded dict in
+    the same layout or a TripleTable. Entries carrying "relation"/"object" (structured triples)
+    are used as-is instead of being re-parsed from the sentence.
+    With consolidate=True, near-duplicate phrases ("communicates barking" /
+    "communicate barking") are merged into one canonical property; the
+    lookup then also carries
+      - aliases: merged phrase -> canonical phrase
+    Saves JSON to lookup/lookup.json (skipped when save_path is None) and
+    returns the dict. With shards=N the lookup is also split by concept
+    hash into N shard files plus a manifest (see write_shards).
     """
-    if not os.path.exists(triples_path):
+    if isinstance(triples_path, (dict, TripleTable)):
+        raw = triples_path
+    elif not os.path.exists(triples_path):
         raise FileNotFoundError(f"Triples file not found: {triples_path}")
-
-    raw = json.load(open(triples_path, "r", encoding="utf-8"))
+    else:
+        raw = ConceptStream(triples_path)
 
     concept_to_props = defaultdict(set)
     prop_to_concepts = defaultdict(set)
     triples_meta = defaultdict(list)
 
-    for concept, entries in raw.items():
-        for e in entries:
-            # e expected to contain e["triple"] (sentence) and e["label"]
-            sent = e.get("triple") if isinstance(e, dict) else e
-            label = e.get("label") if isinstance(e, dict) else None
-            neigh = e.get("neighboring_concepts", []) if isinstance(e, dict) else []
-
-            prop = extract_property_from_sentence(sent, concept)
-            if not prop:
-                continue
-
-            # normalize to lower-case compact phrase
-            norm = prop.lower().strip()
-
-            concept_to_props[concept].add(norm)
-            prop_to_concepts[norm].add(concept)
-            triples_meta[concept].append({
-                "phrase": norm,
-                "label": label,
-                "neighboring_concepts": neigh
-            })
+    for concept, norm, label, neigh in iter_lookup_properties(raw):
+        concept_to_props[concept].add(norm)
+        prop_to_concepts[norm].add(concept)
+        triples_meta[concept].append({
+            "phrase": norm,
+            "label": label,
+            "neighboring_concepts": neigh
+        })
+
+    aliases = {}
+    if consolidate:
+        # numpy is only needed here: keep it out of every other import
+        from dedup import consolidate_properties
+
+        canonical = consolidate_properties(
+            prop_to_concepts, {p: len(cs) for p, cs in prop_to_concepts.items()}, threshold
+        )
+        aliases = {p: c for p, c in canonical.items() if p != c}
+
+        merged = defaultdict(set)
+        for p, cs in prop_to_concepts.items():
+            merged[canonical[p]] |= cs
+        prop_to_concepts = merged
+        concept_to_props = {c: {canonical[p] for p in ps} for c, ps in concept_to_props.items()}
+        for metas in triples_meta.values():
+            for m in metas:
+                m["phrase"] = canonical[m["phrase"]]
+
+        print(f"[lookup_builder] consolidated {len(canonical)} phrases into {len(prop_to_concepts)} properties")
 
     # build final dict
     lookup = {
         "concept_to_props": {c: sorted(list(ps)) for c, ps in concept_to_props.items()},
         "prop_to_concepts": {p: sorted(list(cs)) for p, cs in prop_to_concepts.items()},
-        "triples": {c: v for c, v in triples_meta.items()}
+        "triples": {c: v for c, v in triples_meta.items()},
+        "property_ids": {p: i for i, p in enumerate(sorted(prop_to_concepts))},
     }
+    if consolidate:
+        lookup["aliases"] = dict(sorted(aliases.items()))
 
     # save
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    if save_path is None:
+        return lookup
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
     with open(save_path, "w", encoding="utf-8") as f:
         json.dump(lookup, f, indent=2, ensure_ascii=False)
 
     print(f"[lookup_builder] saved lookup to {save_path} — {len(lookup['concept_to_props'])} concepts")
+
+    if shards and shards > 1:
+        write_shards(lookup, save_path, shards)
     return lookup
 
 
+# ---------------------------------------------------------
+# Concept-hash shards
+# ---------------------------------------------------------
+def shard_of(concept: str, num_shards: int) -> int:
+    # crc32, not hash(): stable across processes and machines
+    return zlib.crc32(concept.encode("utf-8")) % num_shards
+
+
+def split_lookup(lookup: dict, num_shards: int) -> list:
+    """
+    Partition a lookup by concept. Each shard keeps its concepts'
+    concept_to_props/triples and a prop_to_concepts index restricted to
+    them, plus the aliases and property_ids of those properties only. A
+    property several shards share is in each of them; one no concept of
+    a shard has cannot match there, so its alias or id is not needed.
+    """
+    parts = [{"concept_to_props": {}, "prop_to_concepts": defaultdict(list), "triples": {}}
+             for _ in range(num_shards)]
+
+    for concept, props in lookup["concept_to_props"].items():
+        part = parts[shard_of(concept, num_shards)]
+        part["concept_to_props"][concept] = props
+        for p in props:
+            part["prop_to_concepts"][p].append(concept)
+        if concept in lookup.get("triples", {}):
+            part["triples"][concept] = lookup["triples"][concept]
+
+    for part in parts:
+        part["prop_to_concepts"] = {p: sorted(cs) for p, cs in sorted(part["prop_to_concepts"].items())}
+        owned = part["prop_to_concepts"]
+        if "aliases" in lookup:
+            part["aliases"] = {v: c for v, c in lookup["aliases"].items() if c in owned}
+        if "property_ids" in lookup:
+            part["property_ids"] = {p: i for p, i in lookup["property_ids"].items() if p in owned}
+    return parts
+
+
+def shard_paths(save_path: str, num_shards: int) -> list:
+    base, ext = os.path.splitext(save_path)
+    return [f"{base}.shard-{i:02d}-of-{num_shards:02d}{ext}" for i in range(num_shards)]
+
+
+def manifest_path(save_path: str) -> str:
+    return f"{os.path.splitext(save_path)[0]}.shards.json"
+
+
+def write_shards(lookup: dict, save_path: str, num_shards: int) -> str:
+    """
+    Write lookup.shard-XX-of-NN.json files next to save_path and a
+    lookup.shards.json manifest listing them; returns the manifest path.
+    """
+    paths = shard_paths(save_path, num_shards)
+    for path, part in zip(paths, split_lookup(lookup, num_shards)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(part, f, indent=2, ensure_ascii=False)
+
+    manifest = {
+        "num_shards": num_shards,
+        "hash": "crc32",
+        "shards": [os.path.basename(p) for p in paths],
+    }
+    out = manifest_path(save_path)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"[lookup_builder] wrote {num_shards} shards, manifest {out}")
+    return out
+
+
 if __name__ == "__main__":
     build_lookup()
@@ -16,8 +16,10 @@ def run_pipeline():
     lookup = build_lookup(TRIPLE_PATH, LOOKUP_PATH)
 
     # 2) generate riddles
-    gen = RiddleGenerator(TRIPLE_PATH, TEMPLATE_PATH)
-    riddles = gen.generate_all(save_path="outputs/generated_riddles.json")
+    gen = RiddleGenerator(TRIPLE_PATH, TEMPLATE_PATH, lookup=lookup)
+    riddles = gen.generate_all()
+    os.makedirs("outputs", exist_ok=True)
+    gen.save("outputs/generated_riddles.json", riddles)
 
     # 3) validate riddles using lookup
     validator = RiddleValidator(LOOKUP_PATH)
@@ -25,18 +27,15 @@ def run_pipeline():
     final = {"riddles": [], "answers": {}}
 
     for r in riddles:
-        pos = r.get("pos_clues", [])
-        neg = r.get("neg_clues", [])
-        # ensure normalization: lower-case strings as in lookup
-        pos = [str(x).lower().strip() for x in pos]
-        neg = [str(x).lower().strip() for x in neg]
+        # clue records carry property ids into this same lookup
+        pos, neg = validator.clues_from_record(r.get("clues", []))
 
         answers = validator.solve(pos, neg)
         final["riddles"].append(r)
         final["answers"][r["riddle"]] = answers
 
     # save single combined file
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    os.makedirs(os.path.dirname(OUTPUT_PATH) or ".", exist_ok=True)
     with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
         json.dump(final, f, indent=2, ensure_ascii=False)
 
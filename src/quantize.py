@@ -0,0 +1,224 @@
+import numpy as np
+
+MODES = ("float32", "float16", "int8")
+
+
+class QuantizedEmbeddings:
+    """
+    Compact embedding store with approximate cosine search on the codes.
+
+      float16: codes are the vectors in half precision (2x smaller)
+      int8:    codes = round(v / scale) with one float32 scale per vector,
+               scale = max|v| / 127 (4x smaller)
+
+    A per-vector float32 factor (scale / norm) is kept so cosine similarity
+    is a single dot product with the codes. Scoring runs block by block, so
+    at most `block_size` rows are widened to float32 at any time, and
+    kneighbors takes `query_chunk` queries at a time, keeping a running
+    top-k per block: its memory is bounded by query_chunk x block_size
+    scores, however large the corpus or the query batch.
+
+    Exposes sklearn-style kneighbors() returning cosine *distances*, so it can
+    stand in for NearestNeighbors(metric="cosine") in NeighborClassifier.
+    """
+
+    def __init__(self, vectors, mode="int8", rerank_vectors=None,
+                 n_neighbors=3, oversample=4, block_size=65536, query_chunk=256):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {MODES}")
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0] = 1.0
+
+        if mode == "int8":
+            scale = np.abs(vectors).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            self.codes = np.round(vectors / scale[:, None]).astype(np.int8)
+            self.factor = (scale / norms).astype(np.float32)
+        else:
+            self.codes = vectors.astype(mode)
+            self.factor = (1.0 / norms).astype(np.float32)
+
+        self.mode = mode
+        # optional full-precision vectors (e.g. an np.memmap) for re-ranking
+        self.rerank_vectors = rerank_vectors
+        self.n_neighbors = n_neighbors
+        self.oversample = oversample
+        self.block_size = block_size
+        self.query_chunk = query_chunk
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.factor.nbytes
+
+    def __len__(self):
+        return len(self.codes)
+
+    # ------------------------------------------
+    # Similarity on codes
+    # ------------------------------------------
+    @staticmethod
+    def _normalize(queries):
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        qn = np.linalg.norm(q, axis=1)
+        qn[qn == 0] = 1.0
+        return q / qn[:, None]
+
+    def _similarity_blocks(self, q):
+        """Yield (start, (n_queries, block) similarities) over the codes."""
+        for start in range(0, len(self.codes), self.block_size):
+            block = self.codes[start:start + self.block_size].astype(np.float32)
+            yield start, (q @ block.T) * self.factor[start:start + len(block)]
+
+    def cosine_similarity(self, queries):
+        """
+        (n_queries, n_vectors) cosine similarity, computed on the codes.
+        This materialises the full matrix; kneighbors does not use it.
+        """
+        q = self._normalize(queries)
+        sims = np.empty((len(q), len(self.codes)), dtype=np.float32)
+        for start, block in self._similarity_blocks(q):
+            sims[:, start:start + block.shape[1]] = block
+        return sims
+
+    def _top_candidates(self, q, n_cand):
+        """(indices, similarities) of the n_cand best codes per query, merged block by block."""
+        best_idx = np.empty((len(q), 0), dtype=np.int64)
+        best_sim = np.empty((len(q), 0), dtype=np.float32)
+        for start, block in self._similarity_blocks(q):
+            kk = min(n_cand, block.shape[1])
+            part = np.argpartition(-block, kk - 1, axis=1)[:, :kk]
+            idx = np.concatenate([best_idx, part + start], axis=1)
+            sims = np.concatenate([best_sim, np.take_along_axis(block, part, axis=1)], axis=1)
+            if sims.shape[1] > n_cand:
+                keep = np.argpartition(-sims, n_cand - 1, axis=1)[:, :n_cand]
+                idx = np.take_along_axis(idx, keep, axis=1)
+                sims = np.take_along_axis(sims, keep, axis=1)
+            best_idx, best_sim = idx, sims
+        return best_idx, best_sim
+
+    def kneighbors(self, X, n_neighbors=None, rerank=None):
+        """
+        Top-k by cosine distance. With re-ranking (default when
+        rerank_vectors are available) the top k * oversample candidates
+        from the codes are re-scored exactly in float32. Queries are
+        processed `query_chunk` at a time.
+        """
+        k = min(n_neighbors or self.n_neighbors, len(self.codes))
+        rerank = self.rerank_vectors is not None if rerank is None else rerank
+        n_cand = min(len(self.codes), k * self.oversample) if rerank else k
+
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        distances = np.empty((len(X), k), dtype=np.float32)
+        indices = np.empty((len(X), k), dtype=np.int64)
+        for start in range(0, len(X), self.query_chunk):
+            stop = start + self.query_chunk
+            distances[start:stop], indices[start:stop] = self._kneighbors_chunk(X[start:stop], k, n_cand, rerank)
+        return distances, indices
+
+    def _kneighbors_chunk(self, X, k, n_cand, rerank):
+        q = self._normalize(X)
+        cand, cand_sims = self._top_candidates(q, n_cand)
+
+        if rerank:
+            q = X / np.maximum(np.linalg.norm(X, axis=1), 1e-12)[:, None]
+            exact = np.empty(cand.shape, dtype=np.float32)
+            for i, row in enumerate(cand):
+                vecs = np.asarray(self.rerank_vectors[row], dtype=np.float32)
+                vecs = vecs / np.maximum(np.linalg.norm(vecs, axis=1), 1e-12)[:, None]
+                exact[i] = vecs @ q[i]
+            cand_sims = exact
+
+        order = np.argsort(-cand_sims, axis=1)[:, :k]
+        indices = np.take_along_axis(cand, order, axis=1)
+        distances = 1.0 - np.take_along_axis(cand_sims, order, axis=1)
+        return distances, indices
+
+    # ------------------------------------------
+    # Persistence
+    # ------------------------------------------
+    def save(self, path):
+        np.savez(path, codes=self.codes, factor=self.factor, mode=self.mode)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        data = np.load(path)
+        obj = cls.__new__(cls)
+        obj.codes = data["codes"]
+        obj.factor = data["factor"]
+        obj.mode = str(data["mode"])
+        obj.rerank_vectors = kwargs.get("rerank_vectors")
+        obj.n_neighbors = kwargs.get("n_neighbors", 3)
+        obj.oversample = kwargs.get("oversample", 4)
+        obj.block_size = kwargs.get("block_size", 65536)
+        obj.query_chunk = kwargs.get("query_chunk", 256)
+        return obj
+
+
+def load_for_classifier(classifier, path, rerank=False):
+    """
+    Load an `embed --quantize` store as the KNN index of a NeighborClassifier.
+    Rows are matched by their "concept::index" keys and put in the
+    classifier's order; rerank re-scores with the classifier's float32
+    embeddings.
+    """
+    store = QuantizedEmbeddings.load(
+        path, n_neighbors=classifier.n_neighbors,
+        rerank_vectors=classifier.all_embeddings if rerank else None,
+    )
+    keys = np.load(f"{path}.keys.npy")
+    row = {str(key): i for i, key in enumerate(keys)}
+    wanted = [f"{concept}::{i}" for concept, indices in classifier.concept_indices.items()
+              for i in range(len(indices))]
+    missing = [key for key in wanted if key not in row]
+    if missing:
+        raise ValueError(f"{path} has no vectors for {len(missing)} triples (e.g. '{missing[0]}'); "
+                         f"re-run `embed --quantize` on the classified triples")
+
+    order = np.array([row[key] for key in wanted], dtype=np.int64)
+    if len(order) != len(store) or (order != np.arange(len(order))).any():
+        store.codes, store.factor = store.codes[order], store.factor[order]
+    return store
+
+
+# ---------------------------------------------------------
+# Agreement with full-precision classify_with_neighbors
+# ---------------------------------------------------------
+def label_agreement(classifier, mode="int8", threshold=0.65, rerank=False, index=None):
+    """
+    Re-run a fitted NeighborClassifier with a quantized index in place of
+    its exact KNN and report how often labels and neighbour sets match.
+    `index` measures an existing store (see load_for_classifier) instead
+    of quantizing the classifier's embeddings.
+    """
+    baseline = classifier.classify_all(threshold)
+
+    if index is None:
+        index = QuantizedEmbeddings(
+            classifier.all_embeddings, mode=mode,
+            rerank_vectors=classifier.all_embeddings if rerank else None,
+            n_neighbors=classifier.n_neighbors,
+        )
+    exact_knn, classifier.knn = classifier.knn, index
+    try:
+        quantized = classifier.classify_all(threshold)
+    finally:
+        quantized_index, classifier.knn = classifier.knn, exact_knn
+
+    total = labels = neighbours = 0
+    for concept, rows in baseline.items():
+        for full, approx in zip(rows, quantized[concept]):
+            total += 1
+            labels += full["label"] == approx["label"]
+            neighbours += set(full["neighboring_concepts"]) == set(approx["neighboring_concepts"])
+
+    return {
+        "mode": quantized_index.mode,
+        "rerank": quantized_index.rerank_vectors is not None,
+        "triples": total,
+        "label_agreement": labels / total if total else 0.0,
+        "neighbour_agreement": neighbours / total if total else 0.0,
+        "bytes_float32": classifier.all_embeddings.astype(np.float32).nbytes,
+        "bytes_quantized": quantized_index.nbytes,
+    }
@@ -0,0 +1,169 @@
+import json
+import os
+import re
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# "<positive> but I am not a <negated>" and the other template shapes
+NEGATION_SPLIT = re.compile(
+    r"\s+but\s+(?:i am not an?|i am nothing like an?|i don't|i do not|i cannot|i can't|not)\s+",
+    flags=re.IGNORECASE,
+)
+CLUE_PREFIX = re.compile(r"^(?:often,\s*)?i\s+(?:am known to\s+|can\s+)?", flags=re.IGNORECASE)
+
+
+def split_clues(riddle: str) -> Tuple[List[str], List[str]]:
+    """Riddle text -> (positive clue phrases, negated clue phrases)."""
+    pos, neg = [], []
+    for line in riddle.splitlines():
+        line = line.strip().rstrip(".?!")
+        if not line or line.lower() == "what am i":
+            continue
+        parts = NEGATION_SPLIT.split(line, maxsplit=1)
+        p = CLUE_PREFIX.sub("", parts[0]).strip()
+        if p:
+            pos.append(p)
+        if len(parts) > 1 and parts[1].strip():
+            neg.append(parts[1].strip())
+    return pos, neg
+
+
+class SemanticSolver:
+    """
+    Ranks concepts for riddles by embedding similarity instead of exact
+    property matching, so paraphrased clues still find their concept.
+
+    Each concept is represented by the normalised mean of its triple
+    embeddings (embeddings.json keys "Concept::i"). A batch of riddles is
+    solved by encoding all clue lines at once and scoring them against the
+    centroid matrix in a single product; negated clues subtract
+    `neg_weight` times their similarity.
+    """
+
+    def __init__(self, embeddings, encoder=None, neg_weight=0.5,
+                 model_name="all-MiniLM-L6-v2"):
+        if isinstance(embeddings, str):
+            with open(embeddings, "r", encoding="utf-8") as f:
+                embeddings = json.load(f)
+
+        grouped = defaultdict(list)
+        for key, vec in embeddings.items():
+            concept = key.rsplit("::", 1)[0]
+            grouped[concept].append(vec)
+
+        self.concepts = sorted(grouped)
+        self.concept_index = {c: i for i, c in enumerate(self.concepts)}
+        centroids = np.array([np.mean(grouped[c], axis=0) for c in self.concepts], dtype=np.float32)
+        self.centroids = centroids / np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        if encoder is None:
+            from embedding_cache import CachedEncoder
+            encoder = CachedEncoder(model_name)
+        self.encoder = encoder
+        self.neg_weight = neg_weight
+
+    def _encode(self, texts):
+        if not texts:
+            return np.zeros((0, self.centroids.shape[1]), dtype=np.float32)
+        emb = np.asarray(self.encoder.encode(texts), dtype=np.float32)
+        return emb / np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+
+    def score_batch(self, riddles: List[str]) -> np.ndarray:
+        """(n_riddles, n_concepts) scores: mean positive sim - neg_weight * mean negated sim."""
+        lines, rows, weights = [], [], []
+        for r, riddle in enumerate(riddles):
+            pos, neg = split_clues(riddle)
+            for p in pos:
+                lines.append(p)
+                rows.append(r)
+                weights.append(1.0 / len(pos))
+            for n in neg:
+                lines.append(n)
+                rows.append(r)
+                weights.append(-self.neg_weight / len(neg))
+
+        sims = self._encode(lines) @ self.centroids.T
+
+        # one weight per line: a segment sum of line scores into their riddle's row
+        agg = sparse.csr_matrix(
+            (np.asarray(weights, dtype=np.float32), (rows, np.arange(len(lines)))),
+            shape=(len(riddles), len(lines)),
+        )
+        return np.asarray(agg @ sims, dtype=np.float32)
+
+    def solve_batch(self, riddles: List[str], candidates: Optional[List[List[str]]] = None,
+                    top_k: int = 5) -> List[List[Tuple[str, float]]]:
+        """
+        Ranked [(concept, score), ...] per riddle. With `candidates` (e.g.
+        the lookup solver's possible answers), only those that have
+        embeddings are ranked, possibly none; an empty candidate list
+        ranks every concept.
+        """
+        scores = self.score_batch(riddles)
+        results = []
+        for r in range(len(riddles)):
+            row = scores[r]
+            given = candidates[r] if candidates else []
+            if given:
+                idx = np.array([self.concept_index[c] for c in given if c in self.concept_index], dtype=np.intp)
+            else:
+                idx = np.arange(len(self.concepts))
+            order = idx[np.argsort(-row[idx], kind="stable")][:top_k]
+            results.append([(self.concepts[i], float(row[i])) for i in order])
+        return results
+
+    def rerank(self, validated: Iterable[Dict], batch_size: int = 1024) -> Iterator[Dict]:
+        """
+        Second stage after validate_riddles: reorder each item's
+        possible_answers by semantic score and update its answer. The
+        lookup's candidates are kept: the scored ones first, best first,
+        then those without embeddings in the validator's order, so an
+        unscored candidate only stays the answer when none could be scored.
+        Items without candidates get the top 5 concepts. Yields items as
+        each batch is scored.
+        """
+        validated = iter(validated)
+        while True:
+            batch = list(islice(validated, batch_size))
+            if not batch:
+                return
+            ranked = self.solve_batch(
+                [item["riddle"] for item in batch],
+                [item.get("possible_answers") or [] for item in batch],
+                top_k=len(self.concepts),
+            )
+            for item, ranking in zip(batch, ranked):
+                item = dict(item)
+                candidates = item.get("possible_answers") or []
+                if candidates:
+                    unscored = [c for c in candidates if c not in self.concept_index]
+                    candidates = [c for c, _ in ranking] + unscored
+                else:
+                    candidates = [c for c, _ in ranking[:5]]
+                item["semantic_scores"] = {c: round(s, 4) for c, s in ranking}
+                item["possible_answers"] = candidates
+                item["answer"] = candidates[0] if candidates else item.get("answer")
+                yield item
+
+
+def rerank_file(solver: SemanticSolver, path: str, batch_size: int = 1024) -> int:
+    """
+    Re-rank a validation output file in place: stream it through
+    solver.rerank into a temporary file next to it (same format) and
+    replace the original. Returns the number of records.
+    """
+    from validator import iter_riddles, write_validated
+
+    root, ext = os.path.splitext(path)
+    tmp = f"{root}.tmp-{os.getpid()}{ext}"
+    try:
+        count = write_validated(solver.rerank(iter_riddles(path), batch_size), tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return count
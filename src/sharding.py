@@ -0,0 +1,283 @@
+import json
+import multiprocessing
+import os
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import List, Tuple
+
+from validator import (
+    RiddleValidator, add_audit, canonical_clues, clues_from_record, extract_clues_from_riddle,
+    iter_riddles, merge_partials, validation_record, write_validated,
+)
+
+# clue-record fields resolved through property_ids when their phrase is missing
+_ID_FIELDS = (("property", "property_id"), ("neg_property", "neg_property_id"))
+
+AUTHKEY_ENV = "RIDDLEQUEST_SHARD_KEY"
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "localhost", int(port)
+
+
+def shard_authkey() -> bytes:
+    # connections exchange pickles, so remote shards always authenticate
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        raise RuntimeError(f"Set {AUTHKEY_ENV} to the shared secret for shard connections")
+    return key.encode("utf-8")
+
+
+# ---------------------------------------------------------
+# Shard side
+# ---------------------------------------------------------
+def shard_partial(validator: RiddleValidator, pos: List[str], neg: List[str]):
+    """
+    solve_partial over clues as the riddle gave them. The shard maps them
+    through its own aliases (those of its properties) and reports negated
+    candidates under the original clue, so the coordinator can merge
+    partials without holding any aliases.
+    """
+    aliases = validator.aliases
+    candidates, having, fallback = validator.solve_partial(canonical_clues(pos, aliases),
+                                                           canonical_clues(neg, aliases))
+    return candidates, {n: having.get(aliases.get(n, n), set()) for n in neg}, fallback
+
+
+def shard_clues(validator: RiddleValidator, properties, request):
+    """
+    This shard's share of finding a riddle's clues: ("text", riddle) scans
+    the text for the shard's properties and aliases; ("ids", [id, ...])
+    resolves the property ids the shard issued.
+    """
+    if request is None:
+        return None
+    kind, payload = request
+    if kind == "text":
+        return extract_clues_from_riddle(payload, properties)
+    return {i: validator.id_to_property[i] for i in payload if i in validator.id_to_property}
+
+
+def _serve_connection(conn, validator: RiddleValidator):
+    """Answer (op, payload) requests on one connection until it closes."""
+    properties = validator.all_properties()
+    while True:
+        try:
+            op, payload = conn.recv()
+        except EOFError:
+            return
+        if op == "close":
+            return
+        if op == "clues":
+            conn.send([shard_clues(validator, properties, r) for r in payload])
+        elif op == "solve":
+            conn.send([shard_partial(validator, pos, neg) for pos, neg in payload])
+        else:
+            conn.send(ValueError(f"Unknown shard op '{op}'"))
+
+
+def _local_shard(lookup_path, conn):
+    _serve_connection(conn, RiddleValidator(lookup_path))
+    conn.close()
+
+
+def serve_shard(lookup_path: str, address: str):
+    """
+    Hold one shard and serve coordinators over TCP (host:port), one thread
+    per connection. The index is read-only, so connections share it.
+    """
+    validator = RiddleValidator(lookup_path)
+    with Listener(parse_address(address), authkey=shard_authkey()) as listener:
+        print(f"[sharding] serving {lookup_path} on {address}")
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=_serve_connection, args=(conn, validator), daemon=True).start()
+
+
+# ---------------------------------------------------------
+# Coordinator
+# ---------------------------------------------------------
+class ShardedValidator:
+    """
+    Drop-in for RiddleValidator.solve over concept-hash shards.
+
+    Local shard files are each loaded by their own worker process;
+    `addresses` connect to shards already served elsewhere with
+    serve_shard. solve_many scatters a batch of clue pairs to every shard
+    at once and merges the per-shard partials with merge_partials, so
+    answers are identical to a single RiddleValidator over the full lookup.
+    The coordinator holds no index: aliases, property ids and text
+    scanning all stay with the shards that own the properties.
+    """
+
+    def __init__(self, shard_paths: List[str] = None, addresses: List[str] = None):
+        self.conns, self.procs = [], []
+
+        for path in shard_paths or []:
+            parent, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(target=_local_shard, args=(path, child), daemon=True)
+            proc.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+        if addresses:
+            key = shard_authkey()
+            self.conns.extend(Client(parse_address(a), authkey=key) for a in addresses)
+
+        if not self.conns:
+            raise ValueError("ShardedValidator needs shard files or shard addresses")
+
+    @classmethod
+    def from_manifest(cls, manifest_path: str) -> "ShardedValidator":
+        """Start one local worker per shard listed in lookup.shards.json."""
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        root = os.path.dirname(manifest_path)
+        return cls(shard_paths=[os.path.join(root, p) for p in manifest["shards"]])
+
+    # ------------------------------------------
+    # Transport
+    # ------------------------------------------
+    def _send(self, op, payload=None):
+        for conn in self.conns:
+            conn.send((op, payload))
+
+    def _recv(self):
+        replies = [conn.recv() for conn in self.conns]
+        for r in replies:
+            if isinstance(r, Exception):
+                raise r
+        return replies
+
+    def _scatter(self, op, payload=None):
+        self._send(op, payload)
+        return self._recv()
+
+    # ------------------------------------------
+    # Solving
+    # ------------------------------------------
+    @staticmethod
+    def _clue_request(item):
+        clues = item.get("clues")
+        if not clues:
+            return "text", item["riddle"]
+        # a record's phrase wins over its id, so only phrase-less ids need a shard
+        ids = [c[key] for c in clues for field, key in _ID_FIELDS
+               if c.get(field) is None and c.get(key) is not None]
+        return ("ids", ids) if ids else None
+
+    @staticmethod
+    def _gather_clues(items, per_shard):
+        out = []
+        for i, item in enumerate(items):
+            replies = [parts[i] for parts in per_shard]
+            if item.get("clues"):
+                id_to_property = {}
+                for reply in replies:
+                    id_to_property.update(reply or {})
+                out.append(clues_from_record(item["clues"], id_to_property))
+            else:
+                # a property several shards share is found by each of them
+                out.append((list(dict.fromkeys(c for pos, _ in replies for c in pos)),
+                            list(dict.fromkeys(c for _, neg in replies for c in neg))))
+        return out
+
+    def _merge(self, queries, per_shard):
+        return [merge_partials([parts[i] for parts in per_shard], pos, neg)
+                for i, (pos, neg) in enumerate(queries)]
+
+    def clues_many(self, items: List[dict]) -> List[Tuple[List[str], List[str]]]:
+        """(pos, neg) per riddle, from its clue records or a text scan on every shard."""
+        return self._gather_clues(items, self._scatter("clues", [self._clue_request(i) for i in items]))
+
+    def solve_many(self, queries: List[Tuple[List[str], List[str]]]) -> List[List[str]]:
+        return self._merge(queries, self._scatter("solve", queries))
+
+    def solve(self, pos_clues: List[str], neg_clues: List[str]) -> List[str]:
+        return self.solve_many([(pos_clues, neg_clues)])[0]
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(("close", None))
+            except OSError:
+                pass
+            conn.close()
+        for proc in self.procs:
+            proc.join(timeout=5)
+        self.conns, self.procs = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def validate_riddles_sharded(
+    riddles_path: str,
+    validator: ShardedValidator,
+    output_path: str = "riddles_validated.jsonl",
+    batch_size: int = 256,
+    audit: bool = False
+) -> int:
+    """
+    Validate riddles against a ShardedValidator, writing results in input
+    order (see write_validated). Clues come from the riddles' clue records
+    when present; otherwise every shard scans the text for its own
+    properties in parallel. Shards find the next batch's clues while the
+    coordinator merges and writes the current one. With audit=True a
+    riddle with clue records is also scanned as text, and the records'
+    answer is attached for comparison, as in validate_item.
+    """
+    riddles = iter_riddles(riddles_path)
+
+    def queries_of(batch):
+        if not audit:
+            return batch
+        out = []
+        for item in batch:
+            out.append(item)
+            if item.get("clues"):
+                out.append({"riddle": item["riddle"]})
+        return out
+
+    def next_batch():
+        batch = []
+        for item in riddles:
+            batch.append(item)
+            if len(batch) == batch_size:
+                break
+        queries = queries_of(batch)
+        if queries:
+            validator._send("clues", [validator._clue_request(item) for item in queries])
+        return batch, queries
+
+    def results():
+        batch, queries = next_batch()
+        while batch:
+            clues = validator._gather_clues(queries, validator._recv())
+            validator._send("solve", clues)
+            # each connection answers in order: solve for this batch, then clues for the next
+            upcoming = next_batch()
+            solved = iter(zip(clues, validator._merge(clues, validator._recv())))
+
+            for item in batch:
+                (pos, neg), possible = next(solved)
+                if audit and item.get("clues"):
+                    (tpos, tneg), text_possible = next(solved)
+                    record = validation_record(item, tpos, tneg, text_possible)
+                    record["clue_source"] = "text"
+                    add_audit(record, pos, neg, possible)
+                else:
+                    record = validation_record(item, pos, neg, possible)
+                    record["clue_source"] = "record" if item.get("clues") else "text"
+                yield record
+            batch, queries = upcoming
+
+    count = write_validated(results(), output_path)
+
+    print(f"✔ Saved {count} validated riddles → {output_path} ({len(validator.conns)} shards)")
+    return count
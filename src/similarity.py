@@ -0,0 +1,190 @@
+import json
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+METRICS = ("cosine", "jaccard")
+
+
+class ConceptSimilarity:
+    """
+    Concept x property incidence matrix (sparse, binary) built once from a
+    lookup, with all-pairs / top-k cosine or Jaccard similarity computed as
+    sparse products A[block] @ A.T, one block of concepts at a time.
+
+    Single-concept queries (score, hardest) reuse rows: either rows of a
+    matrix saved by save() (from_saved) or rows computed once and kept in
+    an LRU of `row_cache_size` concepts.
+    """
+
+    def __init__(self, concept_to_props: dict, row_cache_size=1024):
+        self.concepts = sorted(concept_to_props)
+        self.concept_index = {c: i for i, c in enumerate(self.concepts)}
+        self.saved, self.saved_metric = None, None
+        self.row_cache_size = row_cache_size
+        self._rows = OrderedDict()
+        props = sorted({p for ps in concept_to_props.values() for p in ps})
+        self.prop_index = {p: i for i, p in enumerate(props)}
+
+        rows, cols = [], []
+        for c, ps in concept_to_props.items():
+            ci = self.concept_index[c]
+            for p in set(ps):
+                rows.append(ci)
+                cols.append(self.prop_index[p])
+
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(self.concepts), len(props)),
+        )
+        self.degree = np.asarray(self.matrix.sum(axis=1)).ravel()
+
+    @classmethod
+    def from_lookup(cls, lookup):
+        """lookup: a lookup.json path or the dict returned by build_lookup."""
+        if isinstance(lookup, str):
+            with open(lookup, "r", encoding="utf-8") as f:
+                lookup = json.load(f)
+        return cls(lookup["concept_to_props"])
+
+    @classmethod
+    def from_saved(cls, path, row_cache_size=1024):
+        """
+        Engine answering score/hardest from a matrix written by save(),
+        without the lookup. Only the saved metric is available.
+        """
+        concepts, sim, metric = cls.load(path)
+        engine = cls.__new__(cls)
+        engine.concepts = concepts
+        engine.concept_index = {c: i for i, c in enumerate(concepts)}
+        engine.saved, engine.saved_metric = sim, metric
+        engine.row_cache_size = row_cache_size
+        engine._rows = OrderedDict()
+        engine.matrix = engine.degree = None
+        return engine
+
+    # ------------------------------------------
+    # Blocked similarity
+    # ------------------------------------------
+    def _block(self, start, stop, metric):
+        """Similarity rows [start, stop) as a sparse matrix (overlaps only)."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {METRICS}")
+
+        inter = (self.matrix[start:stop] @ self.matrix.T).tocoo()
+        deg_i = self.degree[start:stop][inter.row]
+        deg_j = self.degree[inter.col]
+
+        if metric == "cosine":
+            denom = np.sqrt(deg_i * deg_j)
+        else:
+            denom = deg_i + deg_j - inter.data
+
+        data = np.divide(inter.data, denom, out=np.zeros_like(inter.data), where=denom > 0)
+        return sparse.csr_matrix((data, (inter.row, inter.col)), shape=inter.shape)
+
+    @staticmethod
+    def _keep_top_k(block, start, k):
+        """The k highest scores of each row of a block, the concept itself dropped."""
+        rows, cols, data = [], [], []
+        for r in range(block.shape[0]):
+            lo, hi = block.indptr[r], block.indptr[r + 1]
+            idx, vals = block.indices[lo:hi], block.data[lo:hi]
+            own = idx != start + r
+            idx, vals = idx[own], vals[own]
+            if len(vals) > k:
+                top = np.argpartition(-vals, k - 1)[:k]
+                idx, vals = idx[top], vals[top]
+            rows.append(np.full(len(idx), r))
+            cols.append(idx)
+            data.append(vals)
+        if not rows:
+            return sparse.csr_matrix(block.shape, dtype=block.dtype)
+        return sparse.csr_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+                                 shape=block.shape)
+
+    def all_pairs(self, metric="cosine", block_size=1024, k=None):
+        """
+        Concept x concept similarity (sparse: zero where no overlap). With k,
+        only each concept's k most similar others are kept, block by block,
+        so a shared common property does not make the result dense.
+        """
+        blocks = []
+        for s in range(0, len(self.concepts), block_size):
+            block = self._block(s, min(s + block_size, len(self.concepts)), metric)
+            blocks.append(block if k is None else self._keep_top_k(block, s, k))
+        return sparse.vstack(blocks).tocsr() if blocks else sparse.csr_matrix((0, 0))
+
+    def top_k(self, k=5, metric="cosine", block_size=1024):
+        """{concept: [(other_concept, score), ...]} excluding the concept itself."""
+        result = {}
+        for start in range(0, len(self.concepts), block_size):
+            block = self._block(start, min(start + block_size, len(self.concepts)), metric)
+            for r in range(block.shape[0]):
+                ci = start + r
+                row = block.getrow(r)
+                pairs = [(j, s) for j, s in zip(row.indices, row.data) if j != ci]
+                pairs.sort(key=lambda x: (-x[1], self.concepts[x[0]]))
+                result[self.concepts[ci]] = [(self.concepts[j], float(s)) for j, s in pairs[:k]]
+        return result
+
+    def _row(self, ci, metric):
+        """{concept index: score} for one concept's overlaps, computed at most once."""
+        if self.saved is not None:
+            if metric != self.saved_metric:
+                raise ValueError(f"Saved similarity is '{self.saved_metric}', not '{metric}'")
+            start, stop = self.saved.indptr[ci], self.saved.indptr[ci + 1]
+            return dict(zip(self.saved.indices[start:stop].tolist(), self.saved.data[start:stop].tolist()))
+
+        key = (metric, ci)
+        row = self._rows.get(key)
+        if row is None:
+            block = self._block(ci, ci + 1, metric)
+            row = dict(zip(block.indices.tolist(), block.data.tolist()))
+            self._rows[key] = row
+            if len(self._rows) > self.row_cache_size:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(key)
+        return row
+
+    def score(self, a, b, metric="cosine"):
+        ia, ib = self.concept_index.get(a), self.concept_index.get(b)
+        if ia is None or ib is None:
+            return 0.0
+        return float(self._row(ia, metric).get(ib, 0.0))
+
+    def hardest(self, concept, candidates, metric="cosine"):
+        """Candidate most similar to `concept` (the hardest one to rule out)."""
+        ci = self.concept_index.get(concept)
+        if ci is None or not candidates:
+            return None
+        row = self._row(ci, metric)
+        index = self.concept_index
+        return max(candidates, key=lambda c: row.get(index[c], 0.0) if c in index else -1.0)
+
+    # ------------------------------------------
+    # Persistence of computed results
+    # ------------------------------------------
+    def save(self, path, metric="cosine", block_size=1024, k=64):
+        """
+        Write each concept's k most similar others (k=None: every overlap).
+        hardest() on a saved matrix scores candidates outside the top k as 0.
+        """
+        sim = self.all_pairs(metric, block_size, k)
+        np.savez_compressed(path, data=sim.data, indices=sim.indices, indptr=sim.indptr,
+                            shape=sim.shape, concepts=np.array(self.concepts), metric=metric)
+
+    @staticmethod
+    def load(path):
+        """Return (concepts, similarity csr_matrix, metric) saved by save()."""
+        d = np.load(path)
+        sim = sparse.csr_matrix((d["data"], d["indices"], d["indptr"]), shape=tuple(d["shape"]))
+        return list(d["concepts"]), sim, str(d["metric"])
+
+
+if __name__ == "__main__":
+    engine = ConceptSimilarity.from_lookup("lookup.json")
+    for concept, neighbours in engine.top_k(k=3).items():
+        print(concept, neighbours)
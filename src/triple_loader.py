@@ -0,0 +1,423 @@
+import json
+import os
+import re
+from collections import defaultdict
+
+STRUCTURED_PATH = "data/zoology_triples.json"
+
+# Leading relation words that carry no property content. Mirrors the verbs
+# RiddleGenerator.extract_property drops from sentence triples, so structured
+# and sentence-derived properties read the same way.
+COPULAR_RELATIONS = {"is", "are", "was", "has", "have", "can", "may"}
+
+
+def property_phrase(relation: str, obj: str) -> str:
+    """
+    Build a property phrase straight from a structured (relation, object):
+      ("has", "whiskers")              -> "whiskers"
+      ("is_a", "pet")                  -> "a pet"
+      ("communicates_by", "meowing")   -> "communicates by meowing"
+    """
+    words = relation.replace("_", " ").split()
+    if words and words[0].lower() in COPULAR_RELATIONS:
+        words = words[1:]
+    return " ".join(words + [obj.strip()]).strip()
+
+
+def is_structured(entry) -> bool:
+    return isinstance(entry, dict) and "relation" in entry and "object" in entry
+
+
+# ---------------------------------------------------------
+# Streaming readers: one concept decoded at a time
+# ---------------------------------------------------------
+_WHITESPACE = re.compile(r"\s*")
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+# string body up to (not including) the closing quote; stops early only
+# at a backslash that is the last character of the buffer
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*', re.S)
+# characters that can continue a JSON number
+_NUMBER_CHARS = frozenset(".eE+-0123456789")
+
+
+class _JSONStream:
+    """
+    Incremental reader over a JSON text file. Values are decoded one at a
+    time with JSONDecoder.raw_decode; the buffer only grows when a value
+    runs past it, and consumed text is dropped on every refill.
+    """
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.base = 0  # file offset (in characters) of buf[0]
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def tell(self) -> int:
+        return self.base + self.pos
+
+    def _fill(self, at_least=0) -> bool:
+        self.base += self.pos
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        chunk = self.f.read(max(self.chunk_size, at_least))
+        if not chunk:
+            self.eof = True
+        self.buf += chunk
+        return bool(chunk)
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch):
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"Malformed JSON: expected {ch!r}, got {got!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                end = None
+            # a number cut at the buffer edge ("12." of "12.5") decodes
+            # fine but is incomplete: only accept it when what follows
+            # cannot continue it
+            if end is not None and not self.eof and isinstance(obj, (int, float)) \
+                    and not isinstance(obj, bool) \
+                    and (end >= len(self.buf) or self.buf[end] in _NUMBER_CHARS):
+                end = None
+            if end is not None and (end < len(self.buf) or self.eof):
+                self.pos = end
+                return obj
+            # read at least as much again, so a large value is re-parsed
+            # O(log n) times rather than once per chunk
+            self._fill(len(self.buf) - self.pos)
+
+    def skip(self):
+        """Step over the next value without building it."""
+        if self.peek() not in "{[":
+            self.value()
+            return
+        depth = 0
+        while True:
+            m = _STRUCTURAL.search(self.buf, self.pos)
+            if m is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("Malformed JSON: unexpected end of file")
+                continue
+            self.pos = m.start() + 1
+            if m.group() == '"':
+                self._skip_string()
+                continue
+            depth += 1 if m.group() in "{[" else -1
+            if depth == 0:
+                return
+
+    def _skip_string(self):
+        """Move past the closing quote of a string whose opening quote is consumed."""
+        while True:
+            # resume where the last chunk's scan stopped, so a string spanning
+            # many chunks is scanned once (pos never sits mid-escape)
+            self.pos = _STRING_BODY.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) and self.buf[self.pos] == '"':
+                self.pos += 1
+                return
+            if not self._fill():
+                raise ValueError("Malformed JSON: unterminated string")
+
+    def keys(self):
+        """
+        Yield the member names of the object starting here. The caller
+        must consume each member with value() or skip() before resuming.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            sep = self.peek()
+            self.expect("}" if sep == "}" else ",")
+            if sep == "}":
+                return
+
+    def elements(self):
+        """
+        Step through the array starting here, yielding once per element.
+        The caller must consume each element with value() or skip().
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            sep = self.peek()
+            self.expect("]" if sep == "]" else ",")
+            if sep == "]":
+                return
+
+
+def iter_json_members(path: str, key: str = None, chunk_size: int = 1 << 16):
+    """
+    Yield (name, value) for each member of the file's top-level object, or
+    of the object stored under top-level `key` (other members are skipped
+    without being decoded). Only one member is held in memory at a time.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JSONStream(f, chunk_size)
+        for name in stream.keys():
+            if key is None:
+                yield name, stream.value()
+            elif name != key:
+                stream.skip()
+            else:
+                if stream.peek() == "{":
+                    for inner in stream.keys():
+                        yield inner, stream.value()
+                return
+
+
+def iter_json_array(path: str, key: str = None, chunk_size: int = 1 << 16):
+    """
+    Yield the elements of the file's top-level array, or of the array under
+    top-level `key` when the file is an object, one element at a time.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JSONStream(f, chunk_size)
+        if stream.peek() == "[":
+            for _ in stream.elements():
+                yield stream.value()
+            return
+        for name in stream.keys():
+            if name != key:
+                stream.skip()
+                continue
+            if stream.peek() == "[":
+                for _ in stream.elements():
+                    yield stream.value()
+            return
+
+
+def iter_concepts(path: str, chunk_size: int = 1 << 16):
+    """
+    Yield (concept, entries) from a triples_class.json-style object or from
+    its JSONL form (.jsonl/.ndjson), one concept per line as either
+    {"concept": ..., "entries": [...]} or {concept: [...]}.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Triples file not found: {path}")
+
+    if _is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield from _record_concepts(json.loads(line))
+        return
+
+    yield from iter_json_members(path, chunk_size=chunk_size)
+
+
+def _is_jsonl(path: str) -> bool:
+    return path.endswith((".jsonl", ".ndjson"))
+
+
+def _record_concepts(record: dict):
+    if record.keys() == {"concept", "entries"}:
+        yield record["concept"], record["entries"]
+    else:
+        yield from record.items()
+
+
+def concept_spans(path: str, chunk_size: int = 1 << 16):
+    """
+    Yield (concept, (start, end)) byte spans in a file iter_concepts reads:
+    the concept's entries array in a JSON object, its line in JSONL.
+    Entries are stepped over, never decoded.
+    """
+    if _is_jsonl(path):
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    for concept, _ in _record_concepts(json.loads(line)):
+                        yield concept, (offset, offset + len(line))
+                offset += len(line)
+        return
+
+    # latin-1 maps every byte to one character, so stream offsets are byte
+    # offsets; JSON syntax is ASCII and UTF-8 multi-byte sequences never
+    # contain ASCII bytes, so the structure reads the same
+    with open(path, "r", encoding="latin-1", newline="") as f:
+        stream = _JSONStream(f, chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            stream.peek()
+            start = stream.tell()
+            stream.skip()
+            raw_key = stream.buf[start - stream.base:stream.pos]
+            concept = json.loads(raw_key.encode("latin-1").decode("utf-8"))
+            stream.expect(":")
+            stream.peek()
+            value_start = stream.tell()
+            stream.skip()
+            yield concept, (value_start, stream.tell())
+            sep = stream.peek()
+            stream.expect("}" if sep == "}" else ",")
+            if sep == "}":
+                return
+
+
+class ConceptStream:
+    """
+    Read-only mapping view of a classified triples file that re-reads the
+    file on every pass instead of holding it: iteration and items() decode
+    one concept at a time. [concept] and `in` use a concept -> byte span
+    index built on first use (rebuilt if the file changes), so a lookup is
+    one seek and one decode.
+    """
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Triples file not found: {path}")
+        self.path = path
+        self._spans = None
+        self._stamp = None
+
+    def items(self):
+        return iter_concepts(self.path)
+
+    def __iter__(self):
+        return (concept for concept, _ in self.items())
+
+    def spans(self) -> dict:
+        st = os.stat(self.path)
+        stamp = (st.st_size, st.st_mtime_ns)
+        if self._spans is None or self._stamp != stamp:
+            self._spans = dict(concept_spans(self.path))
+            self._stamp = stamp
+        return self._spans
+
+    def __getitem__(self, concept):
+        span = self.spans().get(concept)
+        if span is None:
+            raise KeyError(concept)
+        start, end = span
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            value = json.loads(f.read(end - start).decode("utf-8"))
+        if _is_jsonl(self.path):
+            return dict(_record_concepts(value))[concept]
+        return value
+
+    def __contains__(self, concept) -> bool:
+        return concept in self.spans()
+
+    def __len__(self):
+        return len(self.spans())
+
+
+# ---------------------------------------------------------
+# Load [subject, relation, object] triple files
+# ---------------------------------------------------------
+def load_structured_triples(path: str = STRUCTURED_PATH) -> dict:
+    """
+    Read {concept: [[subject, relation, object], ...]} into
+    {concept: [(subject, relation, object), ...]}.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Structured triples file not found: {path}")
+
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+
+    return {concept: [tuple(t) for t in triples] for concept, triples in raw.items()}
+
+
+# ---------------------------------------------------------
+# Classify by exact property sharing (no embeddings needed)
+# ---------------------------------------------------------
+def classify_structured(triples: dict) -> dict:
+    """
+    Label curated triples in the triples_class.json layout:
+      - topic_marker: no other concept has the same (relation, object)
+      - common: shared, with the sharing concepts as neighboring_concepts
+    Entries keep "relation"/"object" so later stages use them as-is; the
+    rendered "triple" text is only there for embedding/visualisation.
+    """
+    owners = defaultdict(set)
+    for concept, items in triples.items():
+        for _, rel, obj in items:
+            owners[(rel, obj.lower())].add(concept)
+
+    classified = {}
+    for concept, items in triples.items():
+        entries = []
+        for subj, rel, obj in items:
+            neighbors = sorted(owners[(rel, obj.lower())] - {concept})
+            entries.append({
+                "triple": f"{subj} {rel.replace('_', ' ')} {obj}",
+                "subject": subj,
+                "relation": rel,
+                "object": obj,
+                "label": "common" if neighbors else "topic_marker",
+                "neighboring_concepts": neighbors,
+            })
+        classified[concept] = entries
+
+    return classified
+
+
+# ---------------------------------------------------------
+# Fast path: structured file -> classification -> lookup -> riddles
+# ---------------------------------------------------------
+def ingest_structured(triples_path: str = STRUCTURED_PATH,
+                      templates_path: str = "templates/templates.json",
+                      lookup_path: str = "lookup/lookup.json",
+                      classified_path: str = None):
+    """
+    Run a curated domain through the pipeline without Wikipedia/BERT
+    extraction or sentence normalisation. Returns (lookup, riddles).
+    """
+    from generator import RiddleGenerator
+    from lookup_builder import build_lookup
+
+    classified = classify_structured(load_structured_triples(triples_path))
+
+    if classified_path:
+        with open(classified_path, "w", encoding="utf-8") as f:
+            json.dump(classified, f, indent=2, ensure_ascii=False)
+
+    lookup = build_lookup(classified, lookup_path)
+    # with the lookup, clue records carry property ids
+    riddles = RiddleGenerator(classified, templates_path, lookup=lookup).generate_all()
+    return lookup, riddles
+
+
+if __name__ == "__main__":
+    lookup, riddles = ingest_structured(
+        classified_path="data/zoology_classified_triples.json",
+        lookup_path="data/zoology_lookup.json",
+    )
+    with open("data/zoology_riddles.json", "w", encoding="utf-8") as f:
+        json.dump({"riddles": riddles}, f, indent=2, ensure_ascii=False)
+    print(f"[triple_loader] {len(lookup['concept_to_props'])} concepts, {len(riddles)} riddles")
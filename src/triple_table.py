@@ -0,0 +1,182 @@
+import math
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from triple_loader import is_structured
+
+
+class StringPool:
+    """Interns strings to dense integer ids (and back)."""
+
+    __slots__ = ("_ids", "_strings")
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+
+    def intern(self, text: str) -> int:
+        sid = self._ids.get(text)
+        if sid is None:
+            sid = len(self._strings)
+            self._ids[text] = sid
+            self._strings.append(text)
+        return sid
+
+    def id_of(self, text: str) -> Optional[int]:
+        return self._ids.get(text)
+
+    def __getitem__(self, sid: int) -> str:
+        return self._strings[sid]
+
+    def __len__(self):
+        return len(self._strings)
+
+
+class TripleSlice:
+    """
+    One concept's rows: a (start, stop) window read straight from the
+    table's columns, so nothing is copied or decoded until asked for. No
+    buffer is exported either (a memoryview would make the next append
+    raise BufferError), so the table can keep growing while a slice is
+    alive.
+    """
+
+    __slots__ = ("table", "start", "stop")
+
+    def __init__(self, table: "TripleTable", start: int, stop: int):
+        self.table = table
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, i: int) -> Tuple[int, int, int, float, int]:
+        """(relation id, object id, label code, distance, structured) of row i."""
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        t, row = self.table, self.start + i
+        return t.relation[row], t.object[row], t.label[row], t.distance[row], t.structured[row]
+
+    def neighbor_ids(self, i: int) -> array:
+        row = self.start + i
+        offsets = self.table.neigh_offset
+        return self.table.neighbors[offsets[row]:offsets[row + 1]]
+
+
+class TripleTable:
+    """
+    Column store for classified triples (the triples_class.json content).
+
+    One row per triple, all columns are typed arrays:
+      concept, relation, object  -> ids into a shared StringPool; a sentence
+                                    row keeps relation "" and the whole
+                                    sentence as object: the generator
+                                    (extract_property) and the lookup
+                                    (extract_property_from_sentence) strip
+                                    it by different rules, each from the
+                                    original sentence
+      label                      -> index into LABELS (-1 = unlabelled)
+      distance                   -> float32 avg neighbour distance (nan if absent)
+      structured                 -> 1 if relation/object came from a structured
+                                    triple, 0 if split from a sentence
+      neigh_offset / neighbors   -> CSR layout of neighbouring concept ids
+    Rows of a concept are contiguous, so per-concept access is a slice.
+    """
+
+    __slots__ = ("strings", "concept", "relation", "object", "label", "distance",
+                 "structured", "neigh_offset", "neighbors", "_spans")
+
+    LABELS = ("topic_marker", "common")
+
+    def __init__(self):
+        self.strings = StringPool()
+        self.concept = array("i")
+        self.relation = array("i")
+        self.object = array("i")
+        self.label = array("b")
+        self.distance = array("f")
+        self.structured = array("b")
+        self.neigh_offset = array("I", [0])
+        self.neighbors = array("i")
+        self._spans: Dict[int, Tuple[int, int]] = {}
+
+    # ------------------------------------------
+    # Building
+    # ------------------------------------------
+    def add_concept(self, concept: str, entries: Iterable) -> None:
+        """Append all entries of one concept (triples_class.json entries)."""
+        cid = self.strings.intern(concept)
+        if cid in self._spans:
+            raise ValueError(f"Concept already in table: {concept}")
+
+        start = len(self.concept)
+        for e in entries:
+            if is_structured(e):
+                rel, obj, structured = e["relation"], e["object"], 1
+            else:
+                sent = e.get("triple") if isinstance(e, dict) else e
+                rel, obj, structured = "", str(sent), 0
+
+            label = e.get("label") if isinstance(e, dict) else None
+            dist = e.get("avg_distance") if isinstance(e, dict) else None
+            neigh = e.get("neighboring_concepts", []) if isinstance(e, dict) else []
+
+            self.concept.append(cid)
+            self.relation.append(self.strings.intern(rel))
+            self.object.append(self.strings.intern(obj))
+            self.label.append(self.LABELS.index(label) if label in self.LABELS else -1)
+            self.distance.append(math.nan if dist is None else dist)
+            self.structured.append(structured)
+            self.neighbors.extend(self.strings.intern(n) for n in neigh)
+            self.neigh_offset.append(len(self.neighbors))
+
+        self._spans[cid] = (start, len(self.concept))
+
+    @classmethod
+    def from_classified(cls, data) -> "TripleTable":
+        """Build from a triples_class.json-style dict or (concept, entries) pairs."""
+        table = cls()
+        items = data.items() if isinstance(data, dict) else data
+        for concept, entries in items:
+            table.add_concept(concept, entries)
+        return table
+
+    # ------------------------------------------
+    # Access
+    # ------------------------------------------
+    def __len__(self):
+        return len(self.concept)
+
+    def __contains__(self, concept: str) -> bool:
+        cid = self.strings.id_of(concept)
+        return cid is not None and cid in self._spans
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.strings[cid] for cid in self._spans)
+
+    def concepts(self) -> List[str]:
+        return list(self)
+
+    def rows(self, concept: str) -> TripleSlice:
+        cid = self.strings.id_of(concept)
+        if cid is None or cid not in self._spans:
+            raise KeyError(concept)
+        return TripleSlice(self, *self._spans[cid])
+
+    def iter_rows(self, concept: str):
+        """
+        Decode a concept's rows as
+        (relation, object, label, neighboring_concepts, structured).
+        """
+        view = self.rows(concept)
+        s = self.strings
+        for i in range(len(view)):
+            rel, obj, code, _, structured = view[i]
+            yield (
+                s[rel],
+                s[obj],
+                self.LABELS[code] if code >= 0 else None,
+                [s[n] for n in view.neighbor_ids(i)],
+                bool(structured),
+            )
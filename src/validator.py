@@ -1,6 +1,91 @@
 import json
+import multiprocessing
+import os
 import re
-from typing import List, Set
+from collections import Counter, defaultdict
+from functools import partial
+from typing import Dict, List, Set, Tuple
+
+from lookup_builder import iter_lookup_properties
+from triple_loader import iter_json_array, iter_json_members
+from triple_table import TripleTable
+
+
+# ---------------------------------------------------------
+#   SOLVE HELPERS (shared with the sharded coordinator)
+# ---------------------------------------------------------
+FALLBACK_SIZE = 5
+
+# (positive candidates, {negated clue: candidates having it}, [(concept, score)])
+Partial = Tuple[Set[str], Dict[str, Set[str]], List[Tuple[str, int]]]
+
+
+def canonical_clues(clues: List[str], aliases: Dict[str, str]) -> List[str]:
+    return list(dict.fromkeys(aliases.get(c, c) for c in clues))
+
+
+def rank_fallback(scored) -> List[Tuple[str, int]]:
+    # ties broken by name so the ranking does not depend on set order
+    return sorted(scored, key=lambda x: (-x[1], x[0]))[:FALLBACK_SIZE]
+
+
+def apply_negations(candidates: Set[str], having: Dict[str, Set[str]], neg_clues: List[str]) -> Set[str]:
+    candidates = set(candidates)
+    for n in neg_clues:
+        # if equals a concept, remove it
+        if n in candidates:
+            candidates.discard(n)
+            continue
+        # if equals a property, remove all concepts with that property
+        candidates -= having.get(n, set())
+    return candidates
+
+
+def _resolve_property(clue: Dict, prefix: str, id_to_property: Dict[int, str]):
+    phrase = clue.get(f"{prefix}property")
+    pid = clue.get(f"{prefix}property_id")
+    if pid is not None and pid in id_to_property:
+        # ids are only meaningful against the lookup they were issued by
+        if phrase is None or id_to_property[pid] == phrase:
+            return id_to_property[pid]
+    return phrase
+
+
+def clues_from_record(clues: List[Dict], id_to_property: Dict[int, str] = None):
+    """
+    (pos_clues, neg_clues) straight from the generator's clue records,
+    without reading the riddle text: property ids resolve through the
+    lookup's property_ids, falling back to the stored phrase.
+    """
+    id_to_property = id_to_property or {}
+    pos, neg = [], []
+    for clue in clues:
+        prop = _resolve_property(clue, "", id_to_property)
+        if prop:
+            pos.append(prop)
+        if clue.get("neg_concept"):
+            neg.append(clue["neg_concept"])
+        neg_prop = _resolve_property(clue, "neg_", id_to_property)
+        if neg_prop:
+            neg.append(neg_prop)
+    return pos, neg
+
+
+def merge_partials(partials: List[Partial], pos_clues: List[str], neg_clues: List[str]) -> List[str]:
+    candidates, having, fallback = set(), defaultdict(set), []
+    for cand, hv, fb in partials:
+        candidates |= cand
+        for n, cs in hv.items():
+            having[n] |= cs
+        fallback.extend(fb)
+
+    candidates = apply_negations(candidates, having, neg_clues)
+
+    # fallback if empty → best property match
+    if not candidates and pos_clues:
+        return [c for c, _ in rank_fallback(fallback)]
+
+    return sorted(candidates)
 
 
 # ---------------------------------------------------------
@@ -10,21 +95,55 @@ class RiddleValidator:
     def __init__(self, lookup_file: str = "lookup/lookup.json"):
         self.lookup_file = lookup_file
 
-        with open(self.lookup_file, "r", encoding="utf-8") as f:
-            self.lookup = json.load(f)
+        if isinstance(lookup_file, TripleTable):
+            self._init_from_table(lookup_file)
+            return
+
+        if not os.path.exists(self.lookup_file):
+            raise FileNotFoundError(f"Lookup file not found: {self.lookup_file}")
 
         # lookup structure:
         # {
         #   "concept_to_props": {concept: [prop1, ...], ...},
-        #   "prop_to_concepts": {prop: [concepts...], ...}
+        #   "prop_to_concepts": {prop: [concepts...], ...},
+        #   "triples": {...}, "aliases": {...}, "property_ids": {...}
         # }
-
-        self.concept_to_props = {
-            k: set(v) for k, v in self.lookup.get("concept_to_props", {}).items()
-        }
-        self.prop_to_concepts = {
-            k: set(v) for k, v in self.lookup.get("prop_to_concepts", {}).items()
-        }
+        # Only concept_to_props, aliases and property_ids are read, one
+        # concept at a time; prop_to_concepts is the inverse of
+        # concept_to_props and "triples" is never needed here.
+        self.lookup = None
+        self.concept_to_props = {}
+        self.prop_to_concepts = defaultdict(set)
+        for concept, props in iter_json_members(self.lookup_file, "concept_to_props"):
+            self.concept_to_props[concept] = set(props)
+            for p in props:
+                self.prop_to_concepts[p].add(concept)
+        self.prop_to_concepts = dict(self.prop_to_concepts)
+        # merged near-duplicate phrase -> canonical property (consolidated lookups)
+        self.aliases = dict(iter_json_members(self.lookup_file, "aliases"))
+        # ids used by the generator's clue records
+        self.id_to_property = {i: p for p, i in iter_json_members(self.lookup_file, "property_ids")}
+
+    def _init_from_table(self, table: TripleTable):
+        # build the two indexes straight from the table, no lookup.json needed
+        self.lookup = None
+        self.concept_to_props = defaultdict(set)
+        self.prop_to_concepts = defaultdict(set)
+        for concept, prop, _, _ in iter_lookup_properties(table):
+            self.concept_to_props[concept].add(prop)
+            self.prop_to_concepts[prop].add(concept)
+        self.concept_to_props = dict(self.concept_to_props)
+        self.prop_to_concepts = dict(self.prop_to_concepts)
+        self.aliases = {}
+        # same numbering build_lookup gives property_ids
+        self.id_to_property = dict(enumerate(sorted(self.prop_to_concepts)))
+
+    def all_properties(self) -> Set[str]:
+        """Every phrase worth scanning riddle text for, aliases included."""
+        return set(self.prop_to_concepts.keys()) | set(self.aliases)
+
+    def clues_from_record(self, clues: List[Dict]):
+        return clues_from_record(clues, self.id_to_property)
 
     # ------------------------------------------
     # Solve the riddle using clue matching
@@ -38,48 +157,39 @@ class RiddleValidator:
           - remove negated concepts/properties
           - fallback: return best matches when empty
         """
+        # map near-duplicate phrases onto their canonical property
+        pos_clues = canonical_clues(pos_clues, self.aliases)
+        neg_clues = canonical_clues(neg_clues, self.aliases)
+        return merge_partials([self.solve_partial(pos_clues, neg_clues)], pos_clues, neg_clues)
 
-        all_concepts = set(self.concept_to_props.keys())
-
+    def solve_partial(self, pos_clues: List[str], neg_clues: List[str]) -> Partial:
+        """
+        This index's share of a solve over canonical clues. Partials of
+        concept-disjoint shards combine with merge_partials into exactly
+        the single-index answer.
+        """
         # start with all or intersection of pos_clues
         if not pos_clues:
-            candidates = set(all_concepts)
+            candidates = set(self.concept_to_props)
         else:
-            candidates = None
-            for p in pos_clues:
-                matching = set(self.prop_to_concepts.get(p, []))
-                if candidates is None:
-                    candidates = matching
-                else:
-                    candidates &= matching
-
-            if candidates is None:
-                candidates = set()
-
-        # apply negations
-        for n in neg_clues:
-            # if equals a concept, remove it
-            if n in candidates:
-                candidates.discard(n)
-                continue
-
-            # if equals a property, remove all concepts with that property
-            for c in list(candidates):
-                if n in self.concept_to_props.get(c, set()):
-                    candidates.discard(c)
-
-        # fallback if empty → compute best property match
-        if not candidates and pos_clues:
-            scores = {}
-            for c in all_concepts:
-                props = self.concept_to_props.get(c, set())
-                score = sum(1 for p in pos_clues if p in props)
-                if score > 0:
-                    scores[c] = score
-            ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-            return [c for c, _ in ranked[:5]]
-
-        return sorted(list(candidates))
+            candidates = set(self.prop_to_concepts.get(pos_clues[0], ()))
+            for p in pos_clues[1:]:
+                candidates &= self.prop_to_concepts.get(p, set())
+
+        # candidates a negated property would remove
+        having = {
+            n: {c for c in candidates if n in self.concept_to_props.get(c, ())}
+            for n in neg_clues
+        }
+
+        # the fallback ranking is only needed if every shard ends up empty;
+        # a locally non-empty result already rules that out
+        fallback = []
+        if pos_clues and not apply_negations(candidates, having, neg_clues):
+            scores = Counter(c for p in pos_clues for c in self.prop_to_concepts.get(p, ()))
+            fallback = rank_fallback(scores.items())
+
+        return candidates, having, fallback
 
 
 # ---------------------------------------------------------
@@ -114,49 +224,173 @@ def extract_clues_from_riddle(riddle: str, all_properties: Set[str]):
 # ---------------------------------------------------------
 #   VALIDATION PIPELINE
 # ---------------------------------------------------------
+def iter_riddles(riddles_path: str):
+    """
+    Yield riddle dicts from a JSON list, a {"riddles": [...]} file (as
+    written by RiddleGenerator.save) or JSONL (one riddle per line), one
+    riddle decoded at a time in every case.
+    """
+    if not riddles_path.endswith(".jsonl"):
+        yield from iter_json_array(riddles_path, "riddles")
+        return
+
+    with open(riddles_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_validated(results, output_path: str) -> int:
+    """
+    Write validation records as they come: one per line for .jsonl, else
+    a JSON array (laid out like json.dump(..., indent=2)) written record
+    by record. Returns the number written.
+    """
+    count = 0
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        if output_path.endswith(".jsonl"):
+            for record in results:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+            return count
+
+        for record in results:
+            body = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            f.write(("[\n  " if count == 0 else ",\n  ") + body)
+            count += 1
+        f.write("\n]" if count else "[]")
+    return count
+
+
+def validate_item(item, validator: RiddleValidator, all_properties: Set[str], audit: bool = False) -> dict:
+    """
+    Riddles carrying the generator's "clues" records are solved from them
+    directly (an index lookup per clue). Older riddles, or any riddle with
+    audit=True, go through text scanning; in audit mode the record-based
+    answer is attached for comparison.
+    """
+    # your riddle structure: {concept, version, riddle, clues?}
+    clues = item.get("clues")
+    if clues and not audit:
+        pos, neg = validator.clues_from_record(clues)
+        record = validation_record(item, pos, neg, validator.solve(pos, neg))
+        record["clue_source"] = "record"
+        return record
+
+    # extract clues
+    pos, neg = extract_clues_from_riddle(item["riddle"], all_properties)
+
+    # solve using lookup
+    record = validation_record(item, pos, neg, validator.solve(pos, neg))
+    record["clue_source"] = "text"
+    if clues:
+        rpos, rneg = validator.clues_from_record(clues)
+        add_audit(record, rpos, rneg, validator.solve(rpos, rneg))
+    return record
+
+
+def add_audit(record: dict, pos: List[str], neg: List[str], possible_answers: List[str]) -> dict:
+    """Attach the record-based solve next to a text-scanned one."""
+    record["audit"] = {
+        "record_pos_clues": pos,
+        "record_neg_clues": neg,
+        "record_possible_answers": possible_answers,
+        "agrees": possible_answers == record["possible_answers"],
+    }
+    return record
+
+
+def validation_record(item, pos: List[str], neg: List[str], possible_answers: List[str]) -> dict:
+    best_answer = possible_answers[0] if possible_answers else None
+
+    return {
+        "concept": item.get("concept"),
+        "version": item.get("version"),
+        "riddle": item["riddle"],
+        "pos_clues": pos,
+        "neg_clues": neg,
+        "answer": best_answer,
+        "possible_answers": possible_answers
+    }
+
+
 def validate_riddles(
     riddles_path: str,
     lookup_path: str,
-    output_path: str = "/Users/niharikasriparasa/karmaYogi/RiddleQuest1.0/data/json/riddles_validated.json"
+    output_path: str = "riddles_validated.json",
+    audit: bool = False
 ):
 
-    # load riddles
-    riddles = json.load(open(riddles_path, "r", encoding="utf-8"))
-
     # init validator
     validator = RiddleValidator(lookup_file=lookup_path)
 
-    all_properties = set(validator.prop_to_concepts.keys())
+    all_properties = validator.all_properties()
 
-    output = []
+    # streamed: one riddle in, one record out
+    results = (validate_item(item, validator, all_properties, audit) for item in iter_riddles(riddles_path))
+    count = write_validated(results, output_path)
 
-    for item in riddles:
+    print(f"✔ Saved {count} validated riddles → {output_path}")
+    return count
 
-        # your riddle structure: {concept, version, riddle}
-        riddle_text = item["riddle"]
 
-        # extract clues
-        pos, neg = extract_clues_from_riddle(riddle_text, all_properties)
+# ---------------------------------------------------------
+#   PARALLEL STREAMING VALIDATION
+# ---------------------------------------------------------
+# Set in the parent before the pool forks, so workers share the lookup
+# copy-on-write instead of each re-reading lookup.json.
+_WORKER_STATE = None
 
-        # solve using lookup
-        possible_answers = validator.solve(pos, neg)
-        best_answer = possible_answers[0] if possible_answers else None
 
-        output.append({
-            "concept": item.get("concept"),
-            "version": item.get("version"),
-            "riddle": riddle_text,
-            "pos_clues": pos,
-            "neg_clues": neg,
-            "answer": best_answer,
-            "possible_answers": possible_answers
-        })
+def _init_worker(lookup_path):
+    # always rebuilt: a previous run in this process may have used another lookup
+    global _WORKER_STATE
+    validator = RiddleValidator(lookup_file=lookup_path)
+    _WORKER_STATE = (validator, validator.all_properties())
 
-    # save
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
 
-    print(f"✔ Saved validated riddles → {output_path}")
+def _validate_in_worker(item, audit=False):
+    validator, all_properties = _WORKER_STATE
+    return validate_item(item, validator, all_properties, audit)
+
+
+def validate_riddles_parallel(
+    riddles_path: str,
+    lookup_path: str,
+    output_path: str = "riddles_validated.jsonl",
+    workers: int = None,
+    chunksize: int = 64,
+    audit: bool = False
+) -> int:
+    """
+    Stream riddles through a process pool and write the results in input
+    order as each chunk is done (see write_validated). The lookup is
+    loaded once in the parent and inherited by forked workers.
+    Returns the number of riddles validated.
+    """
+    global _WORKER_STATE
+
+    methods = multiprocessing.get_all_start_methods()
+    if "fork" in methods:
+        ctx = multiprocessing.get_context("fork")
+        _init_worker(lookup_path)
+        pool = ctx.Pool(workers)
+    else:
+        ctx = multiprocessing.get_context()
+        pool = ctx.Pool(workers, initializer=_init_worker, initargs=(lookup_path,))
+
+    try:
+        with pool:
+            worker = partial(_validate_in_worker, audit=audit)
+            count = write_validated(pool.imap(worker, iter_riddles(riddles_path), chunksize=chunksize),
+                                    output_path)
+    finally:
+        # release the parent's copy of the lookup
+        _WORKER_STATE = None
+
+    print(f"✔ Saved {count} validated riddles → {output_path}")
+    return count
 
 
 # ---------------------------------------------------------
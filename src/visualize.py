@@ -1,7 +1,11 @@
+import hashlib
 import json
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+from triple_loader import ConceptStream
+from sklearn.decomposition import PCA
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.manifold import TSNE
 
@@ -14,8 +18,8 @@ class TripleVisualizer:
         self.triples_path = triples_path
         self.embeddings_path = embeddings_path
 
-        with open(triples_path, "r") as f:
-            self.triples = json.load(f)
+        # streamed from disk on each pass, one concept at a time
+        self.triples = ConceptStream(triples_path)
 
         if embeddings_path:
             with open(embeddings_path, "r") as f:
@@ -49,26 +53,31 @@ class TripleVisualizer:
         return "unknown_property"
 
     # --------------------------------------------------------------
-    # FANCY t-SNE PLOT (NO PCA)
+    # COLLECT EMBEDDINGS PER TRIPLE
     # --------------------------------------------------------------
-    def plot_tsne(self, save_path="tsne_fancy.png"):
-        if self.embeddings is None:
-            raise ValueError("No embeddings.json found.")
-
+    def _collect_embeddings(self, max_per_concept=None, seed=42, max_points=None):
+        """
+        Gather (embeds, concepts, labels, missing). With max_per_concept,
+        each concept is subsampled to at most that many triples so large
+        concepts cannot drown out small ones; max_points then caps the
+        total with a uniform subsample (many concepts x a per-concept cap
+        is still unbounded).
+        """
+        rng = np.random.default_rng(seed)
         embeds = []
         concepts = []
         labels = []
         missing = 0
 
         for concept, triples in self.triples.items():
-            for i, triple in enumerate(triples):
-                key = f"{concept}_{i}"
+            order = range(len(triples))
+            if max_per_concept and len(triples) > max_per_concept:
+                order = sorted(rng.choice(len(triples), max_per_concept, replace=False))
 
-                if key not in self.embeddings:
-                    missing += 1
-                    continue
-
-                emb = self.embeddings[key]
+            for i in order:
+                triple = triples[i]
+                # TripleEmbedder writes "Concept::i"; older files used "Concept_i"
+                emb = self.embeddings.get(f"{concept}::{i}", self.embeddings.get(f"{concept}_{i}"))
 
                 if not emb or len(emb) == 0:
                     missing += 1
@@ -78,6 +87,44 @@ class TripleVisualizer:
                 concepts.append(concept)
                 labels.append(triple["label"])
 
+        if max_points and len(embeds) > max_points:
+            keep = sorted(rng.choice(len(embeds), max_points, replace=False))
+            embeds = [embeds[i] for i in keep]
+            concepts = [concepts[i] for i in keep]
+            labels = [labels[i] for i in keep]
+
+        return embeds, concepts, labels, missing
+
+    @staticmethod
+    def file_version(path):
+        """File path, size and mtime, hashed."""
+        st = os.stat(path)
+        ident = f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+        return hashlib.sha1(ident.encode()).hexdigest()[:16]
+
+    def store_version(self):
+        """
+        Identifies the current embedding store: file path, size and mtime
+        for a file, a hash of the contents for in-memory embeddings.
+        """
+        if self.embeddings_path and os.path.exists(self.embeddings_path):
+            return self.file_version(self.embeddings_path)
+
+        digest = hashlib.sha1(b"in-memory")
+        for key in sorted(self.embeddings or {}):
+            digest.update(key.encode("utf-8") + b"\0")
+            digest.update(np.asarray(self.embeddings[key], dtype=np.float32).tobytes())
+        return digest.hexdigest()[:16]
+
+    # --------------------------------------------------------------
+    # FANCY t-SNE PLOT (NO PCA)
+    # --------------------------------------------------------------
+    def plot_tsne(self, save_path="tsne_fancy.png"):
+        if self.embeddings is None:
+            raise ValueError("No embeddings.json found.")
+
+        embeds, concepts, labels, missing = self._collect_embeddings()
+
         if len(embeds) == 0:
             print("[ERROR] No embeddings found.")
             return
@@ -153,6 +200,92 @@ class TripleVisualizer:
         print(f"[Saved] {save_path}")
         print(f"[Info] Missing embeddings skipped: {missing}")
 
+    # --------------------------------------------------------------
+    # SCALABLE PROJECTION (PCA -> t-SNE, SUBSAMPLED, CACHED)
+    # --------------------------------------------------------------
+    def project(self, max_per_concept=200, pca_dim=50, method="tsne",
+                cache_dir=".projection_cache", seed=42, max_points=20000):
+        """
+        2D coordinates for a stratified subsample of the embeddings (at
+        most max_per_concept per concept and max_points in total).
+        PCA first cuts the dimension (and is the whole projection for
+        method="pca"); t-SNE then only runs on the reduced, capped set.
+        Results are cached on disk keyed by the embedding-store and triples
+        file versions (the triples give the points and their labels) and the
+        projection settings, so unchanged inputs are never re-projected.
+        """
+        if self.embeddings is None:
+            raise ValueError("No embeddings.json found.")
+
+        versions = f"{self.store_version()}:{self.file_version(self.triples_path)}"
+        key = hashlib.sha1(
+            f"{versions}:{max_per_concept}:{max_points}:{pca_dim}:{method}:{seed}".encode()
+        ).hexdigest()[:16]
+        cache_file = os.path.join(cache_dir, f"projection_{key}.npz") if cache_dir else None
+
+        if cache_file and os.path.exists(cache_file):
+            cached = np.load(cache_file)
+            return cached["coords"], list(cached["concepts"]), list(cached["labels"])
+
+        embeds, concepts, labels, missing = self._collect_embeddings(max_per_concept, seed, max_points)
+        if not embeds:
+            raise ValueError("No embeddings found.")
+
+        X = np.asarray(embeds, dtype=np.float32)
+        n_components = min(pca_dim if method == "tsne" else 2, X.shape[0], X.shape[1])
+        reduced = PCA(n_components=n_components, random_state=seed).fit_transform(X)
+
+        if method == "tsne":
+            tsne = TSNE(
+                n_components=2,
+                perplexity=min(30, max(2, (len(X) - 1) // 3)),
+                init="pca",
+                random_state=seed,
+            )
+            reduced = tsne.fit_transform(reduced)
+
+        if cache_file:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.savez(cache_file, coords=reduced, concepts=np.array(concepts), labels=np.array(labels))
+
+        print(f"[Info] Projected {len(X)} points ({missing} missing embeddings skipped)")
+        return reduced, concepts, labels
+
+    def plot_projection(self, save_path="projection.png", hexbin_threshold=5000, **project_kwargs):
+        """
+        Plot project() output. Above `hexbin_threshold` points the figure is
+        drawn as a density hexbin with one label per concept centroid
+        instead of one marker and one text per point.
+        """
+        reduced, concepts, _ = self.project(**project_kwargs)
+        concepts = np.asarray(concepts)
+        concept_list = sorted(set(concepts.tolist()))
+
+        plt.figure(figsize=(12, 10))
+        if len(reduced) > hexbin_threshold:
+            plt.hexbin(reduced[:, 0], reduced[:, 1], gridsize=120, bins="log", cmap="viridis")
+            plt.colorbar(label="log10(count)")
+        else:
+            palette = sns.color_palette("husl", len(concept_list))
+            color_map = {c: palette[i] for i, c in enumerate(concept_list)}
+            plt.scatter(reduced[:, 0], reduced[:, 1], c=[color_map[c] for c in concepts],
+                        s=20, alpha=0.7, linewidth=0)
+
+        # one label per concept, at its centroid
+        for c in concept_list:
+            centre = reduced[concepts == c].mean(axis=0)
+            plt.text(centre[0], centre[1], c, fontsize=8, alpha=0.8)
+
+        plt.title("Projection of Concept Embeddings", fontsize=16)
+        plt.xlabel("Dim 1")
+        plt.ylabel("Dim 2")
+        plt.grid(alpha=0.2)
+        plt.tight_layout()
+        plt.savefig(save_path, dpi=150)
+        plt.close()
+
+        print(f"[Saved] {save_path}")
+
     # --------------------------------------------------------------
     # PROPERTY SIMILARITY FOR 3 CONCEPTS
     # --------------------------------------------------------------
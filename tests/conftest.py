@@ -0,0 +1,22 @@
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+
+# same layout riddlequest.py sets up: the riddlegenerator package from the
+# repo root, src/ modules by bare name
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+
+def entry(obj, relation="has", label="common", neighbors=()):
+    """A structured triples_class.json entry, as build_lookup reads it."""
+    return {"relation": relation, "object": obj, "label": label, "neighboring_concepts": list(neighbors)}
+
+
+def write_riddles(path, riddles):
+    """Save riddles in the generator's {"riddles": [...]} layout at `path`."""
+    path.write_text(json.dumps({"riddles": riddles}), encoding="utf-8")
+    return str(path)
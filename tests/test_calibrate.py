@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from calibrate import calibrate, _uniqueness
+from classifier import NeighborClassifier
+
+SAMPLES = 4000
+
+
+def draws(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random((SAMPLES, n_rows)), rng.random((SAMPLES, n_rows))
+
+
+@pytest.fixture()
+def classifier():
+    rng = np.random.default_rng(7)
+    data, embeddings = [], {}
+    for c, concept in enumerate(["Dog", "Wolf", "Cat", "Fish"]):
+        center = rng.normal(size=8) + 3 * np.eye(8)[c]
+        vecs = center + rng.normal(scale=1.2, size=(6, 8))
+        # traits 0-2 are shared by every concept, 3-5 are the concept's own
+        traits = [f"trait {i}" if i < 3 else f"{concept.lower()} trait {i}" for i in range(6)]
+        data.append({"concept": concept, "triples": [f"{concept} has {t}" for t in traits]})
+        embeddings[concept] = vecs
+    return lambda k: NeighborClassifier(data, n_neighbors=k, embeddings=embeddings)
+
+
+def test_grid_labels_match_classify(classifier):
+    thresholds = [0.2, 0.5, 0.8, 1.1]
+    report = calibrate(classifier(8), thresholds, ks=[2, 3, 5], samples=8)
+    assert len(report["rows"]) == 12
+
+    for row in report["rows"]:
+        labelled = classifier(row["k"]).classify_all(row["threshold"])
+        n_topic = sum(t["label"] == "topic_marker" for ts in labelled.values() for t in ts)
+        assert row["topic_marker"] == n_topic
+        assert 0 <= row["unique_riddles"] <= row["riddles"]
+    assert any(row["unique_riddles"] > 0 for row in report["rows"])
+
+
+def test_v1_uniqueness_follows_line_sampling():
+    # six markers, another concept owns five: a riddle is ambiguous exactly
+    # when the generator's five lines leave out the sixth (1 in 6)
+    topic = np.ones((6, 1), dtype=bool)
+    own = np.column_stack([np.ones(6), [1, 1, 1, 1, 1, 0]]).astype(np.int32)
+    v1_gen, v1_share, v2_gen, _ = _uniqueness(topic, np.arange(6), own, np.zeros((6, 1), np.int64), 1,
+                                              *draws(6))
+    assert v1_gen[0] and not v2_gen[0]
+    assert v1_share[0] == pytest.approx(5 / 6, abs=0.03)
+
+
+def test_v2_negates_one_random_neighbour_per_line():
+    # three common lines, both neighbours own them all: unique only if the
+    # lines between them negate both neighbours (1 - 2 / 2**3)
+    topic = np.zeros((3, 1), dtype=bool)
+    own = np.ones((3, 3), dtype=np.int32)
+    nbr_col = np.array([[1, 2]] * 3)
+    v1_gen, _, v2_gen, v2_share = _uniqueness(topic, np.arange(3), own, nbr_col, 2, *draws(3))
+    assert v2_gen[0] and not v1_gen[0]
+    assert v2_share[0] == pytest.approx(0.75, abs=0.03)
+
+    # with k=1 each line only sees neighbour 1, so neighbour 2 always fits
+    _, _, _, v2_share = _uniqueness(topic, np.arange(3), own, nbr_col, 1, *draws(3))
+    assert v2_share[0] == 0
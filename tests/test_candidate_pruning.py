@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from riddlegenerator import candidate_pruning
+from riddlegenerator.candidate_pruning import BackgroundIDF, build_background, default_background, prune_candidates
+
+SUMMARY = ("The wolf is a large canine. Wolves hunt in packs and howl to communicate. "
+           "A wolf pack hunts deer, and hunting is done at night.")
+
+
+def test_filters_and_lemma_duplicates():
+    rake = [(9.0, "wolf pack"), (8.0, "hunts deer"), (4.0, "howl"), (1.0, "the"),
+            (5.0, "a very long phrase that goes on and on")]
+    pos = ["hunting", "hunt", "wolves", "canine", "is", "42"]
+    kept, counts = prune_candidates("Wolf", SUMMARY, rake, pos, top_n=10,
+                                    lemmas={"hunting": "hunt", "hunts": "hunt", "wolves": "wolf"})
+
+    assert "the" not in kept and "is" not in kept and "42" not in kept
+    assert "wolves" not in kept                       # only concept words
+    assert "a very long phrase that goes on and on" not in kept
+    assert sum(p in kept for p in ("hunt", "hunting")) == 1
+    assert "hunts deer" in kept and "howl" in kept
+    assert counts["kept"] == len(kept)
+    assert counts["candidates"] == (counts["filtered"] + counts["duplicates"]
+                                    + counts["below_cut"] + counts["kept"])
+
+
+def word(i):
+    return "zz" + chr(97 + i % 26) + chr(97 + i // 26) + "q"
+
+
+def test_top_n_and_min_score_bound_the_output():
+    rake = [(float(i), f"{word(i)} marking") for i in range(1, 40)]
+    kept, counts = prune_candidates("Wolf", SUMMARY, rake, [], top_n=5)
+    assert kept == [f"{word(i)} marking" for i in range(39, 34, -1)]
+    assert counts["below_cut"] == 34
+
+    kept, _ = prune_candidates("Wolf", SUMMARY, rake, [], top_n=50, min_score=0.5)
+    assert kept and len(kept) < 39
+
+
+def test_idf_prefers_rare_words():
+    bg = BackgroundIDF.from_texts(["the wolf runs", "the cat runs", "the dog howls"])
+    assert bg.idf("howls") > bg.idf("runs") > bg.idf("the")
+    assert bg.idf("unseen") > bg.idf("howls")
+
+
+def test_default_background_does_not_write(tmp_path, monkeypatch):
+    summaries = tmp_path / "summaries.json"
+    summaries.write_text(json.dumps({"Wolf": "the wolf howls", "Cat": "the cat purrs"}), encoding="utf-8")
+    out = tmp_path / "background_df.json"
+    monkeypatch.setattr(candidate_pruning, "SUMMARY_CACHE_PATH", str(summaries))
+    monkeypatch.setattr(candidate_pruning, "BACKGROUND_PATH", str(out))
+    monkeypatch.setattr(candidate_pruning, "_background", None)
+
+    assert default_background().n_docs == 2
+    assert not out.exists()
+
+    build_background(str(summaries), str(out))
+    assert BackgroundIDF.load(str(out)).df == default_background().df
+
+
+def test_kept_phrases_keep_their_case():
+    summary = "The lion lives in Africa and hunts Zebras on the savanna."
+    rake = [(4.0, "africa"), (3.0, "savanna")]
+    kept, counts = prune_candidates("Lion", summary, rake, ["Africa", "Zebras", "savanna"], top_n=10)
+    assert "Africa" in kept and "africa" not in kept
+    assert "Zebras" in kept and "savanna" in kept
+    assert counts["candidates"] == 3
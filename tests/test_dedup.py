@@ -0,0 +1,56 @@
+from conftest import ROOT, entry
+from dedup import MinHashLSH, consolidate_properties, jaccard, shingles
+from lookup_builder import build_lookup
+from validator import RiddleValidator
+
+
+def test_shingles_ignore_articles_and_inflection():
+    assert shingles("has dewclaw on some breeds") == shingles("have a dewclaw on some breeds")
+    assert shingles("communicates barking") == shingles("communicate barking")
+
+
+def test_consolidate_merges_variants_only():
+    phrases = ["communicates barking", "communicate barking", "very acute hearing",
+               "acute hearing", "webbed feet"]
+    mapping = consolidate_properties(phrases, {"communicate barking": 3, "communicates barking": 1})
+
+    assert set(mapping) == set(phrases)
+    assert mapping["communicates barking"] == "communicate barking"  # heavier phrase wins
+    assert jaccard(shingles("very acute hearing"), shingles("acute hearing")) < 0.7
+    assert mapping["very acute hearing"] == "very acute hearing"
+    assert mapping["acute hearing"] == "acute hearing"
+    assert mapping["webbed feet"] == "webbed feet"
+
+
+def test_lsh_pairs_every_identical_signature():
+    lsh = MinHashLSH()
+    sigs = [lsh.signature(shingles(p)) for p in ("sharp claws", "sharp claw", "long tail")]
+    pairs = lsh.candidate_pairs(sigs)
+    assert (0, 1) in pairs
+    assert all(2 not in pair for pair in pairs)
+
+
+def test_consolidated_lookup_solves_variant_clues(tmp_path):
+    triples = {"Dog": [entry("dewclaw on some breeds")],
+               "Wolf": [entry("a dewclaw on some breeds"), entry("thick fur")]}
+    path = str(tmp_path / "lookup.json")
+    lookup = build_lookup(triples, path, consolidate=True)
+
+    (canonical,) = [p for p in lookup["prop_to_concepts"] if "dewclaw" in p]
+    assert lookup["prop_to_concepts"][canonical] == ["Dog", "Wolf"]
+    assert list(lookup["aliases"].values()) == [canonical]
+    assert set(lookup["property_ids"]) == set(lookup["prop_to_concepts"])
+
+    validator = RiddleValidator(path)
+    (variant,) = lookup["aliases"]
+    assert set(validator.solve([variant], [])) == {"Dog", "Wolf"}
+    assert validator.solve([variant, "thick fur"], []) == ["Wolf"]
+
+
+def test_lookup_builder_does_not_import_numpy():
+    import subprocess
+    import sys
+
+    code = "import sys; sys.path.insert(0, 'src'); import lookup_builder; print('numpy' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
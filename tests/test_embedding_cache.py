@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+
+from conftest import ROOT  # noqa: F401  (sets up sys.path)
+from embedding_cache import CACHE_ENV, CachedEncoder, EmbeddingCache, cache_key
+
+
+def stored_bytes(cache):
+    return cache.conn.execute("SELECT COALESCE(SUM(LENGTH(vec)), 0) FROM embeddings").fetchone()[0]
+
+
+def test_meta_row_tracks_inserts_replacements_and_evictions(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_bytes=10 * 16)
+    cache.put_many((cache_key("m", f"s{i}"), np.ones(4)) for i in range(6))
+    assert cache.size_bytes() == stored_bytes(cache) == 6 * 16
+
+    # INSERT OR REPLACE of a wider vector
+    cache.put_many([(cache_key("m", "s0"), np.ones(8))])
+    assert cache.size_bytes() == stored_bytes(cache) == 7 * 16
+
+    cache.put_many((cache_key("m", f"t{i}"), np.ones(4)) for i in range(6))
+    assert cache.size_bytes() == stored_bytes(cache) <= 10 * 16
+    assert cache.get_many([cache_key("m", "t5")])
+    cache.close()
+
+
+def test_meta_row_backfilled_for_an_old_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = EmbeddingCache(path)
+    cache.put_many([(cache_key("m", "a"), np.ones(4)), (cache_key("m", "b"), np.ones(2))])
+    cache.conn.executescript("DROP TABLE meta; DROP TRIGGER embeddings_bytes_insert;"
+                             "DROP TRIGGER embeddings_bytes_delete;")
+    cache.close()
+
+    cache = EmbeddingCache(path)
+    assert cache.size_bytes() == 24
+    cache.close()
+
+
+def test_cache_path_is_read_when_the_cache_is_opened(tmp_path, monkeypatch):
+    path = tmp_path / "nested" / "cache.sqlite"
+    monkeypatch.setenv(CACHE_ENV, str(path))
+    cache = EmbeddingCache()
+    assert cache.path == str(path) and os.path.exists(path)
+    cache.close()
+
+
+class CountingModel:
+    def __init__(self):
+        self.seen = []
+
+    def encode(self, sentences, batch_size=64):
+        self.seen.extend(sentences)
+        return np.array([[len(s), 1.0] for s in sentences])
+
+
+def test_encoder_only_embeds_misses(tmp_path):
+    encoder = CachedEncoder("m", cache=EmbeddingCache(str(tmp_path / "cache.sqlite")))
+    encoder._model = CountingModel()
+
+    first = encoder.encode(["Dog barks.", "Cat  purrs.", "Dog barks."])
+    second = encoder.encode(["Cat purrs.", "Fish swim."])
+    assert encoder._model.seen == ["Dog barks.", "Cat  purrs.", "Fish swim."]
+    assert np.array_equal(first[1], second[0])
+    assert encoder.encode("Dog barks.").shape == (2,)
@@ -0,0 +1,96 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from conftest import ROOT  # noqa: F401  (sets up sys.path)
+from riddlegenerator import wiki_source
+from riddlegenerator.extraction_daemon import (
+    ExtractionClient, ExtractionDaemon, Prefetcher, daemon_running, get_extractor,
+)
+
+
+class FakeSummaries:
+    def summary(self, concept, sentences=5):
+        if concept == "Nowhere":
+            raise KeyError(concept)
+        return f"{concept} is an animal."
+
+
+@pytest.fixture()
+def daemon(monkeypatch, tmp_path):
+    """An ExtractionDaemon over a stand-in extraction module (no models)."""
+    calls = []
+
+    def extract_triples_with_counts(concept, summary):
+        calls.append(concept)
+        time.sleep(0.05)
+        return [(concept, "is", "animal")], {"candidates": 1, "kept": 1}
+
+    fake = types.ModuleType("riddlegenerator.triples_extraction")
+    fake.extract_triples_with_counts = extract_triples_with_counts
+    monkeypatch.setitem(sys.modules, "riddlegenerator.triples_extraction", fake)
+    monkeypatch.setattr(wiki_source, "summary_source", FakeSummaries)
+
+    instance = ExtractionDaemon(str(tmp_path / "d.sock"), cache_size=2)
+    instance.calls = calls
+    return instance
+
+
+def test_concurrent_requests_share_one_extraction(daemon):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(daemon.extract("Dog"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert daemon.calls == ["Dog"]
+    assert results == [([("Dog", "is", "animal")], {"candidates": 1, "kept": 1})] * 4
+
+    daemon.extract("Cat")
+    daemon.extract("Fox")
+    daemon.extract("Dog")  # evicted from the 2-entry LRU
+    assert daemon.calls == ["Dog", "Cat", "Fox", "Dog"]
+
+
+def test_client_round_trip_over_the_socket(daemon):
+    threading.Thread(target=daemon.serve_forever, daemon=True).start()
+    for _ in range(100):
+        if daemon_running(daemon.path):
+            break
+        time.sleep(0.01)
+    assert daemon_running(daemon.path)
+
+    client = ExtractionClient(daemon.path)
+    assert client.extract_triples("Dog") == [("Dog", "is", "animal")]
+    assert client.extract_concept("Dog") == ([("Dog", "is", "animal")], {"candidates": 1, "kept": 1})
+    with pytest.raises(RuntimeError, match="Could not fetch"):
+        client.extract_triples("Nowhere")
+    client.close()
+
+    extractor = get_extractor(daemon.path, counts=True)
+    assert extractor("Cat")[0] == [("Cat", "is", "animal")]
+    assert daemon.calls == ["Dog", "Cat"]
+
+    with pytest.raises(RuntimeError, match="already serving"):
+        ExtractionDaemon.serve_forever(daemon)
+
+
+def test_no_daemon_on_a_missing_or_stale_socket(tmp_path):
+    assert not daemon_running(str(tmp_path / "missing.sock"))
+    stale = tmp_path / "stale.sock"
+    stale.write_text("")
+    assert not daemon_running(str(stale))
+
+
+def test_prefetcher_runs_each_concept_once():
+    seen = []
+    prefetcher = Prefetcher(lambda concept: seen.append(concept) or concept.upper())
+    prefetcher.prefetch("dog")
+    assert prefetcher.get("dog") == "DOG"
+    assert prefetcher.get("cat") == "CAT"
+    assert seen == ["dog", "cat"]
+    prefetcher.close()
@@ -0,0 +1,67 @@
+import os
+import random
+
+import pytest
+
+from conftest import ROOT, write_riddles
+from triple_loader import ingest_structured
+from validator import iter_riddles, validate_riddles
+
+ZOOLOGY = os.path.join(ROOT, "data", "zoology_triples.json")
+TEMPLATES = os.path.join(ROOT, "templates", "templates.json")
+
+
+@pytest.fixture()
+def structured(tmp_path):
+    random.seed(0)
+    lookup, riddles = ingest_structured(ZOOLOGY, TEMPLATES, str(tmp_path / "lookup.json"))
+    return str(tmp_path / "lookup.json"), lookup, riddles
+
+
+def test_structured_ingest_clues_carry_lookup_ids(structured):
+    _, lookup, riddles = structured
+    ids, concepts = lookup["property_ids"], lookup["concept_to_props"]
+    assert {r["version"] for r in riddles} == {"v1", "v2", "v3"}
+
+    for riddle in riddles:
+        for clue in riddle["clues"]:
+            assert clue["template"].startswith(riddle["version"] + ":")
+            assert clue["property_id"] == ids[clue["property"]]
+            if "neg_property" in clue:
+                assert clue["neg_property_id"] == ids[clue["neg_property"]]
+            if "neg_concept" in clue:
+                # a name, not an id: the solver removes it by name
+                assert clue["neg_concept"] in concepts and clue["neg_concept"] != riddle["concept"]
+
+
+def test_records_solve_without_the_text(structured, tmp_path):
+    lookup_path, _, riddles = structured
+    # the riddle text is not needed, and ids alone resolve the phrases
+    stripped = [dict(r, riddle="", clues=[{k: v for k, v in c.items() if k not in ("property", "neg_property")}
+                                          for c in r["clues"]])
+                for r in riddles]
+
+    out = {}
+    for name, items in (("full", riddles), ("ids", stripped)):
+        path = str(tmp_path / f"{name}.jsonl")
+        validate_riddles(write_riddles(tmp_path / f"{name}.json", items), lookup_path, path)
+        out[name] = list(iter_riddles(path))
+
+    assert [r["possible_answers"] for r in out["ids"]] == [r["possible_answers"] for r in out["full"]]
+    for record, riddle in zip(out["full"], riddles):
+        assert record["clue_source"] == "record"
+        if riddle["version"] != "v3":
+            assert riddle["concept"] in record["possible_answers"]
+
+
+def test_audit_compares_text_and_records(structured, tmp_path):
+    lookup_path, _, riddles = structured
+    riddles_path = write_riddles(tmp_path / "riddles.json", riddles)
+    plain, audit = str(tmp_path / "plain.jsonl"), str(tmp_path / "audit.jsonl")
+    validate_riddles(riddles_path, lookup_path, plain)
+    validate_riddles(riddles_path, lookup_path, audit, audit=True)
+
+    for solved, audited in zip(iter_riddles(plain), iter_riddles(audit)):
+        assert audited["clue_source"] == "text"
+        assert audited["audit"]["record_possible_answers"] == solved["possible_answers"]
+        assert audited["audit"]["agrees"] == (audited["possible_answers"] == solved["possible_answers"])
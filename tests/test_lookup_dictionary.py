@@ -0,0 +1,40 @@
+import pytest
+
+from riddlegenerator.lookup_dictionary import SQLiteConceptPropertyDictionary
+
+
+@pytest.fixture()
+def store(tmp_path):
+    with SQLiteConceptPropertyDictionary(str(tmp_path / "concepts.db"), id_cache_size=8) as store:
+        yield store
+
+
+def test_round_trip_labels_and_plain_triples(store):
+    store.add_triples("Dog", [(("Dog", "can", "bark"), "topic_marker"), (("Dog", "has", "fur"), None)])
+    store.add_triples("Cat", [("Cat", "is", "cute")])
+    store.add_triples("Fish", [])
+
+    assert store.get_properties("Dog") == [(("Dog", "can", "bark"), "topic_marker"),
+                                           (("Dog", "has", "fur"), None)]
+    assert store.get_properties("Cat") == [("Cat", "is", "cute")]
+    assert "Fish" in store and "Bird" not in store
+    assert sorted(store.concepts()) == ["Cat", "Dog", "Fish"]
+
+
+def test_failed_add_does_not_leave_stale_ids(store):
+    with pytest.raises(ValueError):
+        # the malformed last item fails after new strings were interned
+        store.add_triples("Dog", [(("Dog", "is", "loyal"), "topic_marker"), ("bad",)])
+    assert "Dog" not in store
+
+    store.add_triples("Cat", [(("Cat", "is", "cute"), "topic_marker")])
+    store._cache.clear()
+    assert store.get_properties("Cat") == [(("Cat", "is", "cute"), "topic_marker")]
+
+
+def test_reopen_reads_committed_rows(tmp_path):
+    path = str(tmp_path / "concepts.db")
+    with SQLiteConceptPropertyDictionary(path) as store:
+        store.add_triples("Dog", [(("Dog", "can", "bark"), "common")])
+    with SQLiteConceptPropertyDictionary(path) as store:
+        assert store.get_properties("Dog") == [(("Dog", "can", "bark"), "common")]
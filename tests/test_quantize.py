@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from conftest import ROOT  # noqa: F401  (sets up sys.path)
+from classifier import NeighborClassifier
+from quantize import QuantizedEmbeddings, label_agreement, load_for_classifier
+
+
+def make_classifier(concepts=20, per_concept=15, dim=64, k=3, seed=0):
+    rng = np.random.default_rng(seed)
+    data, embeddings = [], {}
+    for c in range(concepts):
+        name = f"C{c}"
+        centre = rng.normal(size=dim)
+        data.append({"concept": name, "triples": [f"{name} fact {i}." for i in range(per_concept)]})
+        embeddings[name] = centre + 0.8 * rng.normal(size=(per_concept, dim))
+    return NeighborClassifier(data, n_neighbors=k, embeddings=embeddings)
+
+
+def neighbour_agreement(classifier, index):
+    X = classifier.all_embeddings
+    _, exact = classifier.knn.kneighbors(X, n_neighbors=classifier.n_neighbors)
+    _, approx = index.kneighbors(X, n_neighbors=classifier.n_neighbors)
+    return np.mean([set(a) == set(b) for a, b in zip(exact, approx)])
+
+
+def test_int8_neighbours_match_sklearn():
+    classifier = make_classifier()
+    X = classifier.all_embeddings
+
+    plain = QuantizedEmbeddings(X, mode="int8", n_neighbors=3)
+    assert neighbour_agreement(classifier, plain) >= 0.9
+
+    reranked = QuantizedEmbeddings(X, mode="int8", rerank_vectors=X, n_neighbors=3)
+    assert neighbour_agreement(classifier, reranked) == 1.0
+
+
+def test_label_agreement_with_rerank_is_exact():
+    report = label_agreement(make_classifier(), mode="int8", rerank=True)
+    assert report["triples"] == 300
+    assert report["label_agreement"] == report["neighbour_agreement"] == 1.0
+    assert report["bytes_quantized"] < report["bytes_float32"] / 3
+
+
+def test_saved_store_is_put_in_classifier_order(tmp_path):
+    classifier = make_classifier(concepts=4, per_concept=5)
+    keys = [f"{c}::{i}" for c in classifier.concept_indices for i in range(5)]
+    shuffled = np.random.default_rng(1).permutation(len(keys))
+
+    path = str(tmp_path / "embeddings.int8.npz")
+    QuantizedEmbeddings(classifier.all_embeddings[shuffled], mode="int8").save(path)
+    np.save(f"{path}.keys.npy", np.array(keys)[shuffled])
+
+    index = load_for_classifier(classifier, path)
+    expected = QuantizedEmbeddings(classifier.all_embeddings, mode="int8")
+    assert np.array_equal(index.codes, expected.codes)
+    assert label_agreement(classifier, index=index)["mode"] == "int8"
+
+
+def test_store_missing_triples_is_rejected(tmp_path):
+    classifier = make_classifier(concepts=2, per_concept=3)
+    path = str(tmp_path / "embeddings.int8.npz")
+    QuantizedEmbeddings(classifier.all_embeddings[:5], mode="int8").save(path)
+    np.save(f"{path}.keys.npy", np.array(["C0::0", "C0::1", "C0::2", "C1::0", "C1::1"]))
+    with pytest.raises(ValueError, match="C1::2"):
+        load_for_classifier(classifier, path)
@@ -0,0 +1,58 @@
+import sys
+import threading
+
+from riddlegenerator.relation_memo import RelationMemo
+
+
+def test_flush_persists_and_reopens(tmp_path):
+    path = str(tmp_path / "memo.db")
+    memo = RelationMemo(path)
+    memo.put(("bert", "Dog", "bark"), "can")
+    assert memo.get(("bert", "Dog", "bark")) == "can"
+    memo.close()
+
+    memo = RelationMemo(path)
+    assert memo.get(("bert", "Dog", "bark")) == "can"
+    assert memo.get(("bert", "Dog", "fly")) is None
+    memo.close()
+
+
+def test_evict_keeps_most_recent(tmp_path):
+    memo = RelationMemo(str(tmp_path / "memo.db"), max_entries=3, front_size=0)
+    for i in range(5):
+        memo.put(("bert", "Dog", f"k{i}"), "has")
+        memo.flush()
+    memo.evict()
+    assert [memo.get(("bert", "Dog", f"k{i}")) for i in range(5)] == [None, None, "has", "has", "has"]
+    memo.close()
+
+
+def test_shared_between_threads(tmp_path):
+    memo = RelationMemo(str(tmp_path / "memo.db"), front_size=16)
+    errors = []
+
+    def work(t):
+        try:
+            for i in range(300):
+                memo.put(("bert", f"C{t}", f"k{i}"), "has")
+                memo.get(("bert", f"C{(t + 1) % 8}", f"k{i}"))
+                if i % 10 == 0:
+                    memo.flush()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(t,)) for t in range(8)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)    # interleave the threads as much as possible
+    try:
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+    finally:
+        sys.setswitchinterval(interval)
+    memo.flush()
+
+    assert errors == []
+    assert memo.conn.execute("SELECT COUNT(*) FROM relations").fetchone()[0] == 8 * 300
+    memo.close()
@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+import riddlequest
+from riddlegenerator import extraction_daemon
+
+
+def test_lookup_generate_validate_load_no_heavy_library(tmp_path):
+    data = os.path.join(ROOT, "data", "json", "triples_class.json")
+    templates = os.path.join(ROOT, "templates", "templates.json")
+    lookup, riddles = str(tmp_path / "lookup.json"), str(tmp_path / "riddles.json")
+    code = f"""
+import sys
+import riddlequest
+riddlequest.main(["lookup", "--triples", {data!r}, "--out", {lookup!r}])
+riddlequest.main(["generate", "--triples", {data!r}, "--templates", {templates!r},
+                  "--lookup", {lookup!r}, "--out", {riddles!r}])
+riddlequest.main(["validate", "--riddles", {riddles!r}, "--lookup", {lookup!r},
+                  "--out", {str(tmp_path / "validated.jsonl")!r}, "--workers", "1"])
+heavy = ("numpy", "scipy", "sklearn", "torch", "transformers", "sentence_transformers", "matplotlib")
+print(sorted(m for m in heavy if m in sys.modules))
+"""
+    out = subprocess.run([sys.executable, "-c", code], cwd=str(tmp_path), capture_output=True, text=True,
+                         check=True, env={**os.environ, "PYTHONPATH": ROOT})
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_inference_flags_on_serve_ingest_bench():
+    parser = riddlequest.build_parser()
+    for command in ("serve", "ingest", "bench"):
+        args = parser.parse_args([command, "--quantize", "--threads", "4"])
+        assert riddlequest.inference_options(args) == {"quantize": True, "intra_op_threads": 4}
+
+    args = parser.parse_args(["serve"])
+    assert riddlequest.inference_options(args) == {}
+
+
+def test_serve_passes_inference_to_daemon(monkeypatch):
+    seen = {}
+
+    class FakeDaemon:
+        def __init__(self, path, fetch_workers=4, inference=None):
+            seen["inference"] = inference
+
+        def serve_forever(self):
+            pass
+
+    monkeypatch.setattr(extraction_daemon, "ExtractionDaemon", FakeDaemon)
+    args = riddlequest.build_parser().parse_args(["serve", "--jit", "--interop-threads", "2"])
+    args.func(args)
+    assert seen["inference"] == {"jit": True, "inter_op_threads": 2}
+
+
+def test_ingest_leaves_a_running_daemon_its_settings(monkeypatch, capsys):
+    monkeypatch.setattr(extraction_daemon, "daemon_running", lambda path=None: True)
+    args = riddlequest.build_parser().parse_args(["ingest", "--quantize"])
+    riddlequest.configure_extraction(args, "ingest")
+    assert "daemon is running" in capsys.readouterr().out
+    assert "riddlegenerator.triples_extraction" not in sys.modules
+
+
+def test_relation_agreement_restores_the_active_model():
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from riddlegenerator import triples_extraction as te
+
+    active, config, threads = te.inference_model, te.inference_config, te.torch.get_num_threads()
+    report = te.relation_agreement([("Dog", "bark"), ("Cat", "milk")], quantize=True, intra_op_threads=1)
+    assert report["config"] == "int8" and report["threads"] == 1
+    assert 0.0 <= report["top1_agreement"] <= 1.0
+    assert (te.inference_model, te.inference_config) == (active, config)
+    assert te.torch.get_num_threads() == threads
@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+
+from semantic_solver import SemanticSolver, rerank_file
+
+WORDS = ["bark", "purr", "swim", "fetch"]
+
+
+class WordEncoder:
+    """One axis per known word, so a clue is closest to concepts sharing its words."""
+
+    def encode(self, texts):
+        return np.array([[float(w in t.lower()) for w in WORDS] + [0.01] for t in texts])
+
+
+EMBEDDINGS = {
+    "Dog::0": [1, 0, 0, 1, 0], "Dog::1": [1, 0, 0, 0, 0],
+    "Cat::0": [0, 1, 0, 0, 0],
+    "Fish::0": [0, 0, 1, 0, 0],
+}
+
+
+def solver():
+    return SemanticSolver(EMBEDDINGS, encoder=WordEncoder())
+
+
+def test_score_batch_matches_per_riddle_mean():
+    s = solver()
+    riddles = ["I can bark.\nI fetch.\nWhat am I?", "I can swim but I am not a cat.\nWhat am I?"]
+    scores = s.score_batch(riddles)
+    for r, riddle in enumerate(riddles):
+        alone = s.score_batch([riddle])[0]
+        assert np.allclose(scores[r], alone, atol=1e-6)
+    assert s.concepts[int(np.argmax(scores[0]))] == "Dog"
+    assert s.concepts[int(np.argmax(scores[1]))] == "Fish"
+
+
+def test_rerank_keeps_candidates_without_embeddings():
+    item = {"riddle": "I can purr.\nWhat am I?", "answer": "Lion",
+            "possible_answers": ["Lion", "Dog", "Tiger", "Cat"]}
+    (out,) = solver().rerank([item])
+    # Lion and Tiger have no embedding: kept, after the scored candidates
+    assert out["possible_answers"] == ["Cat", "Dog", "Lion", "Tiger"]
+    assert out["answer"] == "Cat"
+
+    only_unknown = dict(item, possible_answers=["Lion", "Tiger"])
+    (out,) = solver().rerank([only_unknown])
+    assert out["possible_answers"] == ["Lion", "Tiger"]
+    assert out["semantic_scores"] == {}
+
+
+def test_rerank_file_streams_in_place(tmp_path):
+    path = tmp_path / "out.jsonl"
+    items = [{"riddle": "I can bark.\nWhat am I?", "answer": "Cat", "possible_answers": ["Cat", "Dog"]},
+             {"riddle": "I can swim.\nWhat am I?", "answer": None, "possible_answers": []}]
+    path.write_text("".join(json.dumps(i) + "\n" for i in items), encoding="utf-8")
+
+    assert rerank_file(solver(), str(path), batch_size=1) == 2
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [r["answer"] for r in lines] == ["Dog", "Fish"]
+    assert lines[0]["possible_answers"] == ["Dog", "Cat"]
+    assert [p.name for p in tmp_path.iterdir()] == ["out.jsonl"]
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from conftest import entry
+from lookup_builder import build_lookup, shard_of
+from sharding import ShardedValidator, validate_riddles_sharded
+from validator import iter_riddles, validate_riddles
+
+NUM_SHARDS = 3
+
+
+TRIPLES = {
+    "Dog": [entry("a dewclaw on some breeds"), entry("thick fur"), entry("bark", "can")],
+    "Wolf": [entry("dewclaw on some breeds"), entry("thick fur"), entry("howl", "can")],
+    "Cat": [entry("thick fur"), entry("retractable claws"), entry("purr", "can")],
+    "Fish": [entry("gills"), entry("fins"), entry("swim", "can")],
+    "Shark": [entry("gills"), entry("fins"), entry("sharp teeth")],
+    "Frog": [entry("webbed feet"), entry("swim", "can")],
+}
+
+
+@pytest.fixture()
+def lookup(tmp_path):
+    path = str(tmp_path / "lookup.json")
+    data = build_lookup(TRIPLES, path, consolidate=True, shards=NUM_SHARDS)
+    return path, data
+
+
+def riddles(data):
+    ids = data["property_ids"]
+    (variant,) = data["aliases"]
+    texts = [
+        "I have thick fur.\nI can howl.\nWhat am I?",
+        "I have thick fur but not retractable claws.\nWhat am I?",
+        "I have gills but not sharp teeth.\nWhat am I?",
+        f"I have {variant}.\nWhat am I?",
+        "I have fins and webbed feet.\nWhat am I?",
+    ]
+    items = [{"concept": None, "version": "v1", "riddle": t} for t in texts]
+    items += [
+        {"riddle": "r", "clues": [{"property": "thick fur", "property_id": ids["thick fur"]},
+                                  {"property": None, "property_id": ids["purr"]}]},
+        {"riddle": "r", "clues": [{"property_id": ids["gills"], "neg_concept": "Shark"}]},
+        {"riddle": "r", "clues": [{"property": variant}, {"property": "thick fur",
+                                                           "neg_property_id": ids["bark"]}]},
+    ]
+    return items
+
+
+def test_shards_hold_only_their_own_aliases_and_ids(lookup):
+    path, data = lookup
+    manifest = json.load(open(path.replace(".json", ".shards.json")))
+    shards = [json.load(open(path.replace("lookup.json", name))) for name in manifest["shards"]]
+
+    for i, shard in enumerate(shards):
+        assert all(shard_of(c, NUM_SHARDS) == i for c in shard["concept_to_props"])
+        assert set(shard["property_ids"]) == set(shard["prop_to_concepts"])
+        assert set(shard["aliases"].values()) <= set(shard["prop_to_concepts"])
+    assert sum(len(s["property_ids"]) for s in shards) < NUM_SHARDS * len(data["property_ids"])
+    assert set().union(*(s["property_ids"] for s in shards)) == set(data["property_ids"])
+
+
+def test_sharded_validation_matches_single_lookup(lookup, tmp_path):
+    path, data = lookup
+    riddles_path = tmp_path / "riddles.jsonl"
+    riddles_path.write_text("".join(json.dumps(r) + "\n" for r in riddles(data)), encoding="utf-8")
+
+    single, sharded = str(tmp_path / "single.jsonl"), str(tmp_path / "sharded.jsonl")
+    validate_riddles(str(riddles_path), path, single)
+    with ShardedValidator.from_manifest(path.replace(".json", ".shards.json")) as validator:
+        assert validate_riddles_sharded(str(riddles_path), validator, sharded, batch_size=2) == 8
+
+    expected, got = list(iter_riddles(single)), list(iter_riddles(sharded))
+    for want, have in zip(expected, got):
+        assert have["possible_answers"] == want["possible_answers"]
+        assert set(have["pos_clues"]) == set(want["pos_clues"])
+        assert set(have["neg_clues"]) == set(want["neg_clues"])
+        assert have["clue_source"] == want["clue_source"]
+    assert [r["answer"] for r in got] == ["Wolf", "Dog", "Fish", "Dog", "Fish", "Cat", "Fish", "Wolf"]
+
+
+def test_sharded_audit_matches_single_lookup(lookup, tmp_path):
+    path, data = lookup
+    riddles_path = tmp_path / "riddles.jsonl"
+    items = riddles(data)
+    # clue records whose riddle text names the same properties
+    items[5]["riddle"] = "I have thick fur.\nI can purr.\nWhat am I?"
+    items[6]["riddle"] = "I have gills but not sharp teeth.\nWhat am I?"
+    riddles_path.write_text("".join(json.dumps(r) + "\n" for r in items), encoding="utf-8")
+
+    single, sharded = str(tmp_path / "single.jsonl"), str(tmp_path / "sharded.jsonl")
+    validate_riddles(str(riddles_path), path, single, audit=True)
+    with ShardedValidator.from_manifest(path.replace(".json", ".shards.json")) as validator:
+        validate_riddles_sharded(str(riddles_path), validator, sharded, batch_size=3, audit=True)
+
+    expected, got = list(iter_riddles(single)), list(iter_riddles(sharded))
+    assert [r["clue_source"] for r in got] == ["text"] * 8
+    for want, have in zip(expected, got):
+        assert have["possible_answers"] == want["possible_answers"]
+        assert ("audit" in have) == ("audit" in want)
+        if "audit" in want:
+            assert have["audit"]["record_possible_answers"] == want["audit"]["record_possible_answers"]
+            assert have["audit"]["agrees"] == want["audit"]["agrees"]
+    assert [r["audit"]["agrees"] for r in got[5:7]] == [True, True]
+
+
+def test_validate_rejects_workers_with_shards():
+    import riddlequest
+
+    with pytest.raises(SystemExit):
+        riddlequest.main(["validate", "--shards", "lookup.shards.json", "--workers", "4"])
@@ -0,0 +1,52 @@
+import numpy as np
+
+from conftest import ROOT  # noqa: F401  (sets up sys.path)
+from similarity import ConceptSimilarity
+
+CONCEPT_TO_PROPS = {
+    "Dog": ["fur", "tail", "bark", "four legs"],
+    "Wolf": ["fur", "tail", "howl", "four legs"],
+    "Cat": ["fur", "tail", "purr", "four legs"],
+    "Fox": ["fur", "tail", "four legs"],
+    "Shark": ["gills", "fins", "tail"],
+    "Frog": ["webbed feet"],
+}
+
+
+def test_hardest_picks_the_most_similar_candidate():
+    engine = ConceptSimilarity(CONCEPT_TO_PROPS)
+    assert engine.hardest("Dog", ["Shark", "Fox", "Frog"]) == "Fox"
+    assert engine.hardest("Shark", ["Frog", "Dog"]) == "Dog"
+    # unknown candidates never win over known ones, unknown concepts have no answer
+    assert engine.hardest("Dog", ["Unicorn", "Frog"]) == "Frog"
+    assert engine.hardest("Unicorn", ["Dog"]) is None
+    assert engine.hardest("Dog", []) is None
+    assert engine.score("Dog", "Wolf") == engine.score("Wolf", "Dog") == 0.75
+
+
+def test_all_pairs_top_k_keeps_the_best_per_row():
+    engine = ConceptSimilarity(CONCEPT_TO_PROPS)
+    full = engine.all_pairs(block_size=2).toarray()
+    top = engine.all_pairs(block_size=2, k=2)
+
+    assert np.diff(top.indptr).max() == 2
+    for i in range(len(engine.concepts)):
+        row = full[i].copy()
+        row[i] = 0
+        kept = top.getrow(i)
+        assert np.allclose(kept.data, row[kept.indices])
+        assert sorted(kept.data, reverse=True) == sorted(row, reverse=True)[:len(kept.data)]
+
+
+def test_saved_top_k_answers_hardest(tmp_path):
+    engine = ConceptSimilarity(CONCEPT_TO_PROPS)
+    path = str(tmp_path / "similarity.npz")
+    engine.save(path, k=3)
+
+    saved = ConceptSimilarity.from_saved(path)
+    for concept in CONCEPT_TO_PROPS:
+        others = [c for c in CONCEPT_TO_PROPS if c != concept]
+        assert saved.score(concept, engine.hardest(concept, others)) == engine.score(
+            concept, saved.hardest(concept, others))
+    assert saved.hardest("Dog", ["Shark", "Fox"]) == "Fox"
+    assert saved.saved.nnz <= 3 * len(CONCEPT_TO_PROPS)
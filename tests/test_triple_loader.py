@@ -0,0 +1,93 @@
+import json
+import random
+
+import pytest
+
+from triple_loader import ConceptStream, _JSONStream, concept_spans, iter_concepts, iter_json_members
+
+CHUNK_SIZES = (1, 2, 3, 5, 7, 9, 16, 1 << 16)
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_numbers_split_at_buffer_edge(tmp_path, chunk_size):
+    # "12." at the end of a chunk used to be returned as 12
+    doc = {"a": 12.5, "b": 1, "c": [1e5, -0.25e-3, 7, True, None], "d": -30}
+    path = write(tmp_path, "n.json", json.dumps(doc))
+    assert dict(iter_json_members(path, chunk_size=chunk_size)) == doc
+
+
+def random_value(rng, depth=0):
+    r = rng.random()
+    if depth > 3 or r < 0.3:
+        return rng.choice([
+            rng.randint(-10 ** 6, 10 ** 6), rng.uniform(-1e6, 1e6), rng.random() * 1e-7,
+            True, False, None,
+            "".join(rng.choice('ab"\\é漢\n/{}[]') for _ in range(rng.randint(0, 12))),
+        ])
+    if r < 0.65:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {f"k{i}": random_value(rng, depth + 1) for i in range(rng.randint(0, 4))}
+
+
+def test_matches_json_load_on_random_documents(tmp_path):
+    rng = random.Random(7)
+    for n in range(150):
+        doc = {f"c{i}é" if i % 3 == 0 else f"c{i}": random_value(rng) for i in range(rng.randint(0, 6))}
+        path = write(tmp_path, f"{n}.json", json.dumps(doc, ensure_ascii=n % 2 == 0, indent=n % 3 or None))
+        for chunk_size in CHUNK_SIZES:
+            assert dict(iter_json_members(path, chunk_size=chunk_size)) == doc
+            assert dict(concept_spans(path, chunk_size)).keys() == doc.keys()
+
+
+def test_member_under_key_skips_the_rest(tmp_path):
+    path = write(tmp_path, "l.json", json.dumps({
+        "triples": {"Dog": ["a \\\" [ {"]}, "aliases": {"x": "y"}, "property_ids": {"p": 0}}))
+    for chunk_size in CHUNK_SIZES:
+        assert dict(iter_json_members(path, "aliases", chunk_size)) == {"x": "y"}
+        assert dict(iter_json_members(path, "missing", chunk_size)) == {}
+
+
+def test_skip_long_string_across_chunks(tmp_path):
+    text = "x" * 5000 + '\\"' + "\\\\" * 100
+    path = write(tmp_path, "s.json", json.dumps({"a": [text, {"b": text}], "c": 2}))
+    with open(path, encoding="utf-8") as f:
+        stream = _JSONStream(f, chunk_size=7)
+        seen = []
+        for key in stream.keys():
+            if key == "a":
+                stream.skip()
+            else:
+                seen.append((key, stream.value()))
+    assert seen == [("c", 2)]
+
+
+def test_concept_stream_lookup_json(tmp_path):
+    doc = {"Dog": [{"triple": "Dog barks."}], "Crème brûlée": [{"triple": "It is sweet", "w": 0.5}],
+           "\u6f22": []}
+    path = write(tmp_path, "t.json", json.dumps(doc, indent=1))
+    stream = ConceptStream(path)
+    assert stream["Crème brûlée"] == doc["Crème brûlée"]
+    assert stream["\u6f22"] == []
+    assert "Dog" in stream and "Cat" not in stream
+    assert list(stream) == list(doc) and len(stream) == 3
+    with pytest.raises(KeyError):
+        stream["Cat"]
+
+
+def test_concept_stream_lookup_jsonl_and_refresh(tmp_path):
+    path = tmp_path / "t.jsonl"
+    path.write_text(json.dumps({"concept": "Dog", "entries": [1]}) + "\n\n"
+                    + json.dumps({"Cat": [2], "Fish": [3.5]}) + "\n", encoding="utf-8")
+    stream = ConceptStream(str(path))
+    assert stream["Fish"] == [3.5] and stream["Dog"] == [1]
+    assert list(iter_concepts(str(path))) == [("Dog", [1]), ("Cat", [2]), ("Fish", [3.5])]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"concept": "Owl", "entries": [4, 5]}) + "\n")
+    assert stream["Owl"] == [4, 5]
@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+from conftest import ROOT  # noqa: F401  (sets up sys.path)
+from generator import RiddleGenerator
+from lookup_builder import build_lookup
+from triple_table import TripleTable
+
+CLASSIFIED = {
+    "Dog": [
+        {"triple": "Dog has acute hearing.", "label": "topic_marker", "avg_distance": 0.7,
+         "neighboring_concepts": []},
+        {"triple": "Dogs are loyal.", "label": "common", "avg_distance": 0.4,
+         "neighboring_concepts": ["Cat", "Wolf"]},
+        {"triple": "A dog and a Dog can swim.", "label": "common", "neighboring_concepts": ["Cat"]},
+    ],
+    "Cat": [
+        {"relation": "eats", "object": "mice", "label": "topic_marker", "neighboring_concepts": []},
+        {"triple": "Cat is loyal.", "label": "common", "avg_distance": 0.5,
+         "neighboring_concepts": ["Dog"]},
+        "Cat purrs.",
+    ],
+}
+
+
+def test_rows_decode_back():
+    table = TripleTable.from_classified(CLASSIFIED)
+    assert len(table) == 6 and table.concepts() == ["Dog", "Cat"]
+    assert "Dog" in table and "Wolf" not in table
+
+    rows = list(table.iter_rows("Dog"))
+    assert rows[0] == ("", "Dog has acute hearing.", "topic_marker", [], False)
+    assert rows[1] == ("", "Dogs are loyal.", "common", ["Cat", "Wolf"], False)
+    assert list(table.iter_rows("Cat"))[0] == ("eats", "mice", "topic_marker", [], True)
+    assert list(table.iter_rows("Cat"))[2] == ("", "Cat purrs.", None, [], False)
+
+    view = table.rows("Dog")
+    assert view[1][3] == pytest.approx(0.4) and math.isnan(view[2][3])
+    with pytest.raises(IndexError):
+        view[3]
+    with pytest.raises(KeyError):
+        table.rows("Wolf")
+    with pytest.raises(ValueError):
+        table.add_concept("Dog", [])
+
+
+def test_table_grows_while_a_slice_is_alive():
+    table = TripleTable.from_classified({"Dog": CLASSIFIED["Dog"]})
+    rows = table.iter_rows("Dog")
+    first = next(rows)
+    table.add_concept("Cat", CLASSIFIED["Cat"])
+    assert [first] + list(rows) == list(TripleTable.from_classified(CLASSIFIED).iter_rows("Dog"))
+
+
+def test_lookup_and_generator_match_the_dict_path():
+    # the generator's dict path reads entry["triple"]: dict entries only
+    classified = {c: [e for e in entries if isinstance(e, dict)] for c, entries in CLASSIFIED.items()}
+    table = TripleTable.from_classified(classified)
+    assert build_lookup(table, None) == build_lookup(classified, None)
+
+    from_table = RiddleGenerator(table, {})
+    from_dict = RiddleGenerator(classified, {})
+    for concept in classified:
+        assert list(from_table._entries(concept)) == list(from_dict._entries(concept))
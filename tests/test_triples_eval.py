@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+from functools import partial
+
+from riddlegenerator.triples.triples_eval import evaluate_extractor, print_report
+
+MEMO = {"fresh": False}
+SEEN = []
+
+
+@contextmanager
+def fresh_relation_memo():
+    MEMO["fresh"] = True
+    try:
+        yield
+    finally:
+        MEMO["fresh"] = False
+
+
+def extractor(concept, summary):
+    SEEN.append((concept, MEMO["fresh"]))
+    return [(concept, "has", word) for word in summary.split()]
+
+
+def split_extractor(concept, summary, relation):
+    return [(concept, relation, word) for word in summary.split()]
+
+
+# a callable from no module that offers fresh_relation_memo
+plain_extractor = partial(split_extractor, relation="has")
+
+
+GROUND_TRUTH = {"Dog": [("Dog", "has", "fur"), ("Dog", "can", "bark")],
+                "Cat": [("Cat", "has", "whiskers")]}
+SUMMARIES = {"Dog": "fur tail", "Cat": "whiskers"}
+
+
+def test_serial_latency_runs_with_a_fresh_memo(capsys):
+    SEEN.clear()
+    result = evaluate_extractor(extractor, GROUND_TRUTH, SUMMARIES, workers=2, latency_sample=2)
+
+    # the pool used the memo as configured, the timed pass a fresh one
+    assert sorted(SEEN[:2]) == [("Cat", False), ("Dog", False)]
+    assert sorted(SEEN[2:]) == [("Cat", True), ("Dog", True)]
+    assert result["latency"]["memo"] == "fresh (in-memory)" and result["latency"]["n"] == 2
+    assert result["micro"] == {"precision": 2 / 3, "recall": 2 / 3, "f1": 2 / 3}
+
+    print_report({"fake": result})
+    assert "relation memo: fresh (in-memory)" in capsys.readouterr().out
+
+
+def test_extractors_without_a_memo_say_so():
+    result = evaluate_extractor(plain_extractor, GROUND_TRUTH, SUMMARIES, workers=1, latency_sample=1)
+    assert result["latency"]["memo"] == "extractor default"
+    assert evaluate_extractor(plain_extractor, GROUND_TRUTH, SUMMARIES, latency_sample=0)["latency"] is None
+
+
+def counting_extractor(concept, summary):
+    words = summary.split()
+    counts = {"candidates": len(words) + 1, "filtered": 1, "duplicates": 0, "below_cut": 0, "kept": len(words)}
+    return [(concept, "has", w) for w in words], counts
+
+
+def test_pruning_counts_are_summed_and_reported(capsys):
+    result = evaluate_extractor(counting_extractor, GROUND_TRUTH, SUMMARIES, workers=2, latency_sample=0)
+    assert result["per_concept"]["Dog"]["pruning"]["kept"] == 2
+    assert result["pruning"] == {"candidates": 5, "filtered": 2, "duplicates": 0, "below_cut": 0, "kept": 3}
+    assert result["micro"]["precision"] == 2 / 3
+
+    print_report({"counted": result})
+    assert "counted pruning: kept 3 of 5 candidates" in capsys.readouterr().out
+    assert evaluate_extractor(plain_extractor, GROUND_TRUTH, SUMMARIES, latency_sample=0)["pruning"] is None
@@ -0,0 +1,42 @@
+import json
+
+from conftest import entry, write_riddles
+from lookup_builder import build_lookup
+from validator import iter_riddles, validate_riddles, validate_riddles_parallel
+
+
+def write_lookup(tmp_path, name, triples):
+    path = str(tmp_path / name)
+    build_lookup(triples, path)
+    return path
+
+
+BARKS = {"concept": "Dog", "version": "v1", "riddle": "I can bark.\nWhat am I?",
+         "clues": [{"template": "v1:0", "property": "bark"}]}
+
+
+def test_parallel_runs_use_their_own_lookup(tmp_path):
+    dog = write_lookup(tmp_path, "dog.json", {"Dog": [entry("bark", "can")], "Cat": [entry("purr", "can")]})
+    cat = write_lookup(tmp_path, "cat.json", {"Cat": [entry("bark", "can")], "Dog": [entry("purr", "can")]})
+    riddles = write_riddles(tmp_path / "riddles.json", [BARKS])
+    out = str(tmp_path / "out.jsonl")
+
+    validate_riddles_parallel(riddles, dog, out, workers=2)
+    assert [r["answer"] for r in iter_riddles(out)] == ["Dog"]
+    # same process, another lookup: used to keep answering from dog.json
+    validate_riddles_parallel(riddles, cat, out, workers=2)
+    assert [r["answer"] for r in iter_riddles(out)] == ["Cat"]
+
+
+def test_serial_output_follows_extension(tmp_path):
+    lookup = write_lookup(tmp_path, "lookup.json", {"Dog": [entry("bark", "can")]})
+    riddles = write_riddles(tmp_path / "riddles.json", [BARKS, BARKS])
+
+    jsonl = tmp_path / "out.jsonl"
+    assert validate_riddles(riddles, lookup, str(jsonl)) == 2
+    lines = jsonl.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["answer"] for line in lines] == ["Dog", "Dog"]
+
+    array = tmp_path / "out.json"
+    validate_riddles(riddles, lookup, str(array))
+    assert [r["answer"] for r in json.loads(array.read_text(encoding="utf-8"))] == ["Dog", "Dog"]
@@ -0,0 +1,45 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from conftest import ROOT  # noqa: F401  (sets up sys.path)
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("seaborn")
+from visualize import TripleVisualizer  # noqa: E402
+
+
+def write_inputs(tmp_path):
+    rng = np.random.default_rng(0)
+    triples = {c: [{"triple": f"{c} fact {i}.", "label": "common"} for i in range(4)] for c in ("Dog", "Cat")}
+    embeddings = {f"{c}::{i}": rng.normal(size=8).tolist() for c in triples for i in range(4)}
+    triples_path, embeddings_path = tmp_path / "triples_class.json", tmp_path / "embeddings.json"
+    triples_path.write_text(json.dumps(triples), encoding="utf-8")
+    embeddings_path.write_text(json.dumps(embeddings), encoding="utf-8")
+    return str(triples_path), str(embeddings_path)
+
+
+def test_projection_cache_follows_the_triples_file(tmp_path):
+    triples_path, embeddings_path = write_inputs(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+
+    coords, concepts, labels = TripleVisualizer(triples_path, embeddings_path).project(
+        method="pca", cache_dir=cache_dir)
+    assert coords.shape == (8, 2) and set(labels) == {"common"}
+    assert len(os.listdir(cache_dir)) == 1
+
+    again = TripleVisualizer(triples_path, embeddings_path).project(method="pca", cache_dir=cache_dir)
+    assert np.array_equal(again[0], coords) and len(os.listdir(cache_dir)) == 1
+
+    # re-classified triples, same embeddings: the cached labels must not be reused
+    triples = json.load(open(triples_path, encoding="utf-8"))
+    for entries in triples.values():
+        for entry in entries:
+            entry["label"] = "topic_marker"
+    with open(triples_path, "w", encoding="utf-8") as f:
+        json.dump(triples, f)
+    _, _, labels = TripleVisualizer(triples_path, embeddings_path).project(method="pca", cache_dir=cache_dir)
+    assert set(labels) == {"topic_marker"}
+    assert len(os.listdir(cache_dir)) == 2
@@ -0,0 +1,83 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import FIXTURES
+from riddlegenerator.wiki_source import OfflineWikipedia, PageNotFound
+
+WIKI = os.path.join(FIXTURES, "wiki")
+
+
+@pytest.fixture
+def jsonl_dump(tmp_path):
+    path = tmp_path / "pages.jsonl"
+    shutil.copy(os.path.join(WIKI, "pages.jsonl"), path)
+    return str(path)
+
+
+@pytest.fixture
+def multistream(tmp_path):
+    for name in ("multistream.xml.bz2", "multistream-index.txt.bz2"):
+        shutil.copy(os.path.join(WIKI, name), tmp_path / name)
+    return str(tmp_path / "multistream.xml.bz2"), str(tmp_path / "multistream-index.txt.bz2")
+
+
+def test_jsonl_summary(jsonl_dump):
+    wiki = OfflineWikipedia(jsonl_dump)
+    try:
+        assert wiki.summary("Red_fox", sentences=1) == "The red fox is the largest of the true foxes."
+        # lead section only
+        assert "Taxonomy" not in wiki.summary("red fox")
+        assert wiki.summary("Honey bee", sentences=2).endswith("from wax.")
+        with pytest.raises(PageNotFound):
+            wiki.summary("Gray wolf")
+    finally:
+        wiki.close()
+
+
+def test_multistream_pages_and_redirect(multistream):
+    dump, index = multistream
+    wiki = OfflineWikipedia(dump, index)
+    try:
+        fox = wiki.summary("Red fox")
+        assert fox.startswith("Red fox is the largest of the true foxes.")
+        assert "Infobox" not in fox and "Smith" not in fox and "Described" not in fox
+        assert "northern hemisphere" in fox
+        assert wiki.summary("Vulpes vulpes") == fox
+        # second stream
+        assert wiki.summary("Honey bee", sentences=1) == "A honey bee is a eusocial flying insect."
+    finally:
+        wiki.close()
+
+
+def test_partial_index_is_rebuilt(jsonl_dump):
+    index_path = f"{jsonl_dump}.idx.sqlite"
+    open(index_path, "wb").close()  # left behind by an interrupted build
+
+    wiki = OfflineWikipedia(jsonl_dump)
+    try:
+        assert wiki.summary("Honey bee", sentences=1) == "A honey bee is a eusocial flying insect."
+    finally:
+        wiki.close()
+
+
+def test_replaced_dump_is_reindexed(jsonl_dump):
+    OfflineWikipedia(jsonl_dump).close()
+    with open(jsonl_dump, "a", encoding="utf-8") as f:
+        f.write('{"title": "Gray wolf", "text": "The gray wolf is a large canine."}\n')
+
+    wiki = OfflineWikipedia(jsonl_dump)
+    try:
+        assert wiki.summary("Gray wolf") == "The gray wolf is a large canine."
+    finally:
+        wiki.close()
+
+
+def test_failed_build_leaves_no_index(tmp_path):
+    dump = tmp_path / "broken.jsonl"
+    dump.write_text('{"title": "Red fox", "text": "Fox."}\nnot json\n', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        OfflineWikipedia(str(dump))
+    assert os.listdir(tmp_path) == ["broken.jsonl"]